@@ -1,10 +0,0 @@
-from nba_api.live.nba.endpoints import scoreboard
-
-# Today's Score Board
-games = scoreboard.ScoreBoard()
-
-# json
-games.get_json()
-
-# dictionary
-games.get_dict()
\ No newline at end of file
@@ -1,17 +1,34 @@
 import discord
-import pandas as pd
+import numpy as np
 import os
 import re
 import random
 import asyncio
+import contextvars
+import functools
+import importlib
+import time
+import traceback
 from discord.ext import commands
 from discord.commands import Option
-from nba_api.stats.library.http import NBAStatsHTTP
-from nba_api.stats.static import *
-from nba_api.stats.endpoints import *
 from dotenv import load_dotenv
-
-pd.set_option('display.max_columns', 500)
+from nba_cache import ResponseCache, current_season
+from nba_client import NBAStatsClient, CircuitOpen, result_frames
+from name_index import build_player_index, build_team_index
+from singleflight import SingleFlight
+from workpool import WorkPool, PoolBusy
+from live import LivePoller
+from outbound import Outbound
+from records import SeasonRecords, PlayerSeasons, TeamSeasons
+from history import HistoryDB, sync_current_season, HISTORY_SYNC_INTERVAL
+from gamelog import game_log_pages, LOCATIONS
+from warmer import QueryLog, CacheWarmer, CACHE_WARM_INTERVAL, FLUSH_INTERVAL
+import metrics
+from metrics import registry, profiler, timed
+from leaders import (
+    league_stats, per_game_stats, pct_stats, stat_display_names, valid_stats,
+    rank_leaders, leaders_text, range_title, LeadersStore, sync_leaders, fetch_leaders_frame, all_seasons, ALL_TIME
+)
 
 load_dotenv()
 token = os.getenv('DISCORD_TOKEN')
@@ -20,52 +37,306 @@ token = os.getenv('DISCORD_TOKEN')
 intents = discord.Intents.default()
 intents.message_content = True
 
-bot = discord.Bot(intents=intents)
+#Sharded mode (see shards.py): this process runs SHARD_IDS out of SHARD_COUNT gateway shards
+SHARD_COUNT = int(os.getenv('SHARD_COUNT', 0))
+SHARD_IDS = [int(i) for i in os.getenv('SHARD_IDS', '').split(',') if i.strip()]
+#Only one process registers slash commands and runs the shared background jobs
+PRIMARY = not SHARD_IDS or 0 in SHARD_IDS
+
+if SHARD_COUNT:
+    bot = discord.AutoShardedBot(intents=intents, shard_count=SHARD_COUNT, shard_ids=SHARD_IDS or None,
+                                 auto_sync_commands=PRIMARY)
+else:
+    bot = discord.Bot(intents=intents)
+
+#Disk cache for raw stats.nba.com responses
+response_cache = ResponseCache()
+
+#Finished lookups (formatted text), in the same file so every shard process reuses them
+result_cache = ResponseCache(table='results', max_mb=int(os.getenv('NBA_RESULT_CACHE_MAX_MB', 64)))
+
+#Async stats.nba.com client, one pooled session shared by every command
+nba_client = NBAStatsClient(cache=response_cache)
+
+#Bounded worker pool for parsing/formatting, keeps pandas off the event loop
+data_pool = WorkPool()
+
+#Seconds each command gets before we give up and tell the user
+command_deadlines = {
+    'playerstats': 5,
+    'teamstats': 5,
+    'roster': 8,
+    'seasonleaders': 8,
+    'alltimeleaders': 8,
+    'compare': 8,
+    'gamelog': 5,
+}
+
+#Identical lookups running at the same time share one fetch and one parsed result
+lookup_flight = SingleFlight()
+
+#Player/team name lookups, built once at startup. Ambiguous names go to the longest career,
+#from games played in the leaders store (see refresh_player_games)
+player_games = {}
+player_index = build_player_index(player_games)
+team_index = build_team_index()
+
+#Seasons (xxxx-xx) each player played / each team has stats for, filled in as they're fetched
+player_seasons = {}
+team_seasons = {}
+
+#Every season's league leaders kept locally with precomputed rankings
+leaders_store = LeadersStore()
+LEADERS_SYNC_INTERVAL = int(os.getenv('LEADERS_SYNC_INTERVAL', 3600))
+#Until the backfill is done, a range's unsynced seasons are fetched from stats.nba.com; past this many
+#the range waits for the backfill instead
+RANGE_UPSTREAM_SEASONS = 16
+
+def refresh_player_games():
+    if leaders_store.seasons:
+        career = leaders_store.career_columns()
+        player_games.update(zip(career['PLAYER_ID'].astype(int).tolist(), career['GP'].tolist()))
+
+refresh_player_games()
+
+#Background job: backfill missing seasons once, then keep the current season fresh.
+#Other shard processes just pick up the new store version once the primary has written it.
+async def keep_leaders_synced():
+    while True:
+        try:
+            if PRIMARY:
+                synced = await sync_leaders(nba_client, leaders_store, refresh_after=LEADERS_SYNC_INTERVAL)
+                if synced:
+                    print(f"Synced league leaders for {len(synced)} season(s)")
+                    refresh_player_games()
+            elif leaders_store.reload_if_changed():
+                refresh_player_games()
+        except Exception as e:
+            print(f"League leaders sync failed: {e}")
+        await asyncio.sleep(LEADERS_SYNC_INTERVAL if PRIMARY else 60)
+
+#Bulk imported historical stats (python history.py), completed seasons are answered from here
+history = HistoryDB()
+
+#Background job: once a day refresh the current season in the history database, if one was imported
+async def keep_history_synced():
+    while True:
+        try:
+            if history.imported() and time.time() - history.last_sync() >= HISTORY_SYNC_INTERVAL:
+                synced = await sync_current_season(nba_client, history, player_index.entries, team_index.entries)
+                print(f"Synced the current season into the history database: {synced}")
+        except Exception as e:
+            print(f"History sync failed: {e}")
+        await asyncio.sleep(min(HISTORY_SYNC_INTERVAL, 3600))
+
+#Every reply goes through one paced, per-channel outbound queue
+outbound = Outbound()
+
+#Shared live scoreboard poller behind /live
+live_poller = LivePoller(nba_client, outbound=outbound)
+
+background_tasks = {}
 
 @bot.event
 async def on_ready():
     print(f"Logged in as {bot.user}")
+    #on_ready fires again after reconnects, only start background jobs once
+    if 'leaders_sync' not in background_tasks:
+        background_tasks['leaders_sync'] = asyncio.create_task(keep_leaders_synced())
+    if PRIMARY and 'history_sync' not in background_tasks:
+        background_tasks['history_sync'] = asyncio.create_task(keep_history_synced())
+    if 'cache_warmer' not in background_tasks:
+        background_tasks['cache_warmer'] = asyncio.create_task(keep_cache_warm())
+    if metrics.METRICS_PORT and 'metrics' not in background_tasks:
+        background_tasks['metrics'] = await metrics.start_server()
+        print(f"Metrics on http://{metrics.METRICS_HOST}:{metrics.METRICS_PORT}/metrics")
+    if metrics.PROFILE_HZ:
+        profiler.start()
+    #Modules only the data commands use load after connecting, so they don't hold up startup
+    if 'imports' not in background_tasks:
+        background_tasks['imports'] = asyncio.create_task(asyncio.to_thread(importlib.import_module, 'pandas'))
+
+#Whole-command latency, from the interaction arriving to the handler returning
+command_started = {}
+
+@bot.event
+async def on_application_command(ctx):
+    command_started[ctx.interaction.id] = time.perf_counter()
+    if ctx.command.name in warm_lookups:
+        options = {option['name']: option.get('value') for option in ctx.selected_options or []}
+        name = next((options[key] for key in ('player', 'players', 'team', 'stat') if key in options), None)
+        season = options.get('season')
+        if any(options.get(key) for key in ('season_from', 'season_to', 'span')):
+            season = range_key(options.get('season_from'), options.get('season_to'), options.get('span'))
+        query_log.record(ctx.command.name, name, season)
+
+def command_finished(ctx, outcome):
+    started = command_started.pop(ctx.interaction.id, None)
+    if started is not None:
+        registry.observe('nba_command_seconds', time.perf_counter() - started, command=ctx.command.name)
+    registry.inc('nba_commands_total', command=ctx.command.name, outcome=outcome)
+
+@bot.event
+async def on_application_command_completion(ctx):
+    command_finished(ctx, 'ok')
 
+@bot.event
+async def on_application_command_error(ctx, error):
+    command_finished(ctx, 'exception')
+    traceback.print_exception(type(error), error, error.__traceback__)
+
+#Gauges read from the cache, single-flight, worker pool and circuit breaker when metrics are scraped
+@registry.collector
+def collect_bot_state():
+    pool = data_pool.stats()
+    breaker = nba_client.breaker
+    scheduler = nba_client.scheduler.stats()
+    return [
+        ('nba_cache_hits', {}, response_cache.hits),
+        ('nba_cache_misses', {}, response_cache.misses),
+        ('nba_cache_stale_hits', {}, response_cache.stale_hits),
+        ('nba_stale_served', {}, nba_client.stale_served),
+        ('nba_lookups_started', {}, lookup_flight.started),
+        ('nba_lookups_coalesced', {}, lookup_flight.coalesced),
+        ('nba_lookups_in_flight', {}, lookup_flight.in_flight()),
+        ('nba_upstream_coalesced', {}, nba_client.flight.coalesced),
+        ('nba_upstream_waiting', {}, scheduler['waiting']),
+        ('nba_upstream_retried', {}, scheduler['retried']),
+        ('nba_upstream_hedged', {}, scheduler['hedged']),
+        ('nba_pool_pending', {}, pool['pending']),
+        ('nba_pool_queue_depth', {}, pool['queue_depth']),
+        ('nba_pool_rejected', {}, pool['rejected']),
+        ('nba_pool_wait_max_seconds', {}, pool['wait_max_ms'] / 1000),
+        ('nba_breaker_open', {}, int(breaker.state != 'closed')),
+        ('nba_breaker_times_opened', {}, breaker.times_opened),
+        ('nba_live_subscriptions', {}, len(live_poller.subscriptions)),
+        ('nba_live_pending_edits', {}, live_poller.pending),
+        ('nba_live_messages_sent', {}, live_poller.sent),
+        ('nba_live_messages_edited', {}, live_poller.edited),
+        ('nba_outbound_channels', {}, len(outbound.channels)),
+        ('nba_outbound_waiting', {}, outbound.waiting),
+        ('nba_outbound_rate_limited', {}, outbound.rate_limited),
+        ('nba_history_hits', {}, history.hits),
+        ('nba_history_misses', {}, history.misses),
+        ('nba_cache_warmed', {}, cache_warmer.warmed),
+    ]
+
+#Pages through seasons (oldest first), rendering a season only when it's shown.
+#load_page(season) returns (text, error). Only the pages next to the current one are kept,
+#and they're loaded in the background so pressing an arrow is usually instant.
 class SeasonView(discord.ui.View):
-    def __init__(self, ctx, data, seasons, initial_index=0):
+    def __init__(self, ctx, seasons, load_page, initial_index=0, pages=None):
         super().__init__(timeout=300)
-        self.data = data
         self.ctx = ctx
         self.seasons = seasons
+        self.load_page = load_page
         self.index = initial_index
+        self.pages = dict(pages or {})
+        self.loading = {}
+        self.prefetch()
+
+    def load(self, season):
+        task = self.loading.get(season)
+        if task is None:
+            task = self.loading[season] = asyncio.ensure_future(self._load(season))
+        return task
+
+    async def _load(self, season):
+        try:
+            text, error = await self.load_page(season)
+        finally:
+            self.loading.pop(season, None)
+        if error:
+            return error
+        self.pages[season] = text
+        return text
+
+    #Drop pages we've moved away from and start loading the neighbours of the current one
+    def prefetch(self):
+        nearby = self.seasons[max(0, self.index - 1):self.index + 2]
+        for season in list(self.pages):
+            if season not in nearby:
+                del self.pages[season]
+        for season in nearby:
+            if season not in self.pages:
+                self.load(season)
+
+    #Text for a loaded page (or the error it failed with)
+    def show(self, page):
+        return page
+
+    def move(self, step):
+        if 0 <= self.index + step < len(self.seasons):
+            self.index += step
 
     async def update_message(self, interaction: discord.Interaction):
         season = self.seasons[self.index]
-        stats = self.data[season]
-        await interaction.response.edit_message(
-            content=f"```{stats}```", view=self
-        )
+        if season in self.pages:
+            await interaction.response.edit_message(content=f"```{self.show(self.pages[season])}```", view=self)
+        else:
+            #Still loading, acknowledge the click now and edit once the page is ready
+            await interaction.response.defer()
+            stats = await self.load(season)
+            await interaction.edit_original_response(content=f"```{self.show(stats)}```", view=self)
+        self.prefetch()
 
     @discord.ui.button(label="⬅️ Prev", style=discord.ButtonStyle.primary)
     async def prev(self, button, interaction: discord.Interaction):
-        if self.index < len(self.seasons) - 1:
-            self.index += 1
+        self.move(-1)
         await self.update_message(interaction)
 
     @discord.ui.button(label="➡️ Next", style=discord.ButtonStyle.primary)
     async def next(self, button, interaction: discord.Interaction):
-        if self.index > 0:
-            self.index -= 1
+        self.move(1)
         await self.update_message(interaction)
 
+#SeasonView for /gamelog: a season loads as a list of pages of games, the arrows step through
+#them and then on to the next/previous season. Only the season on screen is kept or fetched.
+class GameLogView(SeasonView):
+    page = 0
+
+    def prefetch(self):
+        season = self.seasons[self.index]
+        for other in list(self.pages):
+            if other != season:
+                del self.pages[other]
+
+    #Current season's pages, with self.page brought into range (-1 means its last page)
+    def current(self):
+        pages = self.pages.get(self.seasons[self.index])
+        if isinstance(pages, list):
+            self.page %= len(pages)
+        return pages
+
+    def move(self, step):
+        pages = self.current()
+        if isinstance(pages, list) and 0 <= self.page + step < len(pages):
+            self.page += step
+        elif 0 <= self.index + step < len(self.seasons):
+            self.index += step
+            self.page = 0 if step > 0 else -1
+
+    def show(self, pages):
+        if not isinstance(pages, list):
+            return pages
+        self.page %= len(pages)
+        if len(pages) == 1:
+            return pages[0]
+        return f"{pages[self.page]}\nPage {self.page + 1}/{len(pages)}"
+
 #Function to grab Player ID in API
 def get_player_id(player_name):
-    player_dict = players.find_players_by_full_name(player_name)
+    player_dict = player_index.resolve(player_name)
     if not player_dict:
         return None
-    return player_dict[0]['id']
+    return player_dict['id']
 
 #Function to grab Team ID in API
 def get_team_id(team_name):
-    team_dict = teams.find_teams_by_nickname(team_name)
+    team_dict = team_index.resolve(team_name)
     if not team_dict:
         return None
-    return team_dict[0]['id']
+    return team_dict['id']
 
 #Function for converting xxxx-xx to xxxx
 def season_to_year(season: str) -> str:
@@ -76,177 +347,315 @@ def season_to_year(season: str) -> str:
     end_year_short = str(full_year)[-2:]
     return f"{start_year}-{end_year_short}"
 
+#Function for converting xxxx-xx to the xxxx year used by commands
+def season_end_year(season_id: str) -> int:
+    return int(season_id[:4]) + 1
+
+#Season year for /roster and /seasonleaders when none is given: the current season
+def default_season():
+    return str(season_end_year(current_season()))
+
+#season_from/season_to options (end years) as xxxx-xx seasons, either end can be left open
+def season_bounds(season_from, season_to):
+    first = season_to_year(season_from) if season_from else None
+    last = season_to_year(season_to) if season_to else None
+    if (season_from and not first) or (season_to and not last):
+        return None, None, f"Invalid season format. Please use a 4 digit year like 2025."
+    if first and last and first > last:
+        first, last = last, first
+    return first, last, None
+
+#A season range travels as one "from..to" string (with "/span" for the best-span leaders), the season
+#part of its lookup's result cache key and of its query log entry, so the warmer refreshes what was asked
+def range_key(season_from=None, season_to=None, span=None):
+    return f"{season_from or ''}..{season_to or ''}" + (f"/{span}" if span else "")
+
+def is_range(season):
+    return bool(season) and '..' in season
+
+#(season_from, season_to, span) back out of a range_key
+def parse_range(key):
+    bounds, _, span = key.partition('/')
+    season_from, _, season_to = bounds.partition('..')
+    return season_from or None, season_to or None, int(span) if span else None
+
+#Last season an answer depends on: the season itself, or the end of a range (open ranges run to now)
+def last_season(season):
+    if is_range(season):
+        season = parse_range(season)[1]
+    return season_to_year(season) if season else None
+
+#Every season between two end years, as xxxx-xx
+def seasons_between(first_year, last_year):
+    return [season_to_year(str(year)) for year in range(first_year, last_year + 1)]
+
+#Shown instead of a generic error while the circuit breaker is keeping us off stats.nba.com
+UPSTREAM_DOWN = "⚠️ stats.nba.com is having trouble right now. Try again in a minute."
+
+#Set when a lookup answers from stale data, so it isn't kept in the shared result cache
+served_stale = contextvars.ContextVar('served_stale', default=False)
+
+#Answers built from an expired cache entry (stats.nba.com down or slow) say how old they are
+def mark_stale(result, raw):
+    if result is None or 'stale_since' not in raw:
+        return result
+    served_stale.set(True)
+    minutes = int(time.time() - raw['stale_since']) // 60
+    age = f"{minutes // 60}h {minutes % 60}m" if minutes >= 60 else f"{minutes}m"
+    note = f"\n(stats.nba.com isn't responding, showing saved data from {age} ago)"
+    if isinstance(result, SeasonRecords):
+        result.note = note
+        return result
+    if isinstance(result, list):
+        return [page + note for page in result]
+    return result + note
+
+#Keep a get_*(name, season) lookup's successful answer in result_cache, shared by every process.
+#Completed seasons never change, anything else expires with the response cache TTL.
+#records is the SeasonRecords class for lookups that answer with records instead of text.
+def shared_result(fn=None, records=None):
+    if fn is None:
+        return functools.partial(shared_result, records=records)
+
+    @functools.wraps(fn)
+    async def wrapper(name, season=None):
+        key = f"{fn.__name__}:{' '.join(name.lower().split())}:{season or ''}"
+        cached = result_cache.get(key)
+        if cached is not None:
+            result, error = cached
+            return (records.from_json(result) if records and result is not None else result), error
+        served_stale.set(False)
+        result, error = await fn(name, season)
+        if error is None and not served_stale.get():
+            saved = result.to_json() if records and result is not None else result
+            result_cache.put(key, [saved, error], last_season(season))
+        return result, error
+    return wrapper
+
+#Career from the history database when it can answer (a completed season, or a retired player), else stats.nba.com.
+#History reads are SQLite queries plus json parsing, so like the formatting they run on the worker pool.
+async def player_career(player, season=None):
+    career = await data_pool.run(history.player_career, player['id'], season_to_year(season), player['is_active'])
+    if career is None:
+        career = await nba_client.player_career_stats(player['id'])
+    return career
+
 #For /playerstats https://github.com/swar/nba_api/blob/master/src/nba_api/stats/endpoints/playercareerstats.py
-def get_player_stats(player_name, season = None):
-    player_id = get_player_id(player_name)
-    if not player_id:
+@lookup_flight.coalesce
+@shared_result(records=PlayerSeasons)
+async def get_player_stats(player_name, season = None):
+    player = player_index.resolve(player_name)
+    if not player:
         return None, f"Could not find {player_name}"
+    player_id = player['id']
+
+    try:
+        career = await player_career(player, season)
+    except PoolBusy:
+        raise
+    except CircuitOpen:
+        return None, UPSTREAM_DOWN
+    except Exception:
+        return None, f"Exception error, could not retrieve information"
+
+    stats, error = await data_pool.run(format_player_stats, player_name, player_id, career, season)
+    return mark_stale(stats, career), error
 
+@timed('format')
+def format_player_stats(player_name, player_id, career, season=None):
     try:
-        career = playercareerstats.PlayerCareerStats(player_id=player_id)
-        df = career.get_data_frames()[0]
-        df = df.sort_values(by='SEASON_ID')
+        result_set = next(rs for rs in career['resultSets'] if rs['name'] == 'SeasonTotalsRegularSeason')
+        stats = PlayerSeasons.from_result_set(player_name, result_set, keep=lambda row, index: row[index['GP']] != 0)
     except Exception:
         return None, f"Exception error, could not retrieve information"
 
+    if len(stats):
+        player_seasons[player_id] = stats.keys()
+
     if season:
         season = season_to_year(season)
-        df = df[df['SEASON_ID'] == season]
-        if df.empty:
+        season_column = result_set['headers'].index('SEASON_ID')
+        if not any(row[season_column] == season for row in result_set['rowSet']):
             return None, f"Could not find stats for {player_name} in {season}. Format: /playerstats Lebron James 2025"
+        stats = stats.season(season)
 
-    # Collect stats strings per season
-    season_stats = {}
-
-    for _, row in df.iterrows():
-        seasonId = row['SEASON_ID']
-        team_abbr = row['TEAM_ABBREVIATION']
-        games = row['GP']
-        if games == 0:
-            continue
-        ppg = round(row['PTS'] / games, 1)
-        rpg = round(row['REB'] / games, 1)
-        apg = round(row['AST'] / games, 1)
-        bpg = round(row['BLK'] / games, 1)
-        spg = round(row['STL'] / games, 1)
-        tovpg = round(row['TOV'] / games, 1)
-        pfpg = round(row['PF'] / games, 1)
-        fgmpg = round(row['FGM'] / games, 1)
-        fg3mpg = round(row['FG3M'] / games, 1)
-        
-        season_stats[seasonId] = (
-            f"{player_name}: {team_abbr} {seasonId}: GP: {games}, "
-            f"PPG: {ppg}, RPG: {rpg}, APG: {apg}, "
-            f"BPG: {bpg}, SPG: {spg}, TO: {tovpg}, "
-            f"PF: {pfpg}, FGM: {fgmpg}, 3PM: {fg3mpg}"
-        )
-    if not season_stats:
+    # Compact per-season records, each season is only turned into text when it's shown
+    if not stats:
         return None, f"No stats found for {player_name}"
-    return season_stats, None
+    return stats, None
+
+#Most players /compare puts side by side, more won't fit across a message
+MAX_COMPARE = 5
+
+#Per-game averages shown by /compare, (label, total column)
+compare_per_game_columns = [('PPG', 'PTS'), ('RPG', 'REB'), ('APG', 'AST'), ('SPG', 'STL'), ('BPG', 'BLK'), ('TOV', 'TOV')]
+#Shooting percentages, (label, made column, attempted column)
+compare_pct_columns = [('FG%', 'FGM', 'FGA'), ('3P%', 'FG3M', 'FG3A'), ('FT%', 'FTM', 'FTA')]
+
+#For /compare, players are comma separated. All careers are fetched at the same time.
+@lookup_flight.coalesce
+@shared_result
+async def get_player_comparison(player_names, season = None):
+    names = [name.strip() for name in player_names.split(",") if name.strip()]
+    if len(names) < 2:
+        return None, "Enter at least 2 players separated by commas. Format: /compare Michael Jordan, LeBron James"
+    if len(names) > MAX_COMPARE:
+        return None, f"You can compare up to {MAX_COMPARE} players at once."
+
+    found = []
+    for name in names:
+        player = player_index.resolve(name)
+        if not player:
+            return None, f"Could not find {name}"
+        if player['id'] not in [p['id'] for p in found]:
+            found.append(player)
+    if len(found) < 2:
+        return None, "Enter at least 2 different players to compare."
+
+    try:
+        careers = await asyncio.gather(*(player_career(p, season) for p in found))
+    except PoolBusy:
+        raise
+    except CircuitOpen:
+        return None, UPSTREAM_DOWN
+    except Exception:
+        return None, f"Exception error, could not retrieve information"
+
+    stats, error = await data_pool.run(format_player_comparison, found, careers, season)
+    #The oldest saved career decides the stale note
+    stale = [career for career in careers if 'stale_since' in career]
+    return mark_stale(stats, min(stale, key=lambda c: c['stale_since']) if stale else {}), error
+
+@timed('format')
+def format_player_comparison(found, careers, season=None):
+    import pandas as pd
+    try:
+        df = pd.concat([result_frames(career)['SeasonTotalsRegularSeason'] for career in careers], ignore_index=True)
+    except Exception:
+        return None, f"Exception error, could not retrieve information"
+
+    #Traded seasons have a row per team plus a TOT row, keep just the TOT row
+    total = df['TEAM_ABBREVIATION'] == 'TOT'
+    df = df[total | ~total.groupby([df['PLAYER_ID'], df['SEASON_ID']]).transform('any')]
+    df = df[df['GP'] != 0]
+
+    if season:
+        season = season_to_year(season)
+        df = df[df['SEASON_ID'] == season]
+    missing = [p['full_name'] for p in found if p['id'] not in set(df['PLAYER_ID'].tolist())]
+    if missing:
+        where = f" in {season}" if season else ""
+        return None, f"No stats found for {', '.join(missing)}{where}"
+
+    # Per-season averages for every player at once, then career averages from each player's totals
+    per_game = [column for _, column in compare_per_game_columns]
+    season_averages = df[per_game].to_numpy(dtype=float) / df['GP'].to_numpy()[:, None]
+    best = df.assign(PPG=season_averages[:, 0]).sort_values('PPG').groupby('PLAYER_ID').tail(1).set_index('PLAYER_ID')
+
+    shooting = [column for _, made, attempted in compare_pct_columns for column in (made, attempted)]
+    totals = df.groupby('PLAYER_ID')[['GP'] + per_game + shooting].sum()
+    totals['SEASONS'] = df.groupby('PLAYER_ID')['SEASON_ID'].nunique()
+    totals = totals.loc[[p['id'] for p in found]]
+    averages = totals[per_game].to_numpy(dtype=float) / totals['GP'].to_numpy()[:, None]
+    made = totals[[made for _, made, _ in compare_pct_columns]].to_numpy(dtype=float)
+    attempted = totals[[attempted for _, _, attempted in compare_pct_columns]].to_numpy(dtype=float)
+    percentages = np.divide(made, attempted, out=np.zeros_like(made), where=attempted != 0) * 100
+
+    rows = [("Seasons", totals['SEASONS'].tolist()), ("GP", totals['GP'].tolist())]
+    rows += [(label, [f"{value:.1f}" for value in column]) for (label, _), column in zip(compare_per_game_columns, averages.T.tolist())]
+    rows += [(label, [f"{value:.1f}" for value in column]) for (label, _, _), column in zip(compare_pct_columns, percentages.T.tolist())]
+    if not season:
+        rows.append(("Best PPG", [f"{best.at[p['id'], 'PPG']:.1f} ({best.at[p['id'], 'SEASON_ID']})" for p in found]))
+
+    names = [p['full_name'] for p in found]
+    width = max(len(value) for value in names + [str(v) for _, values in rows for v in values]) + 2
+    title = f"{season} regular season" if season else "Career regular season"
+    lines = [title, "", f"{'':<9}" + "".join(f"{name:<{width}}" for name in names)]
+    lines += [f"{label:<9}" + "".join(f"{str(value):<{width}}" for value in values) for label, values in rows]
+    return "\n".join(line.rstrip() for line in lines), None
 
 #For /teamstats
-def get_team_stats(team_name, season = None):
+@lookup_flight.coalesce
+@shared_result(records=TeamSeasons)
+async def get_team_stats(team_name, season = None):
     team_id = get_team_id(team_name)
     if not team_id:
         return None, f"Could not find the {team_name}, format: /teamstats Lakers 2025"
 
     try:
-        career = teamyearbyyearstats.TeamYearByYearStats(team_id=team_id)
-        df = career.get_data_frames()[0]
-        df = df.sort_values(by='YEAR')
+        career = await data_pool.run(history.team_history, team_id, season_to_year(season))
+        if career is None:
+            career = await nba_client.team_year_by_year_stats(team_id)
+    except PoolBusy:
+        raise
+    except CircuitOpen:
+        return None, UPSTREAM_DOWN
+    except Exception:
+        return None, f"Exception error, could not retrieve information"
+
+    stats, error = await data_pool.run(format_team_stats, team_name, team_id, career, season)
+    return mark_stale(stats, career), error
+
+@timed('format')
+def format_team_stats(team_name, team_id, career, season=None):
+    try:
+        result_set = next(rs for rs in career['resultSets'] if rs['name'] == 'TeamStats')
+        stats = TeamSeasons.from_result_set(team_name, result_set)
     except Exception:
         return None, f"Exception error, could not retrieve information"
 
+    if len(stats):
+        team_seasons[team_id] = stats.keys()
+
     if season:
         season = season_to_year(season)
-        df = df[df['YEAR'] == season]
-        if df.empty:
+        stats = stats.season(season)
+        if stats is None:
             return None, f"Could not find stats for {team_name} in {season}. Format: /teamstats Lakers 2025"
 
-    stats_strings = []
-    for index, row in df.iterrows():
-        team_id = row['TEAM_ID']
-        team_city = row['TEAM_CITY']
-        games = row['GP']
-        year = row['YEAR']
-        wins = row['WINS']
-        losses = row['LOSSES']
-        win_pct = row['WIN_PCT']
-        po_wins = row['PO_WINS']
-        po_losses = row['PO_LOSSES']
-        ppg = round(row['PTS'] / games, 1)
-        rpg = round(row['REB'] / games, 1)
-        apg = round(row['AST'] / games, 1)
-
-        if po_losses == 0 and po_wins == 0:
-            stats_strings.append(
-            f"{team_city} {year}: {wins}-{losses} ({win_pct*100:.1f}% win), "
-            f"PPG {ppg}, APG {apg}, RPG {rpg}, Did not make the Playoffs"
-        )
-        elif po_wins < 4:
-            stats_strings.append(
-            f"{team_city} {year}: {wins}-{losses} ({win_pct*100:.1f}% win), "
-            f"PPG {ppg}, APG {apg}, RPG {rpg}, Playoffs W-L: {po_wins}-{po_losses}, Eliminated in the First Round"
-        )
-        elif po_wins < 8:
-            stats_strings.append(
-            f"{team_city} {year}: {wins}-{losses} ({win_pct*100:.1f}% win), "
-            f"PPG {ppg}, APG {apg}, RPG {rpg}, Playoffs W-L: {po_wins}-{po_losses}, Eliminated in the Second Round"
-        )
-        elif po_wins < 12:
-            stats_strings.append(
-            f"{team_city} {year}: {wins}-{losses} ({win_pct*100:.1f}% win), "
-            f"PPG {ppg}, APG {apg}, RPG {rpg}, Playoffs W-L: {po_wins}-{po_losses}, Eliminated in the Conference Finals"
-        )
-        elif po_wins < 16:
-            stats_strings.append(
-            f"{team_city} {year}: {wins}-{losses} ({win_pct*100:.1f}% win), "
-            f"PPG {ppg}, APG {apg}, RPG {rpg}, Playoffs W-L: {po_wins}-{po_losses}, Lost in the Finals"
-        )
-        else:
-            stats_strings.append(
-            f"{team_city} {year}: {wins}-{losses} ({win_pct*100:.1f}% win), "
-            f"PPG {ppg}, APG {apg}, RPG {rpg}, Playoffs W-L: {po_wins}-{po_losses}, Won the Championship!"
-        )
+    return stats, None
 
-    full_stats = "\n".join(stats_strings)
-    return full_stats, None
+#For /teamstats with season_from/season_to: one franchise history (from the history database
+#when it covers the range), cut down to the range and summed up
+@lookup_flight.coalesce
+@shared_result
+async def get_team_range(team_name, season_range):
+    team_id = get_team_id(team_name)
+    if not team_id:
+        return None, f"Could not find the {team_name}, format: /teamstats Lakers season_from:2001 season_to:2010"
+    season_from, season_to, _ = parse_range(season_range)
+    first, last, error = season_bounds(season_from, season_to)
+    if error:
+        return None, error
+
+    try:
+        career = await data_pool.run(history.team_history, team_id, last or current_season())
+        if career is None:
+            career = await nba_client.team_year_by_year_stats(team_id)
+    except PoolBusy:
+        raise
+    except CircuitOpen:
+        return None, UPSTREAM_DOWN
+    except Exception:
+        return None, f"Exception error, could not retrieve information"
+
+    summary, error = await data_pool.run(format_team_range, team_name, team_id, career, first, last)
+    return mark_stale(summary, career), error
+
+def format_team_range(team_name, team_id, career, first, last):
+    stats, error = format_team_stats(team_name, team_id, career)
+    if error:
+        return None, error
+    stats = stats.between(first, last)
+    if not len(stats):
+        return None, f"Could not find stats for {team_name} between {first or 'the start'} and {last or 'now'}."
+    return stats.summary(), None
 
 #League leaders function
-def get_league_leaders(stat: str, season: str = None):
+@lookup_flight.coalesce
+@shared_result
+async def get_league_leaders(stat: str, season: str = None):
     stat = stat.lower()
-    league_stats = {
-        "points": "PTS",
-        "assists": "AST",
-        "rebounds": "REB",
-        "blocks": "BLK",
-        "steals": "STL",
-        "turnovers": "TOV",
-        "fg%": "FG_PCT",
-        "fgm": "FGM",
-        "3pm": "FG3M",
-        "ftm": "FTM",
-        "3p%": "FG3_PCT",
-        "ft%": "FT_PCT",
-        "minutes": "MIN"
-    }
-
-    per_game_stats = {
-        "points": "PTS/G",
-        "assists": "AST/G",
-        "rebounds": "REB/G",
-        "blocks": "BLK/G",
-        "steals": "STL/G",
-        "turnovers": "TOV/G",
-        "fgm": "FGM / G",
-        "3pm": "FG3M/G",
-        "ftm": "FTM / G",
-        "minutes": "MIN/G",
-    }
-
-    pct_stats = {
-        "fg%": "FG_PCT",
-        "3p%": "FG3_PCT",
-        "ft%": "FT_PCT",
-    }
-
-    stat_display_names = {
-        "points": "PTS",
-        "assists": "AST",
-        "rebounds": "REB",
-        "blocks": "BLK",
-        "steals": "STL",
-        "turnovers": "TOV",
-        "fg%": "FG%",
-        "fgm": "FGM",
-        "3pm": "3PM",
-        "ftm": "FTM",
-        "3p%": "3P%",
-        "ft%": "FT%",
-        "minutes": "MIN"
-    }
-
-    valid_stats = set(league_stats) | set(per_game_stats) | set(pct_stats)
     if stat not in valid_stats:
         return None, f"Invalid stat, use /stathelp to view valid stats."
 
@@ -256,55 +665,79 @@ def get_league_leaders(stat: str, season: str = None):
         if not season_id:
             return None, f"Invalid season format. Please use a 4 digit year like 2025."
 
+    # All-time leaders are ranked from every stored season, so they wait for the backfill to finish
+    if not season_id:
+        ranking = leaders_store.top(ALL_TIME, stat) if leaders_store.has(ALL_TIME) else None
+        if not ranking or not ranking[0]:
+            return None, "⚠️ All-time leaders are still being downloaded. Try again in a few minutes."
+        return leaders_text(stat, *ranking), None
+
+    # Served straight from the local store when it has the season ranked
+    ranking = leaders_store.top(season_id, stat)
+    if ranking and ranking[0]:
+        return leaders_text(stat, *ranking), None
+
     try:
-        leaders = leagueleaders.LeagueLeaders(
-            season=season_id if season_id else "", 
-            season_type_all_star="Regular Season"
-        )
-        df = leaders.get_data_frames()[0]
-        print(df.columns)
+        leaders = await nba_client.league_leaders(season=season_id, season_type="Regular Season")
+    except CircuitOpen:
+        return None, UPSTREAM_DOWN
     except Exception:
         return None, "Error getting stats"
-    
-    if stat == "fg%":
-        df=df[df["FGM"] > 150]
-    elif stat == "3p%":
-        df=df[df["FG3M"] > 82]
-    elif stat == "ft%":
-        df=df[df["FTM"] > 150]
-
-    if stat in league_stats:
-        base_column = league_stats[stat]
-        df = df[df["GP"] > 0]
-        
-        if stat in per_game_stats:
-            per_game_column = per_game_stats[stat]
-            df.loc[:, per_game_column] = df[base_column] / df["GP"]
-            sort_column = per_game_column
-        else:
-            sort_column = base_column
 
-        df = df.sort_values(by=sort_column, ascending=False).head(10)
+    stats, error = await data_pool.run(format_league_leaders, stat, leaders)
+    return mark_stale(stats, leaders), error
 
+#For season_from/season_to (and span) on the leaders commands. Answered from the local leaders store
+#in one vectorized pass over the stored seasons, instead of a stats.nba.com call per season.
+@lookup_flight.coalesce
+@shared_result
+async def get_range_leaders(stat, season_range):
+    stat = stat.lower()
+    if stat not in valid_stats:
+        return None, f"Invalid stat, use /stathelp to view valid stats."
+    season_from, season_to, span = parse_range(season_range)
+    first, last, error = season_bounds(season_from, season_to)
+    if error:
+        return None, error
+
+    # Seasons the background sync hasn't stored yet come from stats.nba.com, merged into a copy of the store
+    store = leaders_store.state
+    missing = store.missing(first, last)
+    if len(missing) > RANGE_UPSTREAM_SEASONS:
+        return None, "⚠️ Season ranges are still being downloaded. Try again in a few minutes."
+    if missing:
+        try:
+            frames = await asyncio.gather(*(fetch_leaders_frame(nba_client, season) for season in missing))
+        except CircuitOpen:
+            return None, UPSTREAM_DOWN
+        except Exception:
+            return None, "Error getting stats"
+        store = await data_pool.run(store.merged, dict(zip(missing, frames)))
+
+    if span:
+        ranking = await data_pool.run(store.best_span, stat, span, first, last)
     else:
-        # Percentage stats
-        sort_column = pct_stats[stat]
-        df = df.sort_values(by=sort_column, ascending=False).head(10)
-
-    # Format results
-    results = []
-    for rank, (_, row) in enumerate(df.iterrows(), start=1):
-        player = row['PLAYER']
-        value = row[sort_column]
-        displayed_stat = stat_display_names.get(stat, stat.upper())
-        if stat in pct_stats and isinstance(value, (int, float)):
-            value *= 100
-        formatted_value = f"{value:.1f}" if isinstance(value, (int, float)) else str(value)
-        results.append(f"{rank}. {player} - {displayed_stat}: {formatted_value}")
-
-    return "\n".join(results), None
-
-def get_team_roster(team_name, season=None):
+        ranking = await data_pool.run(store.range_top, stat, first, last)
+    if ranking is None or not ranking[0]:
+        return None, f"Not enough seasons between {first or 'the start'} and {last or 'now'}."
+    players, values, seasons = ranking
+    return f"{range_title(stat, seasons, span)}\n\n{leaders_text(stat, players, values)}", None
+
+@timed('format')
+def format_league_leaders(stat, leaders):
+    try:
+        df = result_frames(leaders)['LeagueLeaders']
+    except Exception:
+        return None, "Error getting stats"
+
+    # Work on whole columns, only the top 10 gets turned into text
+    top, values = rank_leaders(stat, df)
+    players = df["PLAYER"].to_numpy()[top].tolist()
+    return leaders_text(stat, players, values.tolist()), None
+
+@lookup_flight.coalesce
+@shared_result
+async def get_team_roster(team_name, season=None):
     team_id = get_team_id(team_name)
     if not team_id:
         return None, f"Could not find the {team_name}, format: /teamstats Lakers 2025"
@@ -315,11 +748,27 @@ def get_team_roster(team_name, season=None):
         return None, str(e)
 
     try:
-        roster = commonteamroster.CommonTeamRoster(team_id=team_id, season=season)
+        roster = await data_pool.run(history.roster, team_id, season)
+        if roster is None:
+            roster = await nba_client.common_team_roster(team_id, season)
+    except PoolBusy:
+        raise
+    except CircuitOpen:
+        return None, UPSTREAM_DOWN
+    except Exception as e:
+        return None, f"Exception occurred while fetching roster: {str(e)}"
+
+    stats, error = await data_pool.run(format_team_roster, team_name, roster, season)
+    return mark_stale(stats, roster), error
+
+@timed('format')
+def format_team_roster(team_name, roster, season):
+    try:
+        roster = result_frames(roster)
 
         # SAFELY get player roster only
-        if hasattr(roster, 'common_team_roster'):
-            df = roster.common_team_roster.get_data_frame()
+        if 'CommonTeamRoster' in roster:
+            df = roster['CommonTeamRoster']
         else:
             return None, f"No roster data returned for {team_name} in {season}."
 
@@ -330,29 +779,150 @@ def get_team_roster(team_name, season=None):
         return None, f"No roster found for {team_name} in {season}."
 
     stats_strings = [f"Roster for the {season} {team_name}\n"]
-    for _, row in df.iterrows():
-        player = row["PLAYER"]
-        num = row["NUM"]
-        pos = row["POSITION"]
-        age = round(row["AGE"])
-        height = row["HEIGHT"]
-        weight = row["WEIGHT"]
-        stats_strings.append(f"#{num} {player} - {pos}, Age: {age}, {height}, {weight} lbs")
+    stats_strings += [
+        f"#{num} {player} - {pos}, Age: {round(age)}, {height}, {weight} lbs"
+        for player, num, pos, age, height, weight in zip(
+            df["PLAYER"].tolist(), df["NUM"].tolist(), df["POSITION"].tolist(),
+            df["AGE"].tolist(), df["HEIGHT"].tolist(), df["WEIGHT"].tolist()
+        )
+    ]
 
     return "\n".join(stats_strings), None
 
-#Character limit function
-async def charlimit(ctx, message: str):
-    if not message:
-        await ctx.respond("No data to display.")
-        return
+#For /gamelog https://github.com/swar/nba_api/blob/master/src/nba_api/stats/endpoints/playergamelog.py
+#One season at a time, so a long career costs no more than a short one
+@lookup_flight.coalesce
+async def get_game_log(player_name, season_id, opponent=None, location=None, min_points=None):
+    player = player_index.resolve(player_name)
+    if not player:
+        return None, f"Could not find {player_name}"
 
-    if len(message) > 1900:
-        chunks = [message[i:i+1900] for i in range(0, len(message), 1900)]
-        for chunk in chunks:
-            await ctx.respond(f"```{chunk}```")
-    else:
-        await ctx.followup.send(f"```{message}```")
+    opponent_abbr = None
+    if opponent:
+        team = team_index.resolve(opponent)
+        if not team:
+            return None, f"Could not find the {opponent}, format: /gamelog LeBron James opponent:Celtics"
+        opponent_abbr = team['abbreviation']
+
+    try:
+        log = await nba_client.player_game_log(player['id'], season_id)
+    except CircuitOpen:
+        return None, UPSTREAM_DOWN
+    except Exception:
+        return None, f"Exception error, could not retrieve information"
+
+    pages, error = await data_pool.run(game_log_pages, player['full_name'], season_id, log,
+                                       opponent_abbr, location, min_points)
+    return mark_stale(pages, log), error
+
+#Autocomplete, answered from in-memory indexes only so it never waits on the network
+FIRST_SEASON = 1947
+
+def season_range(options):
+    last_season = season_end_year(current_season())
+    if options.get('player'):
+        player = player_index.resolve(options['player'])
+        if player and player['id'] in player_seasons:
+            seasons = player_seasons[player['id']]
+            return season_end_year(seasons[0]), season_end_year(seasons[-1])
+    elif options.get('team'):
+        team = team_index.resolve(options['team'])
+        if team:
+            return team['year_founded'] + 1, last_season
+    return FIRST_SEASON, last_season
+
+async def player_autocomplete(ctx: discord.AutocompleteContext):
+    return [p['full_name'] for p in player_index.complete(ctx.value)]
+
+async def team_autocomplete(ctx: discord.AutocompleteContext):
+    return [t['nickname'] for t in team_index.complete(ctx.value)]
+
+async def stat_autocomplete(ctx: discord.AutocompleteContext):
+    typed = (ctx.value or "").lower()
+    return [stat for stat in sorted(valid_stats) if stat.startswith(typed)][:25]
+
+async def season_autocomplete(ctx: discord.AutocompleteContext):
+    first, last = season_range(ctx.options)
+    typed = (ctx.value or "").strip()
+    return [str(year) for year in range(last, first - 1, -1) if str(year).startswith(typed)][:25]
+
+#Run a get_* lookup under the command's deadline, turning overload/timeouts into an error message
+async def run_lookup(command, lookup):
+    #Everything this handler does from here on (fetch, parse, format, send) is labelled with the command
+    metrics.current_command.set(command)
+    try:
+        return await asyncio.wait_for(lookup, timeout=command_deadlines[command])
+    except PoolBusy:
+        registry.inc('nba_command_errors_total', command=command, reason='busy')
+        return None, "⚠️ The bot is busy right now. Try again in a few seconds."
+    except asyncio.TimeoutError:
+        registry.inc('nba_command_errors_total', command=command, reason='timeout')
+        return None, "⚠️ Request timed out. Try again later."
+
+#Seasons to page through for a player/team. Normally recorded when this process formatted them;
+#if another shard did the formatting, they come from the (shared, cached) full lookup instead,
+#run under the command's deadline like any other lookup.
+async def known_seasons(command, seen, key, full_lookup):
+    if key in seen:
+        return seen[key], None
+    stats, error = await run_lookup(command, full_lookup())
+    if stats:
+        seen[key] = sorted(stats)
+    return seen.get(key), error
+
+#Seasons for a SeasonView opened on first_season, just that one if the full list isn't available
+async def view_seasons(command, seen, key, full_lookup, first_season):
+    seasons, _ = await known_seasons(command, seen, key, full_lookup)
+    return seasons if seasons and first_season in seasons else [first_season]
+
+#Page loaders for SeasonView, one season at a time through the same cached lookups
+async def player_page(player, season_id):
+    stats, error = await run_lookup('playerstats', get_player_stats(player, str(season_end_year(season_id))))
+    return (stats[season_id] + stats.note if stats else None), error
+
+async def team_page(team, season_id):
+    stats, error = await run_lookup('teamstats', get_team_stats(team, str(season_end_year(season_id))))
+    return (stats[season_id] + stats.note if stats else None), error
+
+async def roster_page(team, season_id):
+    return await run_lookup('roster', get_team_roster(team, str(season_end_year(season_id))))
+
+async def game_log_page(player, season_id, *filters):
+    return await run_lookup('gamelog', get_game_log(player, season_id, *filters))
+
+async def leaders_page(stat, season_id):
+    return await run_lookup('seasonleaders', get_league_leaders(stat, str(season_end_year(season_id))))
+
+#Same lookups (and defaults) the commands use, keyed by command, for the cache warmer.
+#/gamelog isn't warmed: its lookup isn't in result_cache, and its default season depends on the player.
+warm_lookups = {
+    'playerstats': get_player_stats,
+    'teamstats': lambda team, season: get_team_range(team, season) if is_range(season) else get_team_stats(team, season),
+    'roster': lambda team, season: get_team_roster(team, season or default_season()),
+    'seasonleaders': lambda stat, season: get_range_leaders(stat, season) if is_range(season) else get_league_leaders(stat, season or default_season()),
+    'alltimeleaders': lambda stat, season: get_range_leaders(stat, season) if is_range(season) else get_league_leaders(stat),
+    'compare': get_player_comparison,
+}
+
+#Which players/teams/stats get asked for, shared by every shard process
+query_log = QueryLog()
+#Warming backs off whenever stats.nba.com is struggling or users are keeping the worker pool busy
+cache_warmer = CacheWarmer(query_log, warm_lookups,
+                           can_run=lambda: nba_client.breaker.state == 'closed' and data_pool.stats()['queue_depth'] == 0)
+
+#Background job: flush the query counts every minute; the primary process also warms the hottest
+#entries right after startup and then every CACHE_WARM_INTERVAL
+async def keep_cache_warm():
+    while True:
+        try:
+            query_log.flush()
+            if PRIMARY and time.time() - cache_warmer.last_run >= CACHE_WARM_INTERVAL:
+                warmed = await cache_warmer.warm()
+                if warmed:
+                    print(f"Cache warmer refreshed {warmed} popular lookup(s)")
+        except Exception as e:
+            print(f"Cache warming failed: {e}")
+        await asyncio.sleep(FLUSH_INTERVAL)
 
 # /greet
 @bot.slash_command(name="greet", description="Say hello to the bot!")
@@ -377,10 +947,15 @@ async def commandlist(ctx):
         "/commands       - Show a list of all commands\n"
         "/playerstats    - Show stats for a specific player. Format: /playerstats Anthony Edwards 2025\n"
         "/teamstats      - Show stats for a specific team.   Format: /teamstats Timberwolves 2025\n"
-        "/roster         - Show the roster for a team. Format: /teamroster Lakers 2025"
-        "/compare        - Compare 2 separate players' stats. Format: /compare Michael Jordan, LeBron James\n"
-        "/leaders        - Show the league's top 10 leaders in a stat. Format: /leaders Assists 2025\n"
-        "/alltime        - Show the all-time leaders for a stat. Format: /alltime Points\n"
+        "                  or a range: /teamstats Lakers season_from:2001 season_to:2010\n"
+        "/roster         - Show the roster for a team. Format: /roster Lakers 2025\n"
+        "/compare        - Compare 2 or more players' stats. Format: /compare Michael Jordan, LeBron James\n"
+        "/gamelog        - Show a player's games in a season. Format: /gamelog LeBron James 2025\n"
+        "/seasonleaders  - Show the league's top 10 leaders in a stat. Format: /seasonleaders Assists 2025\n"
+        "                  or a range: /seasonleaders Assists season_from:2010 season_to:2020\n"
+        "/alltimeleaders - Show the all-time leaders for a stat. Format: /alltimeleaders Points\n"
+        "                  or best over any 5 seasons: /alltimeleaders 3p% span:5\n"
+        "/live           - Follow today's games with live scores in this channel. Format: /live Lakers\n"
         "/randomplayer   - Generates a random NBA player. Format: /randomplayer\n"
         "```"
         "\n**Note:** If no year is added, the default will be all time."
@@ -412,161 +987,318 @@ async def stathelp(ctx):
 @bot.slash_command(name="playerstats", description="Get stats for any NBA Player")
 async def playerstats(
     ctx,
-    player: Option(str, description="Enter a player (e.g. LeBron James)"),  # type: ignore
-    season: Option(str, description="Enter a season year (e.g. 2025)", required=False)  # type: ignore
+    player: Option(str, description="Enter a player (e.g. LeBron James)", autocomplete=player_autocomplete),  # type: ignore
+    season: Option(str, description="Enter a season year (e.g. 2025)", required=False, autocomplete=season_autocomplete)  # type: ignore
 ):
     await ctx.defer()
 
-    try:
-        stats_dict, error = await asyncio.wait_for(
-            asyncio.to_thread(get_player_stats, player, season),
-            timeout=5
-        )
-    except asyncio.TimeoutError:
-        await ctx.followup.send("⚠️ Request timed out. Try again later.")
-        return
+    stats_dict, error = await run_lookup('playerstats', get_player_stats(player, season))
 
     if error:
-        await ctx.followup.send(error)
+        await outbound.notify(ctx, error)
         return
 
     # Sort seasons oldest to newest
     seasons = sorted(stats_dict.keys(), reverse=False)
     if not seasons:
-        await ctx.followup.send(f"No stats found for {player}.")
+        await outbound.notify(ctx, f"No stats found for {player}.")
         return
 
     # No season specified - show career stats
     if not season:
-        career_text = "\n".join(stats_dict[s] for s in seasons)
-        await ctx.followup.send(f"```{career_text}```")
+        career_text = "\n".join(stats_dict[s] for s in seasons) + stats_dict.note
+        await outbound.reply(ctx, career_text)
         return
 
-    # Season specified - show specific season with buttons
-    converted = season_to_year(season)
-    start_index = 0
-    if converted and converted in seasons:
-        start_index = seasons.index(converted)
-
-    first_season = seasons[start_index]
-    view = SeasonView(ctx, stats_dict, seasons, initial_index=start_index)
+    # Season specified - show it with buttons that walk the rest of the career
+    first_season = seasons[0]
+    seasons = await view_seasons('playerstats', player_seasons, get_player_id(player), lambda: get_player_stats(player), first_season)
+    page = stats_dict[first_season] + stats_dict.note
+    view = SeasonView(ctx, seasons, lambda s: player_page(player, s), seasons.index(first_season), {first_season: page})
 
-    await ctx.followup.send(f"```{stats_dict[first_season]}```", view=view)
+    await outbound.reply(ctx, page, view=view)
 
 # /teamstats
 @bot.slash_command(name="teamstats", description="Get stats for any NBA Team")
 async def teamstats(
     ctx,
-    team: Option(str, description="Enter a team (e.g. Lakers)"),  # type: ignore
-    season: Option(str, description="Enter a season year (e.g. 2025)", required=True)  # type: ignore
+    team: Option(str, description="Enter a team (e.g. Lakers)", autocomplete=team_autocomplete),  # type: ignore
+    season: Option(str, description="Enter a season year (e.g. 2025)", required=False, autocomplete=season_autocomplete),  # type: ignore
+    season_from: Option(str, description="First season of a range (e.g. 2001)", required=False, autocomplete=season_autocomplete),  # type: ignore
+    season_to: Option(str, description="Last season of a range (e.g. 2010)", required=False, autocomplete=season_autocomplete)  # type: ignore
 ):
     await ctx.defer()
 
-    try:
-        stats_dict, error = await asyncio.wait_for(
-            asyncio.to_thread(get_team_stats, team, season),
-            timeout=5
-        )
-    except asyncio.TimeoutError:
-        await ctx.followup.send("⚠️ Request timed out. Try again later.")
+    # Range - one summary for every season in it
+    if season_from or season_to:
+        stats, error = await run_lookup('teamstats', get_team_range(team, range_key(season_from, season_to)))
+        if error:
+            await outbound.notify(ctx, error)
+        else:
+            await outbound.reply(ctx, stats)
         return
 
+    if not season:
+        await outbound.notify(ctx, f"Enter a season or a range, format: /teamstats {team} 2025 or /teamstats {team} season_from:2001 season_to:2010")
+        return
+
+    stats_dict, error = await run_lookup('teamstats', get_team_stats(team, season))
+
     if error:
-        await ctx.followup.send(error)
+        await outbound.notify(ctx, error)
         return
 
     # Sort seasons oldest to newest
     seasons = sorted(stats_dict.keys(), reverse=False)
     if not seasons:
-        await ctx.followup.send(f"No stats found for {team}.")
+        await outbound.notify(ctx, f"No stats found for {team}.")
         return
 
-    # Season specified - show specific season with buttons
-    converted = season_to_year(season)
-    start_index = 0
-    if converted and converted in seasons:
-        start_index = seasons.index(converted)
+    # Season specified - show it with buttons that walk the franchise history
+    first_season = seasons[0]
+    seasons = await view_seasons('teamstats', team_seasons, get_team_id(team), lambda: get_team_stats(team), first_season)
+    page = stats_dict[first_season] + stats_dict.note
+    view = SeasonView(ctx, seasons, lambda s: team_page(team, s), seasons.index(first_season), {first_season: page})
 
-    first_season = seasons[start_index]
-    view = SeasonView(ctx, stats_dict, seasons, initial_index=start_index)
-
-    await ctx.followup.send(f"```{stats_dict[first_season]}```", view=view)
+    await outbound.reply(ctx, page, view=view)
 
 # /roster
 @bot.slash_command(name='roster', description="Get any NBA roster")
 async def roster(
     ctx,
-    team: Option(str, description="Enter a Team (e.g. Lakers)"),  # type: ignore
-    season: Option(str, description="Enter a season year (e.g. 2025)")  # type: ignore
+    team: Option(str, description="Enter a Team (e.g. Lakers)", autocomplete=team_autocomplete),  # type: ignore
+    season: Option(str, description="Enter a season year (e.g. 2025)", autocomplete=season_autocomplete)  # type: ignore
 ):
     await ctx.defer()
 
-    if season:
-        await ctx.respond(f"Getting roster for the **{team}** in _{season}_")
-    else:
-        season = str(2025)
-        await ctx.respond(f"Getting the current roster for the **{team}** ")
+    if not season:
+        season = default_season()
 
-    stats, error = get_team_roster(team, season)
+    stats, error = await run_lookup('roster', get_team_roster(team, season))
 
     if error:
-        await ctx.followup.send(error)
+        await outbound.notify(ctx, error)
+        return
+
+    shown = season_to_year(season)
+    if not shown:
+        await outbound.reply(ctx, stats)
         return
 
-    # Apply SeasonView with arrow functionality
-    seasons = [season]
-    data = {season: stats}
-    view = SeasonView(ctx, data, seasons, initial_index=0)
+    # Arrows walk every season since the franchise was founded
+    founded = team_index.resolve(team)['year_founded']
+    seasons = seasons_between(founded + 1, season_end_year(current_season()))
+    if shown not in seasons:
+        seasons = sorted(seasons + [shown])
+    view = SeasonView(ctx, seasons, lambda s: roster_page(team, s), seasons.index(shown), {shown: stats})
 
-    await ctx.followup.send(f"```{stats}```", view=view)
+    await outbound.reply(ctx, stats, view=view)
 
 # /seasonleaders
 @bot.slash_command(name='seasonleaders', description="Get the league leaders for any stat. (/stathelp for available stats)")
 async def seasonleaders(
     ctx,
-    stat: Option(str, description="Enter a stat (e.g. Points)"),  # type: ignore
-    season: Option(str, description="Enter a season year (e.g. 2025)", required=False)  # type: ignore
+    stat: Option(str, description="Enter a stat (e.g. Points)", autocomplete=stat_autocomplete),  # type: ignore
+    season: Option(str, description="Enter a season year (e.g. 2025)", required=False, autocomplete=season_autocomplete),  # type: ignore
+    season_from: Option(str, description="First season of a range (e.g. 2010)", required=False, autocomplete=season_autocomplete),  # type: ignore
+    season_to: Option(str, description="Last season of a range (e.g. 2020)", required=False, autocomplete=season_autocomplete)  # type: ignore
 ):
     await ctx.defer()
 
-    if season:
-        await ctx.respond(f"Getting leaders for **{stat}** in _{season}_")
-    else:
-        season = str(2025)
-        await ctx.respond(f"Getting the current season leaders for _{stat}_")
+    # Range - leaders on their totals across those seasons
+    if season_from or season_to:
+        stats, error = await run_lookup('seasonleaders', get_range_leaders(stat, range_key(season_from, season_to)))
+        if error:
+            await outbound.notify(ctx, error)
+        else:
+            await outbound.reply(ctx, stats)
+        return
 
-    stats, error = get_league_leaders(stat, season)
+    if not season:
+        season = default_season()
+
+    stats, error = await run_lookup('seasonleaders', get_league_leaders(stat, season))
 
     if error:
-        await ctx.respond(error)
+        await outbound.notify(ctx, error)
         return
 
-    # Apply SeasonView to enable arrow navigation
-    seasons = [season]
-    data = {season: stats}
-    view = SeasonView(ctx, data, seasons, initial_index=0)
+    # Arrows walk every season the league has leaders for
+    shown = season_to_year(season)
+    seasons = all_seasons()
+    if shown not in seasons:
+        seasons = sorted(seasons + [shown])
+    view = SeasonView(ctx, seasons, lambda s: leaders_page(stat, s), seasons.index(shown), {shown: stats})
 
-    await ctx.followup.send(f"```{stats}```", view=view)
+    await outbound.reply(ctx, stats, view=view)
 
 
 # /alltimeleaders
 @bot.slash_command(name = 'alltimeleaders', description = "Get the all-time leaders for any stat. (/stathelp for available stats)")
 async def alltimeleaders(
     ctx,
-    stat: Option(str, description="Enter a stat (e.g. Points)"), # type: ignore
+    stat: Option(str, description="Enter a stat (e.g. Points)", autocomplete=stat_autocomplete), # type: ignore
+    season_from: Option(str, description="Only count seasons from this one (e.g. 2010)", required=False, autocomplete=season_autocomplete),  # type: ignore
+    season_to: Option(str, description="Only count seasons up to this one (e.g. 2020)", required=False, autocomplete=season_autocomplete),  # type: ignore
+    span: Option(int, description="Best run of this many seasons in a row (e.g. 5)", required=False, min_value=2, max_value=20)  # type: ignore
 ):
     await ctx.defer()
-    await ctx.respond(f"Getting the all time leaders for _{stat}_")
 
-    stats, error = get_league_leaders(stat)
+    if season_from or season_to or span:
+        stats, error = await run_lookup('alltimeleaders', get_range_leaders(stat, range_key(season_from, season_to, span)))
+    else:
+        stats, error = await run_lookup('alltimeleaders', get_league_leaders(stat))
                                                 
     if error:
-        await ctx.respond(error)
+        await outbound.notify(ctx, error)
     else:
-        await charlimit(ctx, stats)
+        await outbound.reply(ctx, stats)
         
+# /compare
+@bot.slash_command(name='compare', description="Compare the stats of 2 or more NBA players")
+async def compare(
+    ctx,
+    players: Option(str, description="Enter players separated by commas (e.g. Michael Jordan, LeBron James)"),  # type: ignore
+    season: Option(str, description="Enter a season year (e.g. 2025)", required=False, autocomplete=season_autocomplete)  # type: ignore
+):
+    await ctx.defer()
+
+    stats, error = await run_lookup('compare', get_player_comparison(players, season))
+
+    if error:
+        await outbound.notify(ctx, error)
+    else:
+        await outbound.reply(ctx, stats)
+
+# /gamelog
+@bot.slash_command(name='gamelog', description="Get game-by-game stats for any NBA Player")
+async def gamelog(
+    ctx,
+    player: Option(str, description="Enter a player (e.g. LeBron James)", autocomplete=player_autocomplete),  # type: ignore
+    season: Option(str, description="Enter a season year (e.g. 2025), defaults to their latest", required=False, autocomplete=season_autocomplete),  # type: ignore
+    opponent: Option(str, description="Only games against this team (e.g. Celtics)", required=False, autocomplete=team_autocomplete),  # type: ignore
+    location: Option(str, description="Only home or away games", required=False, choices=LOCATIONS),  # type: ignore
+    min_points: Option(int, description="Only games with at least this many points", required=False, min_value=0)  # type: ignore
+):
+    await ctx.defer()
+
+    player_id = get_player_id(player)
+    if not player_id:
+        await outbound.notify(ctx, f"Could not find {player}")
+        return
+
+    season_id = season_to_year(season) if season else None
+    if season and not season_id:
+        await outbound.notify(ctx, f"Enter a season year, format: /gamelog {player} 2025")
+        return
+
+    seasons, error = await known_seasons('gamelog', player_seasons, player_id, lambda: get_player_stats(player))
+    if not seasons:
+        #Without the career list a named season can still be shown, just without the other seasons to page to
+        if not season_id:
+            await outbound.notify(ctx, error or f"No stats found for {player}.")
+            return
+        seasons = [season_id]
+
+    season_id = season_id or seasons[-1]
+    if season_id not in seasons:
+        await outbound.notify(ctx, f"{player} didn't play in {season_id}.")
+        return
+
+    filters = (opponent, location, min_points)
+    pages, error = await game_log_page(player, season_id, *filters)
+    if error:
+        await outbound.notify(ctx, error)
+        return
+
+    view = GameLogView(ctx, seasons, lambda s: game_log_page(player, s, *filters), seasons.index(season_id), {season_id: pages})
+    await outbound.reply(ctx, view.show(pages), view=view)
+
+# /live
+@bot.slash_command(name='live', description="Follow today's games with live scores in this channel")
+async def live(
+    ctx,
+    team: Option(str, description="Only follow this team's game (e.g. Lakers)", required=False, autocomplete=team_autocomplete),  # type: ignore
+    stop: Option(bool, description="Stop live scores in this channel", required=False, default=False)  # type: ignore
+):
+    if stop:
+        if live_poller.unsubscribe(ctx.channel.id):
+            await outbound.respond(ctx, "Stopped live scores in this channel.")
+        else:
+            await outbound.respond(ctx, "This channel isn't following live scores.")
+        return
+
+    team_id = None
+    if team:
+        team_id = get_team_id(team)
+        if not team_id:
+            await outbound.respond(ctx, f"Could not find the {team}, format: /live Lakers")
+            return
+
+    live_poller.subscribe(ctx.channel, team_id)
+    following = f"the **{team}**" if team else "today's games"
+    await outbound.respond(ctx, f"Following {following} here, scores update in place. Use `/live stop:True` to stop.")
+
+# /botstats
+#Admins only: set BOT_ADMIN_IDS to a comma separated list of user ids, otherwise server admins
+BOT_ADMIN_IDS = {int(i) for i in os.getenv('BOT_ADMIN_IDS', '').split(',') if i.strip()}
+
+def is_bot_admin(ctx):
+    if BOT_ADMIN_IDS:
+        return ctx.author.id in BOT_ADMIN_IDS
+    permissions = getattr(ctx.author, 'guild_permissions', None)
+    return bool(permissions and permissions.administrator)
+
+def botstats_text():
+    counters, histograms = registry.snapshot()
+    lines = ["Latency p50/p95 ms per phase"]
+    for (name, labels), histogram in sorted(histograms.items()):
+        if name not in ('nba_phase_seconds', 'nba_command_seconds'):
+            continue
+        label = " ".join(str(value) for _, value in labels) if name == 'nba_phase_seconds' else f"{dict(labels)['command']} total"
+        lines.append(f"  {label:<28} {histogram.percentile(0.5) * 1000:7.1f} {histogram.percentile(0.95) * 1000:7.1f}  (n={histogram.count})")
+
+    lookups = response_cache.hits + response_cache.misses
+    hit_rate = f"{response_cache.hits / lookups * 100:.1f}%" if lookups else "n/a"
+    pool = data_pool.stats()
+    upstream = {}
+    for (name, labels), value in counters.items():
+        if name == 'nba_upstream_requests_total':
+            outcome = dict(labels)['outcome']
+            upstream[outcome] = upstream.get(outcome, 0) + value
+    errors = {f"{dict(labels)['command']} {dict(labels)['reason']}": value
+              for (name, labels), value in counters.items() if name == 'nba_command_errors_total'}
+    lines += [
+        "",
+        f"Cache: {response_cache.hits} hits, {response_cache.misses} misses ({hit_rate}), {response_cache.stale_hits} stale, "
+        f"{nba_client.stale_served} served stale",
+        f"Upstream: " + (", ".join(f"{k} {v}" for k, v in sorted(upstream.items())) or "no requests yet"),
+        f"Breaker: {nba_client.breaker.state}, opened {nba_client.breaker.times_opened}x",
+        f"Scheduler: {nba_client.scheduler.stats()}",
+        f"Lookups: {lookup_flight.started} started, {lookup_flight.coalesced} coalesced, {lookup_flight.in_flight()} in flight",
+        f"Pool: {pool['pending']} pending, queue {pool['queue_depth']}, {pool['rejected']} rejected, wait p50 {pool['wait_p50_ms']} ms",
+        f"Command errors: " + (", ".join(f"{k} {v}" for k, v in sorted(errors.items())) or "none"),
+        f"Live: {live_poller.stats()}",
+        f"Outbound: {outbound.stats()}",
+        f"History: {history.stats()}",
+        f"Cache warmer: {cache_warmer.stats()}",
+    ]
+    if profiler.samples:
+        lines += ["", f"Profiler hot spots ({profiler.samples} samples)"]
+        lines += [f"  {share * 100:5.1f}% {function}" for function, share in profiler.top(8)]
+    return "\n".join(lines)
+
+@bot.slash_command(name='botstats', description="Bot performance stats (admins only)")
+@discord.default_permissions(administrator=True)
+async def botstats(ctx):
+    if not is_bot_admin(ctx):
+        await outbound.respond(ctx, "This command is for bot admins only.", ephemeral=True)
+        return
+    await outbound.respond(ctx, f"```{botstats_text()[:1900]}```", ephemeral=True)
+
 # Run the bot with your Discord bot token
-if token:
-    bot.run(token)
-else: 
-    print("Could not find token")
+if __name__ == "__main__":
+    if token:
+        bot.run(token)
+    else:
+        print("Could not find token")
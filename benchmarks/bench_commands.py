@@ -0,0 +1,170 @@
+#End-to-end command benchmark against the local stub server, no Discord or network needed.
+#Drives the real slash command handlers with a fake ctx and reports latency per command.
+#Run from the repo root: python benchmarks/bench_commands.py --requests 400 --concurrency 20 --latency-ms 150
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stub_server
+
+PLAYERS = ["LeBron James", "Stephen Curry", "Kevin Durant", "Nikola Jokic", "Giannis Antetokounmpo",
+           "Luka Doncic", "Jayson Tatum", "Michael Jordan", "Kobe Bryant", "Tim Duncan", "lebron", "steph curry"]
+TEAMS = ["Lakers", "Celtics", "Warriors", "Bulls", "Spurs", "Heat", "Knicks", "Nuggets", "lal", "boston"]
+STATS = ["points", "rebounds", "assists", "fg%", "3p%", "steals", "minutes"]
+SEASONS = [str(year) for year in range(2016, 2026)]
+
+#Stands in for discord.ApplicationContext: records what the handler sends back
+class FakeContext:
+    class Author:
+        mention = "<@0>"
+
+    class Followup:
+        def __init__(self, ctx):
+            self.ctx = ctx
+
+        async def send(self, content=None, embeds=None, **kwargs):
+            self.ctx.record(content, embeds)
+
+    class Interaction:
+        def __init__(self, ctx):
+            self.ctx = ctx
+
+        async def edit_original_response(self, content=None, embeds=None, **kwargs):
+            self.ctx.record(content, embeds)
+
+    channels = itertools.count()
+
+    def __init__(self, command):
+        self.command = command
+        self.channel_id = next(self.channels)
+        self.author = self.Author()
+        self.followup = self.Followup(self)
+        self.interaction = self.Interaction(self)
+        self.sent = []
+
+    def record(self, content, embeds):
+        self.sent.append(content)
+        self.sent += [embed.description for embed in embeds or []]
+
+    async def defer(self):
+        pass
+
+    async def respond(self, content=None, **kwargs):
+        self.sent.append(content)
+
+def workload(nba, count, rng):
+    commands = [
+        lambda: (nba.playerstats, (rng.choice(PLAYERS), rng.choice([None, rng.choice(SEASONS)]))),
+        lambda: (nba.teamstats, (rng.choice(TEAMS), rng.choice(SEASONS), None, None)),
+        lambda: (nba.roster, (rng.choice(TEAMS), rng.choice(SEASONS))),
+        lambda: (nba.seasonleaders, (rng.choice(STATS), rng.choice(SEASONS), None, None)),
+        lambda: (nba.alltimeleaders, (rng.choice(STATS), None, None, None)),
+        lambda: (nba.compare, (", ".join(rng.sample(PLAYERS[:10], rng.randint(2, 4))), rng.choice([None, rng.choice(SEASONS)]))),
+        lambda: (nba.gamelog, (rng.choice(PLAYERS), rng.choice([None, rng.choice(SEASONS[:-2])]), rng.choice([None, None, "Celtics"]),
+                               rng.choice([None, "home", "away"]), rng.choice([None, 20]))),
+    ]
+    return [rng.choice(commands)() for _ in range(count)]
+
+async def run_one(command, args, results):
+    ctx = FakeContext(command)
+    start = time.perf_counter()
+    try:
+        await command.callback(ctx, *args)
+        failed = any(message and message.startswith(("⚠️", "Exception", "Error")) for message in ctx.sent)
+    except Exception:
+        failed = True
+    results.setdefault(command.name, []).append((time.perf_counter() - start, failed))
+
+async def run(nba, jobs, concurrency):
+    results = {}
+    gate = asyncio.Semaphore(concurrency)
+
+    async def limited(command, args):
+        async with gate:
+            await run_one(command, args, results)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(limited(command, args) for command, args in jobs))
+    return results, time.perf_counter() - start
+
+#Give background work the commands started (SeasonView prefetches) a moment to finish before shutting down.
+#Other tasks, like the stub's keep-alive handlers, never finish on their own, hence the timeout.
+async def drain(timeout=5):
+    tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    if tasks:
+        await asyncio.wait(tasks, timeout=timeout)
+
+def percentile(values, p):
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+def report(results, elapsed):
+    print(f"{'command':<16}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    total = 0
+    for name, samples in sorted(results.items()):
+        times = sorted(t * 1000 for t, _ in samples)
+        errors = sum(failed for _, failed in samples)
+        total += len(samples)
+        print(f"{name:<16}{len(samples):>6}{percentile(times, 0.5):>10.1f}{percentile(times, 0.95):>10.1f}"
+              f"{percentile(times, 0.99):>10.1f}{errors:>8}")
+    print(f"{total} commands in {elapsed:.2f}s, {total / elapsed:.1f} commands/s")
+
+def stub_server_requests(runner):
+    return sum(runner.app['requests'].values())
+
+async def main(args):
+    runner, base_url = await stub_server.start(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate, seed=args.seed
+    )
+    #The bot reads these at import time, so it's imported only once the stub is up
+    os.environ['NBA_STATS_URL'] = base_url + "/stats/{endpoint}"
+    os.environ['NBA_LIVE_URL'] = base_url + "/liveData/{endpoint}"
+    os.environ['NBA_CACHE_PATH'] = ':memory:'
+    os.environ['NBA_HISTORY_PATH'] = ':memory:'
+    os.environ['QUERY_LOG_PATH'] = ':memory:'
+    os.environ['LEADERS_STORE_PATH'] = tempfile.mkdtemp(prefix='leaders_store_')
+    import NBADiscordBot as nba
+
+    rng = random.Random(args.seed)
+    if args.cache == 'cold':
+        nba.nba_client.cache = None
+    elif args.cache == 'warmer':
+        #Yesterday's traffic goes into the query log, then the warmer prefetches the hottest of it
+        for command, command_args in workload(nba, args.requests, random.Random(args.seed + 1)):
+            nba.query_log.record(command.name, *command_args[:2])
+        nba.query_log.flush()
+        nba.cache_warmer.rate = 1000
+        print(f"warmer prefetched {await nba.cache_warmer.warm()} lookups")
+    else:
+        await run(nba, workload(nba, args.requests, rng), args.concurrency)
+
+    upstream = stub_server_requests(runner)
+    results, elapsed = await run(nba, workload(nba, args.requests, rng), args.concurrency)
+    print(f"{args.cache} cache, concurrency {args.concurrency}, stub latency {args.latency_ms}±{args.jitter_ms} ms, "
+          f"error rate {args.error_rate}")
+    report(results, elapsed)
+    print(f"upstream requests: {stub_server_requests(runner) - upstream}, "
+          f"coalesced lookups: {nba.lookup_flight.coalesced}, pool: {nba.data_pool.stats()}")
+
+    await drain()
+    await nba.nba_client.close()
+    await runner.cleanup()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark slash commands against the local stub server")
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--cache', choices=['cold', 'warm', 'warmer'], default='cold',
+                        help="cold: every lookup goes to the stub; warm: run the workload once first; "
+                             "warmer: let the cache warmer prefetch from a logged workload first")
+    parser.add_argument('--latency-ms', type=float, default=100)
+    parser.add_argument('--jitter-ms', type=float, default=30)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,145 @@
+#Micro-benchmark: columnar format_* functions vs the old row-by-row iterrows() versions.
+#Player and team stats come back as records, rendered here to compare the text.
+#Run from the repo root: python benchmarks/bench_formatting.py
+import os
+import sys
+import timeit
+
+os.environ.setdefault('NBA_CACHE_PATH', ':memory:')
+os.environ.setdefault('NBA_HISTORY_PATH', ':memory:')
+os.environ.setdefault('QUERY_LOG_PATH', ':memory:')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import NBADiscordBot as nba
+import nba_client
+import synthetic
+
+#The previous row-by-row implementations, kept here as the reference output
+def legacy_player_stats(player_name, career):
+    df = nba.result_frames(career)['SeasonTotalsRegularSeason'].sort_values(by='SEASON_ID')
+    season_stats = {}
+    for _, row in df.iterrows():
+        seasonId = row['SEASON_ID']
+        team_abbr = row['TEAM_ABBREVIATION']
+        games = row['GP']
+        if games == 0:
+            continue
+        ppg = round(row['PTS'] / games, 1)
+        rpg = round(row['REB'] / games, 1)
+        apg = round(row['AST'] / games, 1)
+        bpg = round(row['BLK'] / games, 1)
+        spg = round(row['STL'] / games, 1)
+        tovpg = round(row['TOV'] / games, 1)
+        pfpg = round(row['PF'] / games, 1)
+        fgmpg = round(row['FGM'] / games, 1)
+        fg3mpg = round(row['FG3M'] / games, 1)
+        season_stats[seasonId] = (
+            f"{player_name}: {team_abbr} {seasonId}: GP: {games}, "
+            f"PPG: {ppg}, RPG: {rpg}, APG: {apg}, "
+            f"BPG: {bpg}, SPG: {spg}, TO: {tovpg}, "
+            f"PF: {pfpg}, FGM: {fgmpg}, 3PM: {fg3mpg}"
+        )
+    return season_stats, None
+
+def legacy_team_stats(career):
+    df = nba.result_frames(career)['TeamStats'].sort_values(by='YEAR')
+    stats_strings = []
+    for _, row in df.iterrows():
+        games = row['GP']
+        ppg = round(row['PTS'] / games, 1)
+        rpg = round(row['REB'] / games, 1)
+        apg = round(row['AST'] / games, 1)
+        head = (f"{row['TEAM_CITY']} {row['YEAR']}: {row['WINS']}-{row['LOSSES']} ({row['WIN_PCT']*100:.1f}% win), "
+                f"PPG {ppg}, APG {apg}, RPG {rpg}, ")
+        po_wins, po_losses = row['PO_WINS'], row['PO_LOSSES']
+        if po_losses == 0 and po_wins == 0:
+            stats_strings.append(head + "Did not make the Playoffs")
+            continue
+        if po_wins < 4:
+            result = "Eliminated in the First Round"
+        elif po_wins < 8:
+            result = "Eliminated in the Second Round"
+        elif po_wins < 12:
+            result = "Eliminated in the Conference Finals"
+        elif po_wins < 16:
+            result = "Lost in the Finals"
+        else:
+            result = "Won the Championship!"
+        stats_strings.append(head + f"Playoffs W-L: {po_wins}-{po_losses}, {result}")
+    return "\n".join(stats_strings), None
+
+def legacy_league_leaders(stat, leaders):
+    df = nba.result_frames(leaders)['LeagueLeaders']
+    if stat == "fg%":
+        df = df[df["FGM"] > 150]
+    elif stat == "3p%":
+        df = df[df["FG3M"] > 82]
+    elif stat == "ft%":
+        df = df[df["FTM"] > 150]
+    base_column = nba.league_stats[stat]
+    df = df[df["GP"] > 0]
+    if stat in nba.per_game_stats:
+        sort_column = nba.per_game_stats[stat]
+        df.loc[:, sort_column] = df[base_column] / df["GP"]
+    else:
+        sort_column = base_column
+    df = df.sort_values(by=sort_column, ascending=False).head(10)
+    results = []
+    for rank, (_, row) in enumerate(df.iterrows(), start=1):
+        value = row[sort_column]
+        if stat in nba.pct_stats and isinstance(value, (int, float)):
+            value *= 100
+        formatted_value = f"{value:.1f}" if isinstance(value, (int, float)) else str(value)
+        results.append(f"{rank}. {row['PLAYER']} - {nba.stat_display_names[stat]}: {formatted_value}")
+    return "\n".join(results), None
+
+#Players tied on a value may come back in a different order: the old quicksort-based
+#sort_values wasn't stable, nlargest keeps upstream order. Everything else must match exactly.
+def canonical(output):
+    text, error = output
+    if not isinstance(text, str) or not text[:1].isdigit():
+        return output
+    lines = [line.split(". ", 1) for line in text.split("\n")]
+    return [rank for rank, _ in lines], sorted(rest for _, rest in lines), [rest.rsplit(": ", 1)[1] for _, rest in lines], error
+
+#Every season of a records result turned into text, as {season: text} or joined by join
+def rendered(output, join=dict):
+    stats, error = output
+    if join is dict:
+        return {season: stats[season] for season in stats}, error
+    return join(stats[season] for season in stats), error
+
+def bench(label, old, new, number):
+    assert canonical(old()) == canonical(new()), f"{label}: output changed"
+    old_time = timeit.timeit(old, number=number) / number
+    new_time = timeit.timeit(new, number=number) / number
+    print(f"{label:<24} old {old_time * 1000:8.3f} ms   new {new_time * 1000:8.3f} ms   {old_time / new_time:5.1f}x")
+
+def run_all(career, history, leaders):
+    bench("playerstats (career)",
+          lambda: legacy_player_stats("Test Player", career),
+          lambda: rendered(nba.format_player_stats("Test Player", 1, career)),
+          200)
+    bench("teamstats (history)",
+          lambda: legacy_team_stats(history),
+          lambda: rendered(nba.format_team_stats("Lakers", 1, history), "\n".join),
+          200)
+    for stat in ["points", "rebounds", "fg%", "3p%", "minutes"]:
+        bench(f"leaders ({stat})",
+              lambda: legacy_league_leaders(stat, leaders),
+              lambda: nba.format_league_leaders(stat, leaders),
+              100)
+
+if __name__ == "__main__":
+    career = synthetic.career()
+    history = synthetic.team_history()
+    leaders = synthetic.league_leaders()
+
+    print("End to end, json -> DataFrame -> text:")
+    run_all(career, history, leaders)
+
+    #Same again with the json already parsed, which is the part that got vectorized
+    parsed = {id(raw): nba_client.result_frames(raw) for raw in (career, history, leaders)}
+    nba.result_frames = lambda raw: {name: df.copy() for name, df in parsed[id(raw)].items()}
+    print("\nComputation and formatting only, DataFrames prebuilt:")
+    run_all(career, history, leaders)
@@ -0,0 +1,56 @@
+#/gamelog benchmark: time and peak memory to build the first page of a filtered game log, for careers of
+#different lengths. "whole career" loads every season into one DataFrame and filters it, the way a
+#single-frame game log would; "one season" is the generator pipeline /gamelog uses.
+#Run from the repo root: python benchmarks/bench_gamelog.py --careers 1,5,10,20
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import synthetic
+from gamelog import game_log_pages, game_line, GAME_LOG_PAGE_SIZE
+
+FILTERS = ('BOS', 'home', 20)
+
+def whole_career(logs):
+    frames = [pd.DataFrame(log['resultSets'][0]['rowSet'], columns=log['resultSets'][0]['headers']) for log in logs]
+    df = pd.concat(frames, ignore_index=True).iloc[::-1]
+    opponent, location, min_points = FILTERS
+    df = df[df['MATCHUP'].str.endswith(opponent) & df['MATCHUP'].str.contains(' vs. ', regex=False) & (df['PTS'] >= min_points)]
+    return [game_line(game) for game in df.head(GAME_LOG_PAGE_SIZE).to_dict('records')]
+
+def one_season(logs):
+    return game_log_pages("Test Player", "2023-24", logs[-1], *FILTERS)[0][0]
+
+def measure(fn, logs, repeat):
+    fn(logs)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(logs)
+    elapsed = (time.perf_counter() - start) / repeat
+    gc.collect()
+    tracemalloc.start()
+    fn(logs)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed * 1000, peak / 1024
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark building the first /gamelog page")
+    parser.add_argument('--careers', default="1,5,10,20", help="career lengths in seasons")
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"first page, filters {FILTERS}")
+    print(f"{'seasons':>8} {'games':>6} {'whole career ms':>16} {'KiB':>8} {'one season ms':>14} {'KiB':>8}")
+    for seasons in (int(n) for n in args.careers.split(',')):
+        #Upstream responses, as they'd sit in the response cache
+        logs = [synthetic.game_log(1, synthetic.season_id(2024 - seasons + i)) for i in range(seasons)]
+        old_ms, old_kib = measure(whole_career, logs, args.repeat)
+        new_ms, new_kib = measure(one_season, logs, args.repeat)
+        print(f"{seasons:>8} {82 * seasons:>6} {old_ms:>16.2f} {old_kib:>8.0f} {new_ms:>14.2f} {new_kib:>8.0f}")
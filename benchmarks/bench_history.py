@@ -0,0 +1,66 @@
+#History database benchmark: bulk imports a handful of players and teams from the stub server,
+#then runs completed-season commands once answered from the local database and once from upstream.
+#Run from the repo root: python benchmarks/bench_history.py --requests 200 --latency-ms 150
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stub_server
+import bench_commands
+from bench_commands import PLAYERS, TEAMS, SEASONS
+
+def workload(nba, count, rng):
+    commands = [
+        lambda: (nba.playerstats, (rng.choice(PLAYERS), rng.choice(SEASONS))),
+        lambda: (nba.teamstats, (rng.choice(TEAMS), rng.choice(SEASONS), None, None)),
+        lambda: (nba.roster, (rng.choice(TEAMS), rng.choice(SEASONS))),
+        lambda: (nba.compare, (", ".join(rng.sample(PLAYERS[:10], 3)), rng.choice(SEASONS))),
+    ]
+    return [rng.choice(commands)() for _ in range(count)]
+
+async def main(args):
+    runner, base_url = await stub_server.start(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms)
+    os.environ['NBA_STATS_URL'] = base_url + "/stats/{endpoint}"
+    os.environ['NBA_CACHE_PATH'] = ':memory:'
+    os.environ['NBA_HISTORY_PATH'] = os.path.join(tempfile.mkdtemp(prefix='history_'), 'history.sqlite3')
+    os.environ['QUERY_LOG_PATH'] = ':memory:'
+    os.environ['LEADERS_STORE_PATH'] = tempfile.mkdtemp(prefix='leaders_store_')
+    import NBADiscordBot as nba
+    import history
+
+    players = [nba.player_index.resolve(name) for name in PLAYERS]
+    teams = [nba.team_index.resolve(name) for name in TEAMS]
+    imported = await history.bulk_import(nba.nba_client, nba.history, players, teams, teams)
+    print(f"imported {imported}: {nba.history.stats()}")
+    #Every lookup below has to come from the history database or the stub
+    nba.nba_client.cache = None
+    local = nba.history
+
+    print(f"completed seasons only, concurrency {args.concurrency}, stub latency {args.latency_ms}±{args.jitter_ms} ms")
+    for label, db in (("history database", local), ("upstream", history.HistoryDB(':memory:'))):
+        nba.history = db
+        nba.result_cache.clear()
+        before = bench_commands.stub_server_requests(runner)
+        results, elapsed = await bench_commands.run(nba, workload(nba, args.requests, random.Random(args.seed)),
+                                                    args.concurrency)
+        print(f"\n{label}")
+        bench_commands.report(results, elapsed)
+        print(f"upstream requests: {bench_commands.stub_server_requests(runner) - before}")
+
+    await bench_commands.drain()
+    await nba.nba_client.close()
+    await runner.cleanup()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark commands answered from the history database")
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--latency-ms', type=float, default=150)
+    parser.add_argument('--jitter-ms', type=float, default=30)
+    parser.add_argument('--seed', type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
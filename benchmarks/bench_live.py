@@ -0,0 +1,63 @@
+#/live fan-out benchmark: N fake channels follow the scoreboard served by the stub server.
+#Upstream polls should stay flat as --channels grows, and each channel's pending queue stays at
+#most one line per game while sends/edits are paced per channel through Outbound.
+#Run from the repo root: python benchmarks/bench_live.py --channels 1 10 100 --seconds 5
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stub_server
+
+class FakeMessage:
+    def __init__(self, channel):
+        self.channel = channel
+
+    async def edit(self, content=None):
+        self.channel.edits += 1
+
+class FakeChannel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+        self.sends = 0
+        self.edits = 0
+
+    async def send(self, content):
+        self.sends += 1
+        return FakeMessage(self)
+
+async def run(live, NBAStatsClient, Outbound, channels, seconds, args):
+    client = NBAStatsClient()
+    poller = live.LivePoller(client, active_interval=args.poll_interval, outbound=Outbound())
+    fakes = [FakeChannel(i) for i in range(channels)]
+    for channel in fakes:
+        poller.subscribe(channel)
+    await asyncio.sleep(seconds)
+    pending = poller.pending
+    await poller.close()
+    await client.close()
+    sends, edits = sum(c.sends for c in fakes), sum(c.edits for c in fakes)
+    print(f"{channels:>8} {poller.polls:>7} {sends:>7} {edits:>7} {pending:>8} "
+          f"{(sends + edits) / seconds:>11.1f}")
+
+async def main(args):
+    runner, base_url = await stub_server.start(latency_ms=args.latency_ms)
+    os.environ['NBA_LIVE_URL'] = base_url + "/liveData/{endpoint}"
+    import live
+    from nba_client import NBAStatsClient
+    from outbound import Outbound
+
+    print(f"{'channels':>8} {'polls':>7} {'sends':>7} {'edits':>7} {'pending':>8} {'discord/s':>11}")
+    for channels in args.channels:
+        await run(live, NBAStatsClient, Outbound, channels, args.seconds, args)
+    await runner.cleanup()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark /live polling and fan-out against the stub server")
+    parser.add_argument('--channels', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--poll-interval', type=float, default=0.5)
+    parser.add_argument('--latency-ms', type=float, default=50)
+    asyncio.run(main(parser.parse_args()))
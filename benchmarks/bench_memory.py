@@ -0,0 +1,69 @@
+#Memory benchmark: bytes per cached player/team for the old {season: text} dicts vs the compact records,
+#held in memory and as a shared result cache entry, plus peak memory while formatting one response.
+#Run from the repo root: python benchmarks/bench_memory.py --players 2000
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+os.environ.setdefault('NBA_CACHE_PATH', ':memory:')
+os.environ.setdefault('NBA_HISTORY_PATH', ':memory:')
+os.environ.setdefault('QUERY_LOG_PATH', ':memory:')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import NBADiscordBot as nba
+import synthetic
+
+#Every season rendered up front, which is what format_*_stats used to return and SeasonView held
+def as_text(stats):
+    return {season: stats[season] for season in stats}
+
+def held(build, count):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build(i) for i in range(count)]
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return size / count
+
+def peak(fn):
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    result = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result
+
+def report(label, raws, records, count):
+    text_bytes = held(lambda i: as_text(records(raws[i])), count)
+    record_bytes = held(lambda i: records(raws[i]), count)
+    text_json = sum(len(json.dumps(as_text(records(raw)))) for raw in raws) / count
+    record_json = sum(len(json.dumps(records(raw).to_json())) for raw in raws) / count
+    print(f"{label:<8} {'memory':<13} {text_bytes:>10.0f} {record_bytes:>10.0f} {text_bytes / record_bytes:>7.1f}x")
+    print(f"{'':<8} {'cache entry':<13} {text_json:>10.0f} {record_json:>10.0f} {text_json / record_json:>7.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark memory used per cached player and team")
+    parser.add_argument('--players', type=int, default=2000)
+    parser.add_argument('--teams', type=int, default=30)
+    args = parser.parse_args()
+
+    careers = [synthetic.career(i + 1) for i in range(args.players)]
+    histories = [synthetic.team_history(1610612737 + i) for i in range(args.teams)]
+    players = lambda raw: nba.format_player_stats("Test Player", 1, raw)[0]
+    teams = lambda raw: nba.format_team_stats("Lakers", 1, raw)[0]
+
+    print(f"bytes per cached entry ({args.players} players with 20 seasons, {args.teams} teams with 76 seasons)")
+    print(f"{'':<8} {'':<13} {'text':>10} {'records':>10} {'saved':>8}")
+    report("player", careers, players, args.players)
+    report("team", histories, teams, args.teams)
+
+    #Once untimed, so pandas' own import and caches aren't counted
+    nba.result_frames(careers[0])
+    old = peak(lambda: (nba.result_frames(careers[0]), as_text(players(careers[0]))))
+    new = peak(lambda: players(careers[0]))
+    print(f"\npeak while formatting one career: DataFrame + text {old / 1024:.0f} KiB, records {new / 1024:.0f} KiB")
@@ -0,0 +1,82 @@
+#Season-range benchmark: range leaders, best N-season spans and team ranges answered from the local
+#leaders store and a franchise history, against fetching and aggregating one season at a time from the stub.
+#Run from the repo root: python benchmarks/bench_ranges.py --first 2010 --last 2020 --latency-ms 150
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stub_server
+import synthetic
+
+def timed_ms(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+async def main(args):
+    runner, base_url = await stub_server.start(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms)
+    os.environ['NBA_STATS_URL'] = base_url + "/stats/{endpoint}"
+    os.environ['NBA_CACHE_PATH'] = ':memory:'
+    os.environ['NBA_HISTORY_PATH'] = ':memory:'
+    os.environ['QUERY_LOG_PATH'] = ':memory:'
+    os.environ['LEADERS_STORE_PATH'] = tempfile.mkdtemp(prefix='leaders_store_')
+    import pandas as pd
+    import NBADiscordBot as nba
+    from nba_client import result_frames
+
+    #Every season in the store, like after the background sync has finished
+    start = time.perf_counter()
+    seasons = nba.all_seasons()
+    nba.leaders_store.update({season: result_frames(synthetic.league_leaders(season))['LeagueLeaders'] for season in seasons})
+    print(f"leaders store: {len(seasons)} seasons, {len(nba.leaders_store.columns['GP'])} rows, "
+          f"built in {time.perf_counter() - start:.1f}s")
+
+    first, last = nba.season_to_year(str(args.first)), nba.season_to_year(str(args.last))
+    store = nba.leaders_store
+    history = synthetic.team_history()
+    queries = [
+        (f"assists per game {first} to {last}", lambda: store.range_top('assists', first, last)),
+        (f"3p% best {args.span}-season span, all seasons", lambda: store.best_span('3p%', args.span)),
+        (f"points best {args.span}-season span {first} to {last}", lambda: store.best_span('points', args.span, first, last)),
+        (f"team record {first} to {last}", lambda: nba.format_team_range("Lakers", 1610612747, history, first, last)),
+        ("single season (season index)", lambda: store.season_columns(last)),
+    ]
+    print(f"\n{'local query':<44}{'ms':>8}")
+    for label, query in queries:
+        ms, _ = timed_ms(query, args.repeat)
+        print(f"{label:<44}{ms:>8.2f}")
+    print("\n" + nba.range_title('assists', store.range_top('assists', first, last)[2]))
+    print(nba.leaders_text('assists', *store.range_top('assists', first, last)[:2]))
+    print("\n" + nba.format_team_range("Lakers", 1610612747, history, first, last)[0])
+
+    #The same range question asked upstream: one LeagueLeaders call per season, then aggregated
+    nba.nba_client.cache = None
+    wanted = [season for season in seasons if first <= season <= last]
+    requests = sum(runner.app['requests'].values())
+    start = time.perf_counter()
+    raws = await asyncio.gather(*(nba.nba_client.league_leaders(season=season) for season in wanted))
+    df = pd.concat([result_frames(raw)['LeagueLeaders'] for raw in raws])
+    totals = df.groupby('PLAYER')[['AST', 'GP']].sum()
+    (totals['AST'] / totals['GP']).nlargest(10)
+    print(f"\nupstream, one call per season: {(time.perf_counter() - start) * 1000:.0f} ms, "
+          f"{sum(runner.app['requests'].values()) - requests} requests (stub {args.latency_ms:g}±{args.jitter_ms:g} ms)")
+
+    await nba.nba_client.close()
+    await runner.cleanup()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark season-range queries")
+    parser.add_argument('--first', type=int, default=2010)
+    parser.add_argument('--last', type=int, default=2020)
+    parser.add_argument('--span', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--latency-ms', type=float, default=150)
+    parser.add_argument('--jitter-ms', type=float, default=30)
+    asyncio.run(main(parser.parse_args()))
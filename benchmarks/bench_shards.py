@@ -0,0 +1,89 @@
+#Sharded mode benchmark: N bot processes run the command workload against one stub server
+#and one shared cache file, like shards.py does in production.
+#Shows total throughput per process count and how much each process reused from the others.
+#Run from the repo root: python benchmarks/bench_shards.py --processes 1 2 4 --requests 400
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+def worker(index, args, env, ready, results):
+    os.environ.update(env)
+    import bench_commands
+    import NBADiscordBot as nba
+
+    async def run():
+        ready.wait()
+        jobs = bench_commands.workload(nba, args.requests, random.Random(args.seed + index))
+        outcome, elapsed = await bench_commands.run(nba, jobs, args.concurrency)
+        await bench_commands.drain()
+        await nba.nba_client.close()
+        return outcome, elapsed
+
+    outcome, elapsed = asyncio.run(run())
+    errors = sum(failed for samples in outcome.values() for _, failed in samples)
+    results.put((args.requests, errors, elapsed, nba.result_cache.hits, nba.result_cache.misses,
+                 nba.response_cache.misses))
+
+def run_processes(count, args, port):
+    cache_dir = tempfile.mkdtemp(prefix='bench_shards_')
+    env = {
+        'NBA_STATS_URL': f"http://127.0.0.1:{port}/stats/{{endpoint}}",
+        'NBA_CACHE_PATH': os.path.join(cache_dir, 'cache.sqlite3'),
+        'NBA_HISTORY_PATH': os.path.join(cache_dir, 'history.sqlite3'),
+        'QUERY_LOG_PATH': os.path.join(cache_dir, 'queries.sqlite3'),
+        'LEADERS_STORE_PATH': os.path.join(cache_dir, 'leaders_store'),
+    }
+    ready = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=worker, args=(i, args, env, ready, results)) for i in range(count)]
+    for process in workers:
+        process.start()
+    #Let every process finish importing before the clock starts
+    time.sleep(args.startup)
+    start = time.perf_counter()
+    ready.set()
+    outcomes = [results.get() for _ in workers]
+    elapsed = time.perf_counter() - start
+    for process in workers:
+        process.join()
+
+    commands = sum(o[0] for o in outcomes)
+    errors = sum(o[1] for o in outcomes)
+    shared_hits = sum(o[3] for o in outcomes)
+    lookups = shared_hits + sum(o[4] for o in outcomes)
+    upstream = sum(o[5] for o in outcomes)
+    print(f"{count:>9} {commands:>9} {errors:>7} {elapsed:>9.2f} {commands / elapsed:>11.1f} "
+          f"{shared_hits / lookups * 100 if lookups else 0:>12.1f}% {upstream:>9}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark multi-process sharded mode against the stub server")
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--requests', type=int, default=300, help="commands per process")
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--latency-ms', type=float, default=20)
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--startup', type=float, default=8, help="seconds to wait for processes to import the bot")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    multiprocessing.set_start_method('spawn')
+    stub = subprocess.Popen([sys.executable, os.path.join(BENCH_DIR, 'stub_server.py'),
+                             '--port', str(args.port), '--latency-ms', str(args.latency_ms)],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        time.sleep(2)
+        print(f"{'processes':>9} {'commands':>9} {'errors':>7} {'seconds':>9} {'commands/s':>11} "
+              f"{'shared hits':>13} {'upstream':>9}")
+        for count in args.processes:
+            run_processes(count, args, args.port)
+    finally:
+        stub.terminate()
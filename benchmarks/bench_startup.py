@@ -0,0 +1,108 @@
+#Cold start benchmark: fresh bot processes against the stub server, timing how long until the
+#module is imported, on_ready has run and the first /playerstats has been answered.
+#Pass --ref to also time another git revision (checked out into a temporary worktree) for comparison.
+#Run from the repo root: python benchmarks/bench_startup.py --runs 5 --ref HEAD~1
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+#Runs inside the bot process, prints seconds since launch for each step as json
+CHILD = r'''
+import asyncio, json, sys, time
+launched = float(sys.argv[1])
+marks = {'interpreter': time.time() - launched}
+import NBADiscordBot as nba
+marks['import'] = time.time() - launched
+
+class FakeContext:
+    class Followup:
+        async def send(self, *args, **kwargs):
+            pass
+
+    class Interaction:
+        async def edit_original_response(self, *args, **kwargs):
+            pass
+
+    def __init__(self, command):
+        self.command = command
+        self.channel_id = 0
+        self.followup = self.Followup()
+        self.interaction = self.Interaction()
+
+    async def defer(self):
+        pass
+
+    async def respond(self, *args, **kwargs):
+        pass
+
+async def main():
+    await nba.on_ready()
+    marks['on_ready'] = time.time() - launched
+    await nba.playerstats.callback(FakeContext(nba.playerstats), "LeBron James", None)
+    marks['first command'] = time.time() - launched
+    await nba.nba_client.close()
+
+asyncio.run(main())
+print(json.dumps(marks))
+'''
+
+STEPS = ['interpreter', 'import', 'on_ready', 'first command']
+
+def run_once(tree, port):
+    cache_dir = tempfile.mkdtemp(prefix='bench_startup_')
+    env = dict(os.environ,
+               NBA_STATS_URL=f"http://127.0.0.1:{port}/stats/{{endpoint}}",
+               NBA_CACHE_PATH=os.path.join(cache_dir, 'cache.sqlite3'),
+               NBA_HISTORY_PATH=os.path.join(cache_dir, 'history.sqlite3'),
+               QUERY_LOG_PATH=os.path.join(cache_dir, 'queries.sqlite3'),
+               LEADERS_STORE_PATH=os.path.join(cache_dir, 'leaders_store'),
+               METRICS_PORT='0', PROFILE_HZ='0')
+    try:
+        out = subprocess.run([sys.executable, '-c', CHILD, str(time.time())], cwd=tree, env=env,
+                             capture_output=True, text=True, check=True).stdout
+        return json.loads(out.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+def report(label, tree, runs, port):
+    #One untimed run so both trees start with warm .pyc files and OS caches
+    run_once(tree, port)
+    samples = [run_once(tree, port) for _ in range(runs)]
+    cells = " ".join(f"{statistics.median(s[step] for s in samples) * 1000:>13.0f}" for step in STEPS)
+    print(f"{label:<12} {cells}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark bot cold start against the stub server")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--ref', help="git revision to compare against, e.g. HEAD~1")
+    parser.add_argument('--port', type=int, default=8767)
+    parser.add_argument('--latency-ms', type=float, default=20)
+    args = parser.parse_args()
+
+    stub = subprocess.Popen([sys.executable, os.path.join(BENCH_DIR, 'stub_server.py'),
+                             '--port', str(args.port), '--latency-ms', str(args.latency_ms)],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    worktree = None
+    try:
+        time.sleep(2)
+        print(f"median ms since launch over {args.runs} runs")
+        print(f"{'tree':<12} " + " ".join(f"{step:>13}" for step in STEPS))
+        if args.ref:
+            worktree = tempfile.mkdtemp(prefix='bench_startup_ref_')
+            subprocess.run(['git', 'worktree', 'add', '--detach', worktree, args.ref], cwd=REPO_DIR,
+                           check=True, capture_output=True)
+            report(args.ref, worktree, args.runs, args.port)
+        report('current', REPO_DIR, args.runs, args.port)
+    finally:
+        stub.terminate()
+        if worktree:
+            subprocess.run(['git', 'worktree', 'remove', '--force', worktree], cwd=REPO_DIR, capture_output=True)
@@ -0,0 +1,93 @@
+#Upstream scheduler benchmark: uncached stats.nba.com calls against a stub that fails and stalls now
+#and then, sent unguarded (one attempt, no limits) and through the scheduler. Calls arrive at a steady
+#--offered rate, then all at once as a burst. Reports success rate, latency and the busiest second the stub saw.
+#Run from the repo root: python benchmarks/bench_upstream.py --calls 400 --offered 25 --rate 40
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+os.environ.setdefault('NBA_CACHE_PATH', ':memory:')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stub_server
+
+def percentile(values, p):
+    return values[min(len(values) - 1, int(len(values) * p))] if values else float('nan')
+
+#Most requests the stub received in any one second
+def busiest_second(arrivals):
+    arrivals = sorted(arrivals)
+    busiest, start = 0, 0
+    for end, at in enumerate(arrivals):
+        while at - arrivals[start] >= 1:
+            start += 1
+        busiest = max(busiest, end - start + 1)
+    return busiest
+
+#offered calls per second, or None for every call at once
+async def run(client, calls, offered):
+    times, failed = [], 0
+
+    async def one(i):
+        nonlocal failed
+        if offered:
+            await asyncio.sleep(i / offered)
+        start = time.perf_counter()
+        try:
+            await client.player_game_log(i + 1, '2023-24')
+            times.append((time.perf_counter() - start) * 1000)
+        except Exception:
+            failed += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    return sorted(times), failed, time.perf_counter() - start
+
+async def run_config(args, label, options, offered):
+    import nba_client
+    from scheduler import UpstreamScheduler
+    runner, base_url = await stub_server.start(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                                               error_rate=args.error_rate, slow_rate=args.slow_rate,
+                                               slow_ms=args.slow_ms, seed=args.seed)
+    nba_client.STATS_URL = base_url + "/stats/{endpoint}"
+    client = nba_client.NBAStatsClient()
+    #Never trips here, the stub's failures are random rather than an outage
+    client.breaker.failure_threshold = 10 ** 9
+    client.scheduler = UpstreamScheduler(nba_client.is_upstream_failure, **options)
+    times, failed, elapsed = await run(client, args.calls, offered)
+    arrivals = runner.app['arrivals']
+    print(f"{label:<18}{(args.calls - failed) / args.calls:>7.1%}{percentile(times, 0.5):>9.0f}"
+          f"{percentile(times, 0.95):>9.0f}{percentile(times, 0.99):>9.0f}{len(arrivals):>10}"
+          f"{busiest_second(arrivals):>11}{elapsed:>11.1f}")
+    await client.close()
+    await runner.cleanup()
+
+async def main(args):
+    configs = [
+        ("unguarded", dict(rate=1e9, burst=10 ** 9, concurrency=10 ** 9, retries=0, hedge=False)),
+        ("retries", dict(rate=args.rate, burst=args.rate, concurrency=args.endpoint_concurrency, retries=2, hedge=False)),
+        ("retries + hedging", dict(rate=args.rate, burst=args.rate, concurrency=args.endpoint_concurrency, retries=2, hedge=True)),
+    ]
+    print(f"{args.calls} calls, scheduler rate {args.rate:g}/s, stub {args.latency_ms:g}±{args.jitter_ms:g} ms, "
+          f"{args.error_rate:.0%} errors, {args.slow_rate:.0%} stalls of {args.slow_ms:g} ms")
+    for offered in (args.offered, None):
+        print(f"\n{f'{offered:g} calls/s' if offered else 'burst':<18}{'ok':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+              f"{'upstream':>10}{'busiest s':>11}{'elapsed s':>11}")
+        for label, options in configs:
+            await run_config(args, label, options, offered)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the upstream request scheduler")
+    parser.add_argument('--calls', type=int, default=400)
+    parser.add_argument('--offered', type=float, default=25, help="calls per second in the steady run")
+    parser.add_argument('--rate', type=float, default=40, help="scheduler requests per second")
+    parser.add_argument('--endpoint-concurrency', type=int, default=8)
+    parser.add_argument('--latency-ms', type=float, default=100)
+    parser.add_argument('--jitter-ms', type=float, default=30)
+    parser.add_argument('--error-rate', type=float, default=0.05)
+    parser.add_argument('--slow-rate', type=float, default=0.03)
+    parser.add_argument('--slow-ms', type=float, default=1500)
+    parser.add_argument('--seed', type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,60 @@
+#Records real stats.nba.com / cdn.nba.com responses into benchmarks/fixtures/ for the stub server.
+#Needs network access. Goes through the bot's own client so the fixtures match what it actually requests.
+#Run from the repo root: python benchmarks/record_fixtures.py
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nba_client
+from nba_client import NBAStatsClient, LIVE_URL
+from name_index import build_player_index, build_team_index
+from stub_server import fixture_path
+
+PLAYERS = ["LeBron James", "Stephen Curry", "Kevin Durant", "Nikola Jokic", "Giannis Antetokounmpo",
+           "Luka Doncic", "Jayson Tatum", "Michael Jordan", "Kobe Bryant", "Tim Duncan"]
+TEAMS = ["Lakers", "Celtics", "Warriors", "Bulls", "Spurs", "Heat", "Knicks", "Nuggets"]
+SEASONS = ["2024-25", "2023-24", "2015-16", "1995-96"]
+
+#Pause between calls, stats.nba.com throttles bursts
+DELAY = 1.0
+
+class RecordingClient(NBAStatsClient):
+    async def get_json(self, url, params=None, headers=None):
+        body = await super().get_json(url, params, headers)
+        if url.startswith(LIVE_URL.split('{')[0]):
+            endpoint, params = url[len(LIVE_URL.split('{')[0]):], None
+        else:
+            endpoint = url.rsplit('/', 1)[1].lower()
+        path = fixture_path(endpoint, params)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({'url': url, 'params': params, 'recorded_at': time.time(), 'body': body}, f)
+        print(f"recorded {endpoint} {params or ''}")
+        await asyncio.sleep(DELAY)
+        return body
+
+async def main():
+    players, teams = build_player_index(), build_team_index()
+    client = RecordingClient(cache=None)
+    try:
+        for name in PLAYERS:
+            await client.player_career_stats(players.resolve(name)['id'])
+        for name in TEAMS:
+            team_id = teams.resolve(name)['id']
+            await client.team_year_by_year_stats(team_id)
+            for season in SEASONS[:2]:
+                await client.common_team_roster(team_id, season)
+        await client.league_leaders(season="", season_type="Regular Season")
+        for season in SEASONS:
+            await client.league_leaders(season=season, season_type="Regular Season")
+        await client.scoreboard()
+    finally:
+        await client.close()
+
+if __name__ == "__main__":
+    print(f"Recording from {nba_client.STATS_URL}")
+    asyncio.run(main())
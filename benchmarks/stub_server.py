@@ -0,0 +1,116 @@
+#Local stand-in for stats.nba.com and cdn.nba.com so commands can be benchmarked offline.
+#Serves recorded responses from benchmarks/fixtures/ when they exist (see record_fixtures.py),
+#otherwise synthetic ones with the same shape.
+#Standalone: python benchmarks/stub_server.py --port 8765 --latency-ms 150 --jitter-ms 50
+#then run the bot with NBA_STATS_URL=http://127.0.0.1:8765/stats/{endpoint}
+#                  and NBA_LIVE_URL=http://127.0.0.1:8765/liveData/{endpoint}
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+from collections import Counter
+from aiohttp import web
+
+import synthetic
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+#Query values arrive as strings, so params are stringified before hashing on both sides
+def fixture_path(endpoint, params=None):
+    params = {k: str(v) for k, v in (params or {}).items() if v is not None}
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:12]
+    return os.path.join(FIXTURES_DIR, endpoint.replace('/', '_'), f"{digest}.json")
+
+def load_fixture(endpoint, params=None):
+    path = fixture_path(endpoint, params)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)['body']
+
+def synthetic_stats(endpoint, params, current='2024-25'):
+    if endpoint == 'playercareerstats':
+        return synthetic.career(int(params.get('PlayerID', 1)))
+    if endpoint == 'teamyearbyyearstats':
+        return synthetic.team_history(int(params.get('TeamID', 1610612747)))
+    if endpoint == 'commonteamroster':
+        return synthetic.roster(int(params.get('TeamID', 1610612747)), params.get('Season') or current)
+    if endpoint == 'playergamelog':
+        return synthetic.game_log(int(params.get('PlayerID', 1)), params.get('Season') or current)
+    if endpoint == 'leagueleaders':
+        return synthetic.league_leaders(params.get('Season') or current)
+    return None
+
+#slow_rate of requests take slow_ms longer, like the stalls stats.nba.com has under load
+def make_app(latency_ms=0, jitter_ms=0, error_rate=0.0, seed=None, slow_rate=0.0, slow_ms=0):
+    rng = random.Random(seed)
+    app = web.Application()
+    app['requests'] = Counter()
+    app['errors'] = 0
+    #Arrival time of every stats request, to check the rate the bot sends at
+    app['arrivals'] = []
+
+    async def delay():
+        wait = latency_ms + rng.uniform(-jitter_ms, jitter_ms)
+        if rng.random() < slow_rate:
+            wait += slow_ms
+        if wait > 0:
+            await asyncio.sleep(wait / 1000)
+
+    def fail():
+        if rng.random() < error_rate:
+            app['errors'] += 1
+            return True
+        return False
+
+    async def stats(request):
+        endpoint = request.match_info['endpoint'].lower()
+        params = dict(request.query)
+        app['requests'][endpoint] += 1
+        app['arrivals'].append(asyncio.get_running_loop().time())
+        await delay()
+        if fail():
+            return web.json_response({'message': 'stub error'}, status=500)
+        body = load_fixture(endpoint, params) or synthetic_stats(endpoint, params)
+        if body is None:
+            return web.json_response({'message': f"unknown endpoint {endpoint}"}, status=404)
+        return web.json_response(body)
+
+    async def live(request):
+        path = request.match_info['path']
+        app['requests'][path] += 1
+        await delay()
+        if fail():
+            return web.json_response({'message': 'stub error'}, status=500)
+        if 'scoreboard' not in path:
+            return web.json_response({'message': f"unknown feed {path}"}, status=404)
+        body = load_fixture(path) or synthetic.scoreboard(tick=app['requests'][path])
+        return web.json_response(body)
+
+    app.router.add_get('/stats/{endpoint}', stats)
+    app.router.add_get('/liveData/{path:.*}', live)
+    return app
+
+#Start the stub inside the current event loop, returns (runner, base_url); port 0 picks a free one
+async def start(host='127.0.0.1', port=0, **options):
+    runner = web.AppRunner(make_app(**options))
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://{host}:{port}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stub for stats.nba.com / cdn.nba.com")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--slow-rate', type=float, default=0.0)
+    parser.add_argument('--slow-ms', type=float, default=0)
+    args = parser.parse_args()
+    web.run_app(make_app(args.latency_ms, args.jitter_ms, args.error_rate, slow_rate=args.slow_rate, slow_ms=args.slow_ms),
+                host=args.host, port=args.port)
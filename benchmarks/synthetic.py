@@ -0,0 +1,159 @@
+#Synthetic stats.nba.com responses with the real result set names and headers.
+#Used by the benchmarks when no recorded fixture exists (see record_fixtures.py).
+import random
+from datetime import datetime, timezone
+
+def season_id(year):
+    return f"{year}-{str(year + 1)[-2:]}"
+
+def result_set(name, headers, rows):
+    return {'name': name, 'headers': headers, 'rowSet': rows}
+
+CAREER_HEADERS = ['PLAYER_ID', 'SEASON_ID', 'LEAGUE_ID', 'TEAM_ID', 'TEAM_ABBREVIATION', 'PLAYER_AGE', 'GP', 'GS',
+                  'MIN', 'FGM', 'FGA', 'FG_PCT', 'FG3M', 'FG3A', 'FG3_PCT', 'FTM', 'FTA', 'FT_PCT', 'OREB', 'DREB',
+                  'REB', 'AST', 'STL', 'BLK', 'TOV', 'PF', 'PTS']
+
+#~20 seasons, a few of them split across teams like a real journeyman career
+def career(player_id=1, seasons=20, first_year=2004):
+    rng = random.Random(player_id)
+    rows = []
+    for year in range(first_year, first_year + seasons):
+        teams = ['LAL'] if year % 7 else ['PHX', 'BOS', 'TOT']
+        for team in teams:
+            gp = rng.randint(0, 82)
+            fga = rng.randint(0, 25 * max(gp, 1))
+            fgm = rng.randint(0, fga)
+            fg3a = rng.randint(0, 8 * max(gp, 1))
+            fg3m = rng.randint(0, fg3a)
+            fta = rng.randint(0, 8 * max(gp, 1))
+            ftm = rng.randint(0, fta)
+            oreb, dreb = rng.randint(0, 3 * max(gp, 1)), rng.randint(0, 8 * max(gp, 1))
+            rows.append([player_id, season_id(year), '00', 1610612747, team, 20 + year - first_year, gp, gp,
+                         rng.randint(0, 38 * max(gp, 1)), fgm, fga, round(fgm / fga, 3) if fga else 0.0,
+                         fg3m, fg3a, round(fg3m / fg3a, 3) if fg3a else 0.0, ftm, fta, round(ftm / fta, 3) if fta else 0.0,
+                         oreb, dreb, oreb + dreb, rng.randint(0, 9 * max(gp, 1)), rng.randint(0, 2 * max(gp, 1)),
+                         rng.randint(0, 2 * max(gp, 1)), rng.randint(0, 4 * max(gp, 1)), rng.randint(0, 4 * max(gp, 1)),
+                         2 * fgm + fg3m + ftm])
+    return {'resource': 'playercareerstats', 'resultSets': [result_set('SeasonTotalsRegularSeason', CAREER_HEADERS, rows)]}
+
+TEAM_HEADERS = ['TEAM_ID', 'TEAM_CITY', 'TEAM_NAME', 'YEAR', 'GP', 'WINS', 'LOSSES', 'WIN_PCT', 'CONF_RANK', 'DIV_RANK',
+                'PO_WINS', 'PO_LOSSES', 'CONF_COUNT', 'DIV_COUNT', 'NBA_FINALS_APPEARANCE', 'FGM', 'FGA', 'FG_PCT',
+                'FG3M', 'FG3A', 'FG3_PCT', 'FTM', 'FTA', 'FT_PCT', 'OREB', 'DREB', 'REB', 'AST', 'PF', 'STL', 'TOV',
+                'BLK', 'PTS', 'PTS_RANK']
+
+#Full franchise history, ~75 seasons
+def team_history(team_id=1610612747, first_year=1949, last_year=2024):
+    rng = random.Random(team_id)
+    rows = []
+    for year in range(first_year, last_year + 1):
+        wins = rng.randint(15, 67)
+        po_wins = rng.choice([0, 0, 1, 3, 5, 9, 13, 16])
+        po_losses = 0 if po_wins == 0 else rng.randint(1, 4)
+        fga, fg3a, fta = rng.randint(6500, 7500), rng.randint(0, 3500), rng.randint(1500, 2200)
+        fgm, fg3m, ftm = rng.randint(3000, fga), rng.randint(0, fg3a), rng.randint(1000, fta)
+        oreb, dreb = rng.randint(800, 1200), rng.randint(2400, 2900)
+        rows.append([team_id, 'Los Angeles', 'Lakers', season_id(year), 82, wins, 82 - wins, round(wins / 82, 3),
+                     rng.randint(1, 15), rng.randint(1, 5), po_wins, po_losses, 15, 5, 'N/A',
+                     fgm, fga, round(fgm / fga, 3), fg3m, fg3a, round(fg3m / fg3a, 3) if fg3a else 0.0,
+                     ftm, fta, round(ftm / fta, 3), oreb, dreb, oreb + dreb, rng.randint(1500, 2300),
+                     rng.randint(1500, 2000), rng.randint(500, 800), rng.randint(1000, 1400), rng.randint(300, 500),
+                     2 * fgm + fg3m + ftm, rng.randint(1, 30)])
+    return {'resource': 'teamyearbyyearstats', 'resultSets': [result_set('TeamStats', TEAM_HEADERS, rows)]}
+
+LEADERS_HEADERS = ['PLAYER_ID', 'RANK', 'PLAYER', 'TEAM', 'GP', 'MIN', 'FGM', 'FGA', 'FG_PCT', 'FG3M', 'FG3A', 'FG3_PCT',
+                   'FTM', 'FTA', 'FT_PCT', 'OREB', 'DREB', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'PF', 'PTS', 'EFF',
+                   'AST_TOV', 'STL_TOV']
+
+#Whole-league LeagueLeaders table, ~550 players
+def league_leaders(season='2024-25', players=550):
+    rng = random.Random(season)
+    rows = []
+    for i in range(players):
+        gp = rng.randint(1, 82)
+        fga = rng.randint(10, 1600)
+        fgm = rng.randint(0, fga)
+        fg3a = rng.randint(0, 700)
+        fg3m = rng.randint(0, fg3a)
+        fta = rng.randint(0, 700)
+        ftm = rng.randint(0, fta)
+        oreb, dreb = rng.randint(0, 300), rng.randint(0, 700)
+        ast, stl, tov = rng.randint(0, 800), rng.randint(0, 150), rng.randint(1, 300)
+        rows.append([1000 + i, i + 1, f"Player {i}", 'LAL', gp, rng.randint(10, 3000), fgm, fga, round(fgm / fga, 3),
+                     fg3m, fg3a, round(fg3m / fg3a, 3) if fg3a else 0.0, ftm, fta, round(ftm / fta, 3) if fta else 0.0,
+                     oreb, dreb, oreb + dreb, ast, stl, rng.randint(0, 200), tov, rng.randint(0, 250),
+                     2 * fgm + fg3m + ftm, rng.randint(0, 2500), round(ast / tov, 2), round(stl / tov, 2)])
+    return {'resource': 'leagueleaders', 'resultSet': result_set('LeagueLeaders', LEADERS_HEADERS, rows)}
+
+ROSTER_HEADERS = ['TeamID', 'SEASON', 'LeagueID', 'PLAYER', 'PLAYER_SLUG', 'NUM', 'POSITION', 'HEIGHT', 'WEIGHT',
+                  'BIRTH_DATE', 'AGE', 'EXP', 'SCHOOL', 'PLAYER_ID']
+
+def roster(team_id=1610612747, season='2024-25'):
+    rng = random.Random(f"{team_id}{season}")
+    rows = [
+        [team_id, season[:4], '00', f"Player {i}", f"player-{i}", str(rng.randint(0, 99)), rng.choice(['G', 'F', 'C', 'G-F', 'F-C']),
+         f"6-{rng.randint(0, 11)}", str(rng.randint(180, 270)), 'JAN 01, 2000', float(rng.randint(19, 38)),
+         str(rng.randint(0, 18)), 'School', 2000 + i]
+        for i in range(15)
+    ]
+    coaches = [[team_id, season[:4], 1, 'Head', 'Coach', 'Head Coach', 0, 'Head Coach', 1]]
+    return {'resource': 'commonteamroster', 'resultSets': [
+        result_set('CommonTeamRoster', ROSTER_HEADERS, rows),
+        result_set('Coaches', ['TEAM_ID', 'SEASON', 'COACH_ID', 'FIRST_NAME', 'LAST_NAME', 'COACH_NAME',
+                               'IS_ASSISTANT', 'COACH_TYPE', 'SORT_SEQUENCE'], coaches),
+    ]}
+
+GAME_LOG_HEADERS = ['SEASON_ID', 'Player_ID', 'Game_ID', 'GAME_DATE', 'MATCHUP', 'WL', 'MIN', 'FGM', 'FGA', 'FG_PCT',
+                    'FG3M', 'FG3A', 'FG3_PCT', 'FTM', 'FTA', 'FT_PCT', 'OREB', 'DREB', 'REB', 'AST', 'STL', 'BLK', 'TOV',
+                    'PF', 'PTS', 'PLUS_MINUS', 'VIDEO_AVAILABLE']
+OPPONENTS = ['ATL', 'BOS', 'BKN', 'CHA', 'CHI', 'CLE', 'DAL', 'DEN', 'DET', 'GSW', 'HOU', 'IND', 'LAC', 'MEM', 'MIA',
+             'MIL', 'MIN', 'NOP', 'NYK', 'OKC', 'ORL', 'PHI', 'PHX', 'POR', 'SAC', 'SAS', 'TOR', 'UTA', 'WAS']
+
+#One regular season of games, newest first like stats.nba.com
+def game_log(player_id=1, season='2024-25', games=82):
+    rng = random.Random(f"{player_id}{season}")
+    start = datetime(int(season[:4]), 10, 22)
+    rows = []
+    for game in range(games):
+        fga = rng.randint(5, 30)
+        fgm = rng.randint(0, fga)
+        fg3a = rng.randint(0, 12)
+        fg3m = rng.randint(0, fg3a)
+        fta = rng.randint(0, 12)
+        ftm = rng.randint(0, fta)
+        oreb, dreb = rng.randint(0, 4), rng.randint(0, 10)
+        date = datetime.fromordinal(start.toordinal() + game * 2)
+        matchup = f"LAL {rng.choice(['vs.', '@'])} {rng.choice(OPPONENTS)}"
+        rows.append([f"2{season[:4]}", player_id, f"002{season[2:4]}{game + 1:05d}", date.strftime('%b %d, %Y').upper(),
+                     matchup, rng.choice('WL'), rng.randint(12, 44), fgm, fga, round(fgm / fga, 3), fg3m, fg3a,
+                     round(fg3m / fg3a, 3) if fg3a else 0.0, ftm, fta, round(ftm / fta, 3) if fta else 0.0,
+                     oreb, dreb, oreb + dreb, rng.randint(0, 12), rng.randint(0, 4), rng.randint(0, 3),
+                     rng.randint(0, 6), rng.randint(0, 5), 2 * fgm + fg3m + ftm, rng.randint(-25, 25), 1])
+    rows.reverse()
+    return {'resource': 'playergamelog', 'resultSets': [result_set('PlayerGameLog', GAME_LOG_HEADERS, rows)]}
+
+#Live scoreboard in the cdn.nba.com liveData format, games move forward a little on every call
+def scoreboard(games=10, tick=0):
+    rng = random.Random(tick)
+    now = datetime.now(timezone.utc)
+    board = []
+    for g in range(games):
+        status = 1 if g >= games - 2 else 2 if g >= 3 else 3
+        period = 0 if status == 1 else min(4, 1 + tick // 10) if status == 2 else 4
+
+        def team(team_id, tricode, score):
+            return {'teamId': team_id, 'teamName': tricode, 'teamCity': tricode, 'teamTricode': tricode,
+                    'wins': 10, 'losses': 5, 'score': score, 'seed': None, 'inBonus': None, 'timeoutsRemaining': 7,
+                    'periods': [{'period': p, 'periodType': 'REGULAR', 'score': score // 4} for p in range(1, 5)]}
+
+        base = 0 if status == 1 else 25 * period + (tick if status == 2 else 0)
+        board.append({
+            'gameId': f"00224000{g:02d}", 'gameCode': f"20250101/AW{g}HM{g}", 'gameStatus': status,
+            'gameStatusText': ['7:30 pm ET', f"Q{period} 5:00", 'Final'][status - 1], 'period': period,
+            'gameClock': 'PT05M00.00S' if status == 2 else '', 'gameTimeUTC': now.isoformat(),
+            'gameEt': now.isoformat(), 'regulationPeriods': 4, 'seriesGameNumber': '', 'seriesText': '',
+            'homeTeam': team(1610612700 + 2 * g, f"HM{g}", base + rng.randint(0, 3) if status == 2 else base),
+            'awayTeam': team(1610612701 + 2 * g, f"AW{g}", base),
+        })
+    return {'meta': {'version': 1, 'code': 200}, 'scoreboard': {
+        'gameDate': now.strftime('%Y-%m-%d'), 'leagueId': '00', 'leagueName': 'National Basketball Association', 'games': board,
+    }}
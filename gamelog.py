@@ -0,0 +1,89 @@
+#Game-by-game numbers for /gamelog. One season's log is read row by row through a chain of generators
+#(rows -> filters -> lines -> pages), so nothing is ever built for more than the season being viewed.
+import os
+from itertools import islice
+
+#Games per page, kept well under Discord's 2000 character message limit
+GAME_LOG_PAGE_SIZE = int(os.getenv('GAME_LOG_PAGE_SIZE', 15))
+LOCATIONS = ['home', 'away']
+
+#Abbreviations a franchise played under before its current one. Old games' MATCHUP uses the
+#abbreviation of the time (a 2005 Nets game reads "@ NJN"), so an opponent filter checks all of them.
+FORMER_ABBREVIATIONS = {
+    'ATL': ['STL', 'MLH', 'TRI'],
+    'BKN': ['NJN', 'NYN'],
+    'CHA': ['CHH'],
+    'DET': ['FTW'],
+    'GSW': ['SFW', 'PHW'],
+    'HOU': ['SDR'],
+    'LAC': ['SDC', 'BUF'],
+    'LAL': ['MNL'],
+    'MEM': ['VAN'],
+    'NOP': ['NOH', 'NOK'],
+    'OKC': ['SEA'],
+    'PHI': ['SYR'],
+    'SAC': ['KCK', 'KCO', 'CIN', 'ROC'],
+    'SAS': ['SAA'],
+    'UTA': ['NOJ'],
+    'WAS': ['WSB', 'CAP', 'BAL', 'CHZ', 'CHP'],
+}
+
+#Every abbreviation a team's games can show it under
+def franchise_abbreviations(abbr):
+    return {abbr, *FORMER_ABBREVIATIONS.get(abbr, [])}
+
+#Each game as {header: value}, oldest first (stats.nba.com sends the newest game first)
+def game_rows(raw):
+    for result_set in raw.get('resultSets', []):
+        if result_set['name'] == 'PlayerGameLog':
+            headers = result_set['headers']
+            for row in reversed(result_set['rowSet']):
+                yield dict(zip(headers, row))
+
+#MATCHUP reads "LAL vs. BOS" at home and "LAL @ BOS" away
+def opponent(game):
+    return game['MATCHUP'].split()[-1]
+
+def is_home(game):
+    return ' vs. ' in game['MATCHUP']
+
+def filter_games(games, opponent_abbr=None, location=None, min_points=None):
+    if opponent_abbr:
+        abbreviations = franchise_abbreviations(opponent_abbr)
+        games = (game for game in games if opponent(game) in abbreviations)
+    if location:
+        home = location == 'home'
+        games = (game for game in games if is_home(game) == home)
+    if min_points:
+        games = (game for game in games if (game['PTS'] or 0) >= min_points)
+    return games
+
+def game_line(game):
+    month_day = game['GAME_DATE'][:6].title()
+    where = f"{'vs' if is_home(game) else '@'} {opponent(game)}"
+    return (
+        f"{month_day} {where:<7} {game['WL'] or '-'}  {game['PTS'] or 0:>2} PTS {game['REB'] or 0:>2} REB "
+        f"{game['AST'] or 0:>2} AST  {game['FGM']}-{game['FGA']} FG  {game['FG3M']}-{game['FG3A']} 3P  {game['MIN'] or 0} MIN"
+    )
+
+def pages(lines, size=GAME_LOG_PAGE_SIZE):
+    lines = iter(lines)
+    while page := list(islice(lines, size)):
+        yield page
+
+def filters_text(opponent_abbr=None, location=None, min_points=None):
+    parts = []
+    if opponent_abbr:
+        parts.append(f"vs {opponent_abbr}")
+    if location:
+        parts.append(location)
+    if min_points:
+        parts.append(f"{min_points}+ pts")
+    return f" ({', '.join(parts)})" if parts else ""
+
+#One season's pages of text, never empty: a season with no matching games gets a page saying so
+def game_log_pages(player_name, season, raw, opponent_abbr=None, location=None, min_points=None, size=GAME_LOG_PAGE_SIZE):
+    title = f"{player_name} {season} game log{filters_text(opponent_abbr, location, min_points)}\n"
+    games = filter_games(game_rows(raw), opponent_abbr, location, min_points)
+    result = [title + "\n".join(page) for page in pages(map(game_line, games), size)]
+    return result or [title + "No games found."], None
@@ -0,0 +1,282 @@
+#Local copy of historical stats.nba.com data: player careers, team year-by-year stats and rosters,
+#bulk imported once and then kept current by a nightly sync that only refetches the current season.
+#Rows are stored per (entity, season) and handed back in the same shape stats.nba.com returns,
+#so the bot's formatters work on them unchanged.
+#Bulk import, from the repo root: python history.py [--players] [--teams] [--rosters] [--leaders]
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from nba_cache import connect, current_season
+from metrics import registry
+
+HISTORY_PATH = os.getenv('NBA_HISTORY_PATH', 'nba_history.sqlite3')
+HISTORY_SYNC_INTERVAL = int(os.getenv('NBA_HISTORY_SYNC_INTERVAL', 86400))
+#Requests in flight during an import/sync, and the pause each one takes between requests
+HISTORY_CONCURRENCY = int(os.getenv('NBA_HISTORY_CONCURRENCY', 4))
+HISTORY_DELAY = float(os.getenv('NBA_HISTORY_DELAY', 0.5))
+
+#kind -> (result set kept, column holding the season)
+KINDS = {
+    'player': ('SeasonTotalsRegularSeason', 'SEASON_ID'),
+    'team': ('TeamStats', 'YEAR'),
+    'roster': ('CommonTeamRoster', None),
+}
+
+class HistoryDB:
+    def __init__(self, path=HISTORY_PATH):
+        self.hits = 0
+        self.misses = 0
+        self._headers = {}
+        self._lock = threading.Lock()
+        self._db = connect(path)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS rows ("
+            "kind TEXT NOT NULL, entity INTEGER NOT NULL, season TEXT NOT NULL, position INTEGER NOT NULL, row TEXT NOT NULL, "
+            "PRIMARY KEY (kind, entity, season, position)) WITHOUT ROWID;"
+            "CREATE TABLE IF NOT EXISTS headers (kind TEXT PRIMARY KEY, headers TEXT NOT NULL);"
+            #synced_season is the season being played when the entity was last fetched,
+            #every season before it was complete at that point
+            "CREATE TABLE IF NOT EXISTS coverage ("
+            "kind TEXT NOT NULL, entity INTEGER NOT NULL, season TEXT NOT NULL, synced_season TEXT NOT NULL, synced_at REAL NOT NULL, "
+            "PRIMARY KEY (kind, entity, season)) WITHOUT ROWID;"
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+        )
+        self._db.commit()
+
+    def _synced_season(self, kind, entity, season=''):
+        row = self._db.execute(
+            "SELECT synced_season FROM coverage WHERE kind = ? AND entity = ? AND season = ?", (kind, entity, season)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _headers_for(self, kind):
+        if kind not in self._headers:
+            row = self._db.execute("SELECT headers FROM headers WHERE kind = ?", (kind,)).fetchone()
+            if row is None:
+                return None
+            self._headers[kind] = json.loads(row[0])
+        return self._headers[kind]
+
+    #Stored rows as a stats.nba.com style response, or None when the local copy can't answer
+    def _read(self, kind, entity, season, coverage_season=''):
+        with self._lock:
+            synced = self._synced_season(kind, entity, coverage_season)
+            headers = self._headers_for(kind)
+            if synced is None or headers is None or (season and season >= synced):
+                self.misses += 1
+                registry.inc('nba_history_reads_total', kind=kind, outcome='miss')
+                return None
+            query = "SELECT row FROM rows WHERE kind = ? AND entity = ?"
+            params = (kind, entity)
+            if coverage_season:
+                query, params = query + " AND season = ?", params + (coverage_season,)
+            rows = [json.loads(row) for row, in self._db.execute(query + " ORDER BY season, position", params)]
+        self.hits += 1
+        registry.inc('nba_history_reads_total', kind=kind, outcome='hit')
+        return {'resultSets': [{'name': KINDS[kind][0], 'headers': headers, 'rowSet': rows}]}
+
+    #Whole career when season is a completed season, or when the player is retired
+    def player_career(self, player_id, season=None, active=True):
+        if not season and active:
+            return None
+        return self._read('player', player_id, season)
+
+    def team_history(self, team_id, season=None):
+        if not season:
+            return None
+        return self._read('team', team_id, season)
+
+    def roster(self, team_id, season):
+        if not season:
+            return None
+        return self._read('roster', team_id, season, coverage_season=season)
+
+    #Save a fetched response. Rosters are stored per season; careers and team histories replace
+    #either everything or, with since, only the rows from that season on.
+    def store(self, kind, entity, raw, season='', since=None):
+        #Saved data handed out while stats.nba.com was down isn't a new sync
+        if 'stale_since' in raw:
+            return 0
+        name, season_column = KINDS[kind]
+        for result_set in raw.get('resultSets') or []:
+            if result_set['name'] == name:
+                break
+        else:
+            return 0
+        headers = result_set['headers']
+        index = headers.index(season_column) if season_column else None
+        rows, positions = [], {}
+        for row in result_set['rowSet']:
+            row_season = row[index] if index is not None else season
+            if since and row_season < since:
+                continue
+            position = positions[row_season] = positions.get(row_season, -1) + 1
+            rows.append((kind, entity, row_season, position, json.dumps(row)))
+
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO headers VALUES (?, ?)", (kind, json.dumps(headers)))
+            self._headers[kind] = headers
+            if season:
+                self._db.execute("DELETE FROM rows WHERE kind = ? AND entity = ? AND season = ?", (kind, entity, season))
+            elif since:
+                self._db.execute("DELETE FROM rows WHERE kind = ? AND entity = ? AND season >= ?", (kind, entity, since))
+            else:
+                self._db.execute("DELETE FROM rows WHERE kind = ? AND entity = ?", (kind, entity))
+            self._db.executemany("INSERT INTO rows VALUES (?, ?, ?, ?, ?)", rows)
+            self._db.execute("INSERT OR REPLACE INTO coverage VALUES (?, ?, ?, ?, ?)",
+                             (kind, entity, season, current_season(), time.time()))
+            self._db.commit()
+        return len(rows)
+
+    def synced_season(self, kind, entity, season=''):
+        with self._lock:
+            return self._synced_season(kind, entity, season)
+
+    def covered(self, kind, entity, season=''):
+        return self.synced_season(kind, entity, season) is not None
+
+    #(entity, season) entries holding rows from a season that was still being played when fetched
+    def unfinished(self, kind):
+        with self._lock:
+            if KINDS[kind][1] is None:
+                return self._db.execute(
+                    "SELECT entity, season FROM coverage WHERE kind = ? AND season >= synced_season", (kind,)
+                ).fetchall()
+            return self._db.execute(
+                "SELECT DISTINCT c.entity, c.season FROM coverage c JOIN rows r "
+                "ON r.kind = c.kind AND r.entity = c.entity AND r.season >= c.synced_season WHERE c.kind = ?", (kind,)
+            ).fetchall()
+
+    def imported(self):
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM coverage LIMIT 1").fetchone() is not None
+
+    def last_sync(self):
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'last_sync'").fetchone()
+        return float(row[0]) if row else 0.0
+
+    def mark_synced(self):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('last_sync', ?)", (str(time.time()),))
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._db.execute("SELECT kind, COUNT(*) FROM coverage GROUP BY kind").fetchall())
+        return {'players': counts.get('player', 0), 'teams': counts.get('team', 0), 'rosters': counts.get('roster', 0),
+                'hits': self.hits, 'misses': self.misses}
+
+#Every season a team has played, xxxx-xx, not counting the current one
+def team_seasons(team):
+    first, last = team['year_founded'], int(current_season()[:4])
+    return [f"{year}-{str(year + 1)[-2:]}" for year in range(first, last)]
+
+#Run fetch(job) for every job, HISTORY_CONCURRENCY at a time, printing progress now and then
+async def run_jobs(label, jobs, fetch, concurrency=HISTORY_CONCURRENCY, delay=HISTORY_DELAY):
+    queue = list(reversed(jobs))
+    done, failed = [0], [0]
+
+    async def worker():
+        while queue:
+            job = queue.pop()
+            try:
+                await fetch(job)
+            except Exception as e:
+                failed[0] += 1
+                print(f"{label}: {job} skipped: {e}")
+            done[0] += 1
+            if done[0] % 100 == 0:
+                print(f"{label}: {done[0]}/{len(jobs)}")
+            await asyncio.sleep(delay)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return len(jobs) - failed[0]
+
+#One time bulk import, skips whatever is already in the database so it can be resumed
+async def bulk_import(client, history, players=(), teams=(), rosters=()):
+    async def player(player_id):
+        history.store('player', player_id, await client.player_career_stats(player_id))
+
+    async def team(team_id):
+        history.store('team', team_id, await client.team_year_by_year_stats(team_id))
+
+    async def roster(job):
+        team_id, season = job
+        history.store('roster', team_id, await client.common_team_roster(team_id, season), season=season)
+
+    roster_jobs = [(t['id'], season) for t in rosters for season in team_seasons(t) if not history.covered('roster', t['id'], season)]
+    return {
+        'players': await run_jobs("players", [p['id'] for p in players if not history.covered('player', p['id'])], player),
+        'teams': await run_jobs("teams", [t['id'] for t in teams if not history.covered('team', t['id'])], team),
+        'rosters': await run_jobs("rosters", roster_jobs, roster),
+    }
+
+#Nightly: refetch active players, teams and current rosters, only rewriting rows from the season
+#each was last synced in (normally just the current season). Players that were never imported
+#(rookies) get their whole career.
+async def sync_current_season(client, history, players=(), teams=()):
+    season = current_season()
+
+    async def player(player_id):
+        since = history.synced_season('player', player_id)
+        history.store('player', player_id, await client.player_career_stats(player_id), since=since)
+
+    async def team(team_id):
+        since = history.synced_season('team', team_id)
+        history.store('team', team_id, await client.team_year_by_year_stats(team_id), since=since)
+
+    async def roster(job):
+        team_id, roster_season = job
+        history.store('roster', team_id, await client.common_team_roster(team_id, roster_season), season=roster_season)
+
+    #Players and rosters from last season are fetched once more after it ends, so they can be served locally from then on
+    player_ids = sorted({p['id'] for p in players if p['is_active']} | {entity for entity, _ in history.unfinished('player')})
+    roster_jobs = sorted(set(history.unfinished('roster')) | {(t['id'], season) for t in teams})
+    synced = {
+        'players': await run_jobs("players", player_ids, player),
+        'teams': await run_jobs("teams", [t['id'] for t in teams], team),
+        'rosters': await run_jobs("rosters", roster_jobs, roster),
+    }
+    history.mark_synced()
+    return synced
+
+async def main(args):
+    from nba_api.stats.static import players, teams
+    from nba_cache import ResponseCache
+    from nba_client import NBAStatsClient
+    from leaders import LeadersStore, sync_leaders
+
+    everything = not (args.players or args.teams or args.rosters or args.leaders)
+    history = HistoryDB(args.path)
+    #Raw responses go to the normal cache too, so an interrupted import doesn't refetch them
+    client = NBAStatsClient(cache=ResponseCache())
+    try:
+        if args.sync:
+            print(await sync_current_season(client, history, players.get_players(), teams.get_teams()))
+        else:
+            print(await bulk_import(
+                client, history,
+                players=players.get_players() if everything or args.players else [],
+                teams=teams.get_teams() if everything or args.teams else [],
+                rosters=teams.get_teams() if everything or args.rosters else [],
+            ))
+        if everything or args.leaders:
+            synced = await sync_leaders(client, LeadersStore())
+            print(f"Synced league leaders for {len(synced)} season(s)")
+        print(history.stats())
+    finally:
+        await client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import historical NBA stats into the local database")
+    parser.add_argument('--path', default=HISTORY_PATH)
+    parser.add_argument('--players', action='store_true', help="player career stats")
+    parser.add_argument('--teams', action='store_true', help="team year-by-year stats")
+    parser.add_argument('--rosters', action='store_true', help="every team's roster for every completed season")
+    parser.add_argument('--leaders', action='store_true', help="league leaders for every season")
+    parser.add_argument('--sync', action='store_true', help="only refresh the current season")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,515 @@
+import asyncio
+import bisect
+import json
+import os
+import shutil
+import time
+import numpy as np
+from nba_cache import current_season
+from nba_client import CircuitOpen, result_frames
+
+#Stats usable with /seasonleaders and /alltimeleaders
+league_stats = {
+    "points": "PTS",
+    "assists": "AST",
+    "rebounds": "REB",
+    "blocks": "BLK",
+    "steals": "STL",
+    "turnovers": "TOV",
+    "fg%": "FG_PCT",
+    "fgm": "FGM",
+    "3pm": "FG3M",
+    "ftm": "FTM",
+    "3p%": "FG3_PCT",
+    "ft%": "FT_PCT",
+    "minutes": "MIN"
+}
+
+per_game_stats = {
+    "points": "PTS/G",
+    "assists": "AST/G",
+    "rebounds": "REB/G",
+    "blocks": "BLK/G",
+    "steals": "STL/G",
+    "turnovers": "TOV/G",
+    "fgm": "FGM / G",
+    "3pm": "FG3M/G",
+    "ftm": "FTM / G",
+    "minutes": "MIN/G",
+}
+
+pct_stats = {
+    "fg%": "FG_PCT",
+    "3p%": "FG3_PCT",
+    "ft%": "FT_PCT",
+}
+
+stat_display_names = {
+    "points": "PTS",
+    "assists": "AST",
+    "rebounds": "REB",
+    "blocks": "BLK",
+    "steals": "STL",
+    "turnovers": "TOV",
+    "fg%": "FG%",
+    "fgm": "FGM",
+    "3pm": "3PM",
+    "ftm": "FTM",
+    "3p%": "3P%",
+    "ft%": "FT%",
+    "minutes": "MIN"
+}
+
+valid_stats = set(league_stats) | set(per_game_stats) | set(pct_stats)
+
+#Minimum makes to qualify for the percentage leaderboards
+pct_minimums = {
+    "fg%": ("FGM", 150),
+    "3p%": ("FG3M", 82),
+    "ft%": ("FTM", 150),
+}
+
+#Career minimums for all-time leaderboards (same cutoffs the NBA uses)
+alltime_pct_minimums = {
+    "fg%": ("FGM", 2000),
+    "3p%": ("FG3M", 250),
+    "ft%": ("FTM", 1200),
+}
+ALLTIME_MIN_GAMES = 400
+
+#Minimums for a stretch of seasons: the single-season cutoffs once per season, up to the career ones
+RANGE_MIN_GAMES_PER_SEASON = 40
+
+def range_minimums(seasons):
+    return {stat: (column, min(minimum * seasons, alltime_pct_minimums[stat][1]))
+            for stat, (column, minimum) in pct_minimums.items()}
+
+def range_min_games(seasons):
+    return min(ALLTIME_MIN_GAMES, RANGE_MIN_GAMES_PER_SEASON * seasons)
+
+#Makes/attempts used to rebuild career percentages from season totals
+pct_attempts = {
+    "FG_PCT": ("FGM", "FGA"),
+    "FG3_PCT": ("FG3M", "FG3A"),
+    "FT_PCT": ("FTM", "FTA"),
+}
+
+#Positions of the k largest values among the masked rows, biggest first, ties kept in upstream order
+def top_k(values, mask, k):
+    candidates = np.flatnonzero(mask)
+    if len(candidates) > k:
+        candidate_values = values[candidates]
+        cutoff = np.partition(candidate_values, len(candidates) - k)[len(candidates) - k]
+        candidates = candidates[candidate_values >= cutoff]
+    order = np.argsort(-values[candidates], kind='stable')
+    return candidates[order][:k]
+
+#A stat's value for every row of a LeagueLeaders-style table ({column: array}), and which rows qualify.
+#Works the same on 2-D columns (players x windows of seasons).
+def stat_values(stat, columns, per_game=True, minimums=pct_minimums, min_games=1):
+    import pandas as pd
+    games = np.asarray(columns["GP"])
+    qualified = np.ones(games.shape, dtype=bool)
+    if stat in minimums:
+        column, minimum = minimums[stat]
+        qualified &= np.asarray(columns[column]) > minimum
+
+    if stat in league_stats:
+        qualified &= games >= min_games
+        values = np.asarray(columns[league_stats[stat]])
+        if per_game and stat in per_game_stats:
+            values = values / np.where(qualified, games, 1)
+    else:
+        # Percentage stats
+        values = np.asarray(columns[pct_stats[stat]])
+
+    qualified &= ~pd.isna(values)
+    return values, qualified
+
+#Rank rows of a LeagueLeaders-style table for a stat.
+#Returns the row positions of the leaders and the values to show (percentages already x100).
+def rank_leaders(stat, columns, per_game=True, minimums=pct_minimums, min_games=1, n=10):
+    values, qualified = stat_values(stat, columns, per_game, minimums, min_games)
+    top = top_k(values, qualified, n)
+    values = values[top]
+    if stat in pct_stats:
+        values = values * 100
+    return top, values
+
+def range_title(stat, seasons, span=None):
+    displayed_stat = stat_display_names.get(stat, stat.upper())
+    per_game = " per game" if stat in per_game_stats else ""
+    best = f", best {span}-season span" if span else ""
+    return f"{displayed_stat}{per_game} leaders{best}, {seasons[0]} to {seasons[-1]}"
+
+def leaders_text(stat, players, values):
+    displayed_stat = stat_display_names.get(stat, stat.upper())
+    return "\n".join(
+        f"{rank}. {player} - {displayed_stat}: " + (f"{value:.1f}" if isinstance(value, (int, float)) else str(value))
+        for rank, (player, value) in enumerate(zip(players, values), start=1)
+    )
+
+#Local leaders store settings
+LEADERS_STORE_PATH = os.getenv('LEADERS_STORE_PATH', 'leaders_store')
+LEADERS_TOP_N = 25
+LEADERS_SYNC_DELAY = float(os.getenv('LEADERS_SYNC_DELAY', 1.0))
+#Failed syncs of a season before it is skipped, so one season stats.nba.com won't serve can't stop the backfill finishing
+LEADERS_SYNC_ATTEMPTS = 3
+FIRST_LEADERS_SEASON = "1951-52"
+ALL_TIME = "alltime"
+
+#Numeric LeagueLeaders columns kept in the store, one memory-mapped .npy file each
+STORE_COLUMNS = ['PLAYER_ID', 'GP', 'MIN', 'FGM', 'FGA', 'FG_PCT', 'FG3M', 'FG3A', 'FG3_PCT',
+                 'FTM', 'FTA', 'FT_PCT', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'PTS']
+
+#Percentage columns rebuilt from summed makes/attempts
+def add_percentages(columns, percentages=pct_attempts):
+    for column in percentages:
+        makes, attempts = pct_attempts[column]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            columns[column] = np.where(columns[attempts] > 0, columns[makes] / columns[attempts], np.nan)
+
+def all_seasons():
+    first, last = int(FIRST_LEADERS_SEASON[:4]), int(current_season()[:4])
+    return [f"{year}-{str(year + 1)[-2:]}" for year in range(first, last + 1)]
+
+#When the process with this pid started (clock ticks after boot, from /proc), None if none is running.
+#A pid and its start time name one process, a later process that reuses the pid starts at another time.
+def process_started(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(')', 1)[1].split()[19]
+    except (OSError, IndexError):
+        return None
+
+#This process's reader mark, <pid>-<start time>
+def reader_mark():
+    return f"{os.getpid()}-{process_started(os.getpid())}"
+
+#One version of the leaders store. Never changed once published: LeadersStore.update builds a new one
+#and swaps it in with a single assignment, so a query running on a data_pool thread reads one whole version.
+class LeadersState:
+    __slots__ = ('version', 'seasons', 'index', 'offsets', 'names', 'columns', 'rankings', 'synced_at', 'skipped')
+
+    def __init__(self, version=None, seasons=None, offsets=None, names=None, columns=None, rankings=None, synced_at=None,
+                 skipped=None):
+        self.version = version
+        self.seasons = seasons or []
+        #Season -> position in seasons, for O(1) single-season lookups
+        self.index = {season: i for i, season in enumerate(self.seasons)}
+        self.offsets = offsets or [0]
+        self.names = names or {}
+        self.columns = columns or {}
+        self.rankings = rankings or {}
+        self.synced_at = synced_at or {}
+        #Seasons that failed LEADERS_SYNC_ATTEMPTS syncs in a row. Still retried, but no longer hold up complete()
+        self.skipped = skipped or []
+
+    @classmethod
+    def read(cls, version):
+        with open(os.path.join(version, 'meta.json')) as f:
+            meta = json.load(f)
+        with open(os.path.join(version, 'rankings.json')) as f:
+            rankings = json.load(f)
+        columns = {c: np.load(os.path.join(version, f"{c}.npy"), mmap_mode='r') for c in STORE_COLUMNS}
+        names = {int(k): v for k, v in meta['names'].items()}
+        return cls(version, meta['seasons'], meta['offsets'], names, columns, rankings, meta['synced_at'], meta.get('skipped'))
+
+    #Seasons from first to last (either end open) that haven't been synced yet, leaving out skipped ones
+    def missing(self, first=None, last=None):
+        return [
+            season for season in all_seasons()
+            if season not in self.synced_at and season not in self.skipped
+            and (first is None or season >= first) and (last is None or season <= last)
+        ]
+
+    #Every season synced, all-time rankings from the store are only complete after that
+    def complete(self):
+        return not self.missing()
+
+    def has(self, season):
+        return season in self.index or (season == ALL_TIME and self.complete())
+
+    #Precomputed leaders as ([players], [values]), or None if the store doesn't have them
+    def top(self, season, stat, per_game=True, n=10):
+        mode = "per_game" if per_game and stat in per_game_stats else "total"
+        ranking = self.rankings.get(f"{season}|{stat}|{mode}")
+        if ranking is None:
+            return None
+        return ranking['players'][:n], ranking['values'][:n]
+
+    #Columns of one season, or of every season
+    def season_columns(self, season=None):
+        if season is None:
+            return self.columns
+        i = self.index[season]
+        return {c: values[self.offsets[i]:self.offsets[i + 1]] for c, values in self.columns.items()}
+
+    #Positions (start, end) in seasons of the stored seasons from first to last, either end open when None.
+    #Seasons are stored in order, so their rows are one contiguous slice of every column.
+    def season_span(self, first=None, last=None):
+        start = 0 if first is None else bisect.bisect_left(self.seasons, first)
+        end = len(self.seasons) if last is None else bisect.bisect_right(self.seasons, last)
+        return start, max(start, end)
+
+    #Totals per player across seasons[start:end] (every stored season by default), percentages rebuilt from makes/attempts
+    def career_columns(self, start=0, end=None):
+        rows = slice(self.offsets[start], self.offsets[len(self.seasons) if end is None else end])
+        player_ids, players = np.unique(np.asarray(self.columns['PLAYER_ID'][rows]), return_inverse=True)
+        career = {'PLAYER_ID': player_ids}
+        for column in STORE_COLUMNS[1:]:
+            if column not in pct_attempts:
+                career[column] = np.bincount(players, weights=np.nan_to_num(self.columns[column][rows]), minlength=len(player_ids))
+        add_percentages(career)
+        return career
+
+    #Leaders over the seasons from first to last, ranked on their totals for that stretch:
+    #([players], [values], [seasons]), or None when the store has none of those seasons
+    def range_top(self, stat, first=None, last=None, per_game=True, n=10):
+        start, end = self.season_span(first, last)
+        if start == end:
+            return None
+        columns = self.career_columns(start, end)
+        seasons = end - start
+        top, values = rank_leaders(stat, columns, per_game=per_game, minimums=range_minimums(seasons),
+                                   min_games=range_min_games(seasons) if per_game and stat in per_game_stats else 1, n=n)
+        ids = columns['PLAYER_ID'][top].astype(int).tolist()
+        return [self.names.get(i, str(i)) for i in ids], values.tolist(), self.seasons[start:end]
+
+    #Each player's best run of span consecutive seasons between first and last, ranked like range_top.
+    #Totals go into a players x seasons grid, and a cumulative sum along the seasons gives every
+    #window's totals in one subtraction.
+    def best_span(self, stat, span, first=None, last=None, per_game=True, n=10):
+        start, end = self.season_span(first, last)
+        seasons = end - start
+        if seasons < span:
+            return None
+        rows = slice(self.offsets[start], self.offsets[end])
+        player_ids, players = np.unique(np.asarray(self.columns['PLAYER_ID'][rows]), return_inverse=True)
+        cells = players * seasons + np.repeat(np.arange(seasons), np.diff(self.offsets[start:end + 1]))
+
+        def windows(column):
+            grid = np.bincount(cells, weights=np.nan_to_num(self.columns[column][rows]), minlength=len(player_ids) * seasons)
+            totals = np.cumsum(grid.reshape(len(player_ids), seasons), axis=1)
+            totals = np.pad(totals, ((0, 0), (1, 0)))
+            return totals[:, span:] - totals[:, :-span]
+
+        needed = {'GP'} | (set(pct_attempts[pct_stats[stat]]) if stat in pct_stats else {league_stats[stat]})
+        if stat in pct_minimums:
+            needed.add(pct_minimums[stat][0])
+        columns = {column: windows(column) for column in needed}
+        if stat in pct_stats:
+            add_percentages(columns, [pct_stats[stat]])
+
+        values, qualified = stat_values(stat, columns, per_game=per_game, minimums=range_minimums(span),
+                                        min_games=range_min_games(span) if per_game and stat in per_game_stats else 1)
+        values = np.where(qualified, values, -np.inf)
+        best = np.argmax(values, axis=1)
+        best_values = values[np.arange(len(player_ids)), best]
+        top = top_k(best_values, np.isfinite(best_values), n)
+        players = [
+            f"{self.names.get(int(player_ids[p]), str(int(player_ids[p])))} "
+            f"({self.seasons[start + best[p]]} to {self.seasons[start + best[p] + span - 1]})"
+            for p in top.tolist()
+        ]
+        values = best_values[top] * (100 if stat in pct_stats else 1)
+        return players, values.tolist(), self.seasons[start:end]
+
+    #A new state with these seasons ({season: LeagueLeaders DataFrame}) added or replaced, without rankings.
+    #A season that came back empty is only recorded as synced, skip lists seasons to give up waiting for.
+    def merged(self, frames, skip=()):
+        import pandas as pd
+        tables = {season: self.season_columns(season) for season in self.seasons if season not in frames}
+        names = dict(self.names)
+        for season, df in frames.items():
+            if df.empty:
+                continue
+            tables[season] = {
+                c: pd.to_numeric(df[c], errors='coerce').to_numpy(dtype=float) if c in df.columns else np.full(len(df), np.nan)
+                for c in STORE_COLUMNS
+            }
+            names.update(zip(df['PLAYER_ID'].astype(int).tolist(), df['PLAYER'].tolist()))
+
+        seasons = sorted(tables)
+        offsets = np.cumsum([0] + [len(tables[s]['GP']) for s in seasons]).tolist()
+        columns = {c: np.concatenate([np.asarray(tables[s][c], dtype=float) for s in seasons]) for c in STORE_COLUMNS} if seasons else {}
+        synced_at = dict(self.synced_at)
+        synced_at.update({season: time.time() for season in frames})
+        skipped = sorted((set(self.skipped) | set(skip)) - set(frames))
+        return LeadersState(None, seasons, offsets, names, columns, synced_at=synced_at, skipped=skipped)
+
+    #Rankings for seasons (every stored season by default) and all-time, other seasons keep theirs from previous
+    def compute_rankings(self, seasons=None, previous=None):
+        seasons = self.seasons if seasons is None else [season for season in seasons if season in self.index]
+        rankings = {
+            key: ranking for key, ranking in (previous or {}).items()
+            if key.split('|')[0] in self.index and key.split('|')[0] not in seasons
+        }
+
+        def add(key, columns, top, values):
+            ids = np.asarray(columns['PLAYER_ID'])[top].astype(int).tolist()
+            rankings[key] = {'players': [self.names.get(i, str(i)) for i in ids], 'values': values.tolist()}
+
+        for season in seasons:
+            columns = self.season_columns(season)
+            for stat in valid_stats:
+                for per_game in ([True, False] if stat in per_game_stats else [False]):
+                    top, values = rank_leaders(stat, columns, per_game=per_game, n=LEADERS_TOP_N)
+                    add(f"{season}|{stat}|{'per_game' if per_game else 'total'}", columns, top, values)
+        if not self.seasons:
+            return rankings
+
+        career = self.career_columns()
+        for stat in valid_stats:
+            for per_game in ([True, False] if stat in per_game_stats else [False]):
+                top, values = rank_leaders(
+                    stat, career, per_game=per_game, minimums=alltime_pct_minimums,
+                    min_games=ALLTIME_MIN_GAMES if per_game else 1, n=LEADERS_TOP_N
+                )
+                add(f"{ALL_TIME}|{stat}|{'per_game' if per_game else 'total'}", career, top, values)
+        return rankings
+
+
+#Every season's LeagueLeaders table stored as columns on disk, with top-N rankings
+#precomputed per (season, stat, per game or total) plus career all-time rankings
+class LeadersStore:
+    def __init__(self, path=LEADERS_STORE_PATH):
+        self.path = path
+        self.state = LeadersState()
+        #Failed syncs per season since its last success, only kept by the syncing process
+        self.failures = {}
+        self.load()
+
+    #Queries and attributes (seasons, synced_at, top, range_top, ...) go to the published state
+    def __getattr__(self, name):
+        if name == 'state':
+            raise AttributeError(name)
+        return getattr(self.state, name)
+
+    def _version_dir(self):
+        pointer = os.path.join(self.path, 'CURRENT')
+        if not os.path.exists(pointer):
+            return None
+        with open(pointer) as f:
+            return os.path.join(self.path, f.read().strip())
+
+    def load(self):
+        for _ in range(3):
+            version = self._version_dir()
+            if version is None:
+                return
+            self._mark(version)
+            try:
+                state = LeadersState.read(version)
+            except FileNotFoundError:
+                #Replaced and deleted between reading CURRENT and marking it, CURRENT has moved on since
+                self._unmark(version)
+                continue
+            previous, self.state = self.state.version, state
+            if previous and previous != version:
+                self._unmark(previous)
+            self._prune()
+            return
+
+    #Pick up a version written by another process (the primary shard does the syncing), True if there was one
+    def reload_if_changed(self):
+        if self._version_dir() != self.state.version:
+            self.load()
+            return True
+        return False
+
+    #Merge freshly fetched seasons ({season: LeagueLeaders DataFrame}) into the store and rewrite it
+    def update(self, frames, skip=()):
+        current = self.state
+        state = current.merged(frames, skip)
+        state.rankings = state.compute_rankings(list(frames), current.rankings)
+        self._write(state)
+
+    #Each write goes to a new version directory, then CURRENT is switched over to it.
+    #The directory is filled under a tmp- name (which nothing prunes) and carries this process's
+    #reader mark when it gets its v name, so it can't be deleted before CURRENT points at it.
+    def _write(self, state):
+        os.makedirs(self.path, exist_ok=True)
+        name = f"v{time.time_ns()}"
+        building = os.path.join(self.path, f"tmp-{name}")
+        os.makedirs(building)
+        for c, values in state.columns.items():
+            np.save(os.path.join(building, f"{c}.npy"), values)
+        with open(os.path.join(building, 'meta.json'), 'w') as f:
+            json.dump({
+                'seasons': state.seasons,
+                'offsets': state.offsets,
+                'names': {str(k): v for k, v in state.names.items()},
+                'synced_at': state.synced_at,
+                'skipped': state.skipped,
+            }, f)
+        with open(os.path.join(building, 'rankings.json'), 'w') as f:
+            json.dump(state.rankings, f)
+        self._mark(building)
+        os.rename(building, os.path.join(self.path, name))
+
+        pointer = os.path.join(self.path, 'CURRENT')
+        with open(pointer + '.tmp', 'w') as f:
+            f.write(name)
+        os.replace(pointer + '.tmp', pointer)
+        self.load()
+
+    #Every process leaves a readers/<pid>-<start time> mark in the version it has memory-mapped and removes
+    #it once it has loaded a newer one. Other shard processes can still be reading an old version after
+    #CURRENT moves on, so a version is only deleted when no other running process has a mark in it.
+    #Marks of processes that have exited (or whose pid now belongs to a newer process) don't count.
+    def _mark(self, version):
+        readers = os.path.join(version, 'readers')
+        os.makedirs(readers, exist_ok=True)
+        open(os.path.join(readers, reader_mark()), 'w').close()
+
+    def _unmark(self, version):
+        try:
+            os.remove(os.path.join(version, 'readers', reader_mark()))
+        except FileNotFoundError:
+            pass
+
+    def _in_use(self, version):
+        readers = os.path.join(version, 'readers')
+        for mark in os.listdir(readers) if os.path.isdir(readers) else []:
+            pid, _, started = mark.partition('-')
+            if pid.isdigit() and int(pid) != os.getpid() and process_started(int(pid)) == started:
+                return True
+        return False
+
+    def _prune(self):
+        keep = {self._version_dir(), self.state.version}
+        for name in os.listdir(self.path):
+            version = os.path.join(self.path, name)
+            if name.startswith('v') and version not in keep and not self._in_use(version):
+                shutil.rmtree(version, ignore_errors=True)
+
+#One season's LeagueLeaders table from stats.nba.com
+async def fetch_leaders_frame(client, season):
+    raw = await client.league_leaders(season=season, season_type="Regular Season")
+    return result_frames(raw)['LeagueLeaders']
+
+#Pull any season the store is missing (plus the current one, which keeps changing) and merge it in.
+#Seasons are fetched one at a time with a pause in between so a full backfill stays gentle, and each
+#one is written as soon as it arrives so the store fills in (and survives restarts) during the backfill.
+async def sync_leaders(client, store, refresh_after=3600):
+    current = current_season()
+    synced = []
+    for season in all_seasons():
+        if season in store.synced_at and (season != current or time.time() - store.synced_at[season] < refresh_after):
+            continue
+        try:
+            df = await fetch_leaders_frame(client, season)
+        except Exception as e:
+            print(f"Leaders sync skipped {season}: {e}")
+            #stats.nba.com being down says nothing about the season itself
+            if not isinstance(e, CircuitOpen):
+                store.failures[season] = store.failures.get(season, 0) + 1
+                if store.failures[season] == LEADERS_SYNC_ATTEMPTS and season not in store.skipped:
+                    await asyncio.to_thread(store.update, {}, [season])
+            continue
+        store.failures.pop(season, None)
+        await asyncio.to_thread(store.update, {season: df})
+        synced.append(season)
+        await asyncio.sleep(LEADERS_SYNC_DELAY)
+    return synced
@@ -0,0 +1,187 @@
+import asyncio
+import os
+import time
+from datetime import datetime
+from metrics import registry
+
+#Poll every LIVE_ACTIVE_INTERVAL seconds while a game is on, LIVE_IDLE_INTERVAL otherwise
+LIVE_ACTIVE_INTERVAL = float(os.getenv('LIVE_ACTIVE_INTERVAL', 10))
+LIVE_IDLE_INTERVAL = float(os.getenv('LIVE_IDLE_INTERVAL', 300))
+#Channels whose messages keep failing (deleted, no permission) get dropped
+LIVE_MAX_FAILURES = 3
+
+#One line per game, which is also what gets diffed between polls
+def game_line(game):
+    away, home = game['awayTeam'], game['homeTeam']
+    status = game['gameStatusText'].strip()
+    if game['gameStatus'] == 1:
+        return f"{away['teamTricode']} @ {home['teamTricode']} - {status}"
+    return f"{away['teamTricode']} {away['score']} @ {home['teamTricode']} {home['score']} - {status}"
+
+#Games whose line changed (or are new) between two {gameId: line} snapshots
+def changed_games(old, new):
+    return [game_id for game_id, line in new.items() if old.get(game_id) != line]
+
+def game_start(game):
+    try:
+        return datetime.fromisoformat(game['gameTimeUTC'].replace('Z', '+00:00')).timestamp()
+    except (KeyError, ValueError):
+        return None
+
+class Subscription:
+    def __init__(self, channel, team_id=None):
+        self.channel = channel
+        self.team_id = team_id
+        #gameId -> the message showing it in this channel
+        self.messages = {}
+        #gameId -> newest line not sent yet; a newer score replaces one still waiting
+        self.pending = {}
+        self.sender = None
+        self.failures = 0
+
+    def wants(self, game):
+        return self.team_id is None or self.team_id in (game['homeTeam']['teamId'], game['awayTeam']['teamId'])
+
+#One shared scoreboard poller for every channel following /live, so upstream calls don't grow with
+#the number of subscribers. Each poll is diffed per game and only messages for games that changed
+#are queued. Every channel drains its own queue through the outbound per-channel limiter (Discord's
+#limits are per channel), and the queue holds at most the newest line per game, so it can't grow.
+class LivePoller:
+    def __init__(self, client, active_interval=LIVE_ACTIVE_INTERVAL, idle_interval=LIVE_IDLE_INTERVAL, outbound=None):
+        self.client = client
+        self.outbound = outbound
+        self.active_interval = active_interval
+        self.idle_interval = idle_interval
+        self.subscriptions = {}
+        self.games = {}
+        self.lines = {}
+        self.polls = 0
+        self.sent = 0
+        self.edited = 0
+        self._poller = None
+        self._wake = asyncio.Event()
+
+    def subscribe(self, channel, team_id=None):
+        subscription = Subscription(channel, team_id)
+        self.subscriptions[channel.id] = subscription
+        #Show what we already have right away, the next poll only sends changes
+        for game_id, game in self.games.items():
+            if subscription.wants(game):
+                self._queue(subscription, game_id)
+        if not self.games:
+            self._wake.set()
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll_loop())
+        return subscription
+
+    def unsubscribe(self, channel_id):
+        subscription = self.subscriptions.pop(channel_id, None)
+        if subscription is None:
+            return False
+        subscription.pending.clear()
+        return True
+
+    #Lines waiting to go out, over every channel
+    @property
+    def pending(self):
+        return sum(len(subscription.pending) for subscription in self.subscriptions.values())
+
+    def _queue(self, subscription, game_id):
+        #Re-queuing a pending game keeps its place in line and just updates the text
+        subscription.pending[game_id] = self.lines[game_id]
+        if subscription.sender is None or subscription.sender.done():
+            subscription.sender = asyncio.create_task(self._send_loop(subscription))
+
+    async def poll_once(self):
+        raw = await self.client.scoreboard()
+        self.polls += 1
+        games = {game['gameId']: game for game in raw['scoreboard']['games']}
+        lines = {game_id: game_line(game) for game_id, game in games.items()}
+        changed = changed_games(self.lines, lines)
+        self.games, self.lines = games, lines
+
+        for subscription in self.subscriptions.values():
+            #Yesterday's games drop off the scoreboard, stop tracking their messages
+            for game_id in list(subscription.messages):
+                if game_id not in games:
+                    del subscription.messages[game_id]
+            for game_id in changed:
+                if subscription.wants(games[game_id]):
+                    self._queue(subscription, game_id)
+        return changed
+
+    #Seconds until the next poll: short while games are on, otherwise wait for the next tip-off
+    def interval(self, now=None):
+        if any(game['gameStatus'] == 2 for game in self.games.values()):
+            return self.active_interval
+        now = now or time.time()
+        starts = [game_start(game) for game in self.games.values() if game['gameStatus'] == 1]
+        starts = [start - now for start in starts if start is not None]
+        if starts:
+            return min(max(min(starts), self.active_interval), self.idle_interval)
+        return self.idle_interval
+
+    #Stops by itself once nobody is subscribed
+    async def _poll_loop(self):
+        while self.subscriptions:
+            try:
+                await self.poll_once()
+                registry.inc('nba_live_polls_total', outcome='ok')
+            except Exception as e:
+                registry.inc('nba_live_polls_total', outcome='error')
+                print(f"Live scoreboard poll failed: {e}")
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval())
+            except asyncio.TimeoutError:
+                pass
+
+    #One per channel with something queued, ends once that channel's queue is empty
+    async def _send_loop(self, subscription):
+        while subscription.pending and self.subscriptions.get(subscription.channel.id) is subscription:
+            game_id = next(iter(subscription.pending))
+            line = subscription.pending.pop(game_id)
+            await self._deliver(subscription, game_id, line)
+
+    #Stop polling and sending, e.g. before the client's session is closed
+    async def close(self):
+        tasks = [self._poller] + [subscription.sender for subscription in self.subscriptions.values()]
+        self.subscriptions = {}
+        tasks = [task for task in tasks if task is not None and not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    #Goes through the bot's outbound queue when there is one, so live posts and edits are
+    #paced to the channel's send budget
+    async def _send(self, channel, send):
+        if self.outbound is None:
+            return await send()
+        return await self.outbound.submit(channel.id, send)
+
+    async def _deliver(self, subscription, game_id, line):
+        try:
+            message = subscription.messages.get(game_id)
+            channel = subscription.channel
+            if message is None:
+                subscription.messages[game_id] = await self._send(channel, lambda: channel.send(f"```{line}```"))
+                self.sent += 1
+            else:
+                await self._send(channel, lambda: message.edit(content=f"```{line}```"))
+                self.edited += 1
+            subscription.failures = 0
+        except Exception as e:
+            subscription.failures += 1
+            print(f"Live update to channel {subscription.channel.id} failed: {e}")
+            if subscription.failures >= LIVE_MAX_FAILURES:
+                self.unsubscribe(subscription.channel.id)
+
+    def stats(self):
+        return {
+            'subscriptions': len(self.subscriptions),
+            'games': len(self.games),
+            'pending': self.pending,
+            'polls': self.polls,
+            'sent': self.sent,
+            'edited': self.edited,
+        }
@@ -0,0 +1,248 @@
+import asyncio
+import contextvars
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from aiohttp import web
+
+#Local metrics endpoint, off unless METRICS_PORT is set. Bound to localhost by default.
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
+#Continuous sampling profiler rate, 0 = only when asked for through /profile
+PROFILE_HZ = float(os.getenv('PROFILE_HZ', 0))
+
+#Latency buckets in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        #Recent samples, for the percentiles /botstats shows
+        self.recent = deque(maxlen=500)
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+        self.recent.append(value)
+
+    def percentile(self, p):
+        values = sorted(self.recent)
+        if not values:
+            return 0.0
+        return values[min(len(values) - 1, int(len(values) * p))]
+
+#Counters and histograms keyed by (name, labels), plus collectors that read gauges
+#(cache, pool, breaker...) from their owners when the metrics are rendered
+class Registry:
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self.collectors = []
+        self.help = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name, text):
+        self.help[name] = text
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    #fn() returns [(name, labels dict, value)], all reported as gauges
+    def collector(self, fn):
+        self.collectors.append(fn)
+        return fn
+
+    #Copies of the counters and histograms, safe to iterate while other threads record
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counters), dict(self.histograms)
+
+    #Prometheus text exposition format
+    def render(self):
+        lines = []
+
+        def header(name, kind):
+            if name in self.help:
+                lines.append(f"# HELP {name} {self.help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items(), key=lambda item: item[0])
+            histograms = [(key, list(h.counts), h.sum, h.count, h.buckets) for key, h in histograms]
+
+        seen = set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                seen.add(name)
+                header(name, 'counter')
+            lines.append(f"{name}{_labels(labels)} {value}")
+
+        for (name, labels), counts, total, count, buckets in histograms:
+            if name not in seen:
+                seen.add(name)
+                header(name, 'histogram')
+            cumulative = 0
+            for bound, n in zip(buckets, counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{name}_sum{_labels(labels)} {total}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+
+        for fn in self.collectors:
+            for name, labels, value in fn():
+                if name not in seen:
+                    seen.add(name)
+                    header(name, 'gauge')
+                lines.append(f"{name}{_labels(tuple(sorted(labels.items())))} {value}")
+        return "\n".join(lines) + "\n"
+
+def _labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"') for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
+
+registry = Registry()
+registry.describe('nba_phase_seconds', "Time spent per command phase (upstream, parse, format, send), excluding nested phases")
+registry.describe('nba_command_seconds', "Total slash command latency")
+
+#Command the current task is working for; copied into pool threads and single-flight tasks
+current_command = contextvars.ContextVar('current_command', default='')
+_phase = contextvars.ContextVar('phase', default=None)
+
+#Time a block as a phase of the current command. Time spent in phases nested inside it
+#(e.g. parse inside format) is only counted once, on the inner phase.
+@contextmanager
+def phase(name):
+    parent = _phase.get()
+    nested = [0.0]
+    token = _phase.set(nested)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _phase.reset(token)
+        if parent is not None:
+            parent[0] += elapsed
+        registry.observe('nba_phase_seconds', elapsed - nested[0], command=current_command.get() or 'none', phase=name)
+
+#Decorator form of phase() for plain functions
+def timed(name):
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+#Samples every thread's stack at a fixed rate; cheap enough to leave running under real load
+class SamplingProfiler:
+    def __init__(self, hz=100):
+        self.interval = 1 / hz
+        self.stacks = Counter()
+        self.samples = 0
+        self._thread = None
+        self._stop = threading.Event()
+
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='nba-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def reset(self):
+        self.stacks.clear()
+        self.samples = 0
+
+    def _run(self):
+        me = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    #Collapsed stacks, one "thread;outer;...;inner count" line each (flamegraph.pl / speedscope input)
+    def collapsed(self):
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+    #Functions the sampled threads were in most often, with their share of samples
+    def top(self, n=10):
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaf = stack.rsplit(";", 1)[-1]
+            if not leaf.startswith(('threading.py', 'selectors.py', 'queue.py', 'thread.py')):
+                leaves[leaf] += count
+        total = sum(leaves.values()) or 1
+        return [(leaf, count / total) for leaf, count in leaves.most_common(n)]
+
+profiler = SamplingProfiler(PROFILE_HZ or 100)
+
+#GET /metrics: Prometheus text. GET /profile?seconds=10: collapsed stacks sampled for that long
+#(or everything so far when the profiler is already running continuously).
+async def start_server(host=METRICS_HOST, port=METRICS_PORT):
+    async def metrics_page(request):
+        return web.Response(text=registry.render(), headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'})
+
+    async def profile_page(request):
+        if not profiler.running():
+            seconds = min(float(request.query.get('seconds', 10)), 120)
+            profiler.reset()
+            profiler.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                profiler.stop()
+        return web.Response(text=profiler.collapsed(), content_type='text/plain')
+
+    app = web.Application()
+    app.router.add_get('/metrics', metrics_page)
+    app.router.add_get('/profile', profile_page)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
@@ -0,0 +1,186 @@
+import bisect
+import itertools
+import re
+import unicodedata
+from collections import defaultdict
+from nba_api.stats.static import players, teams
+
+#Fuzzy matches below this trigram similarity are treated as no match
+MIN_SIMILARITY = 0.45
+
+#Common nicknames, mapped to the name nba_api uses
+PLAYER_ALIASES = {
+    "king james": "LeBron James",
+    "bron": "LeBron James",
+    "mj": "Michael Jordan",
+    "jordan": "Michael Jordan",
+    "kobe": "Kobe Bryant",
+    "kd": "Kevin Durant",
+    "ad": "Anthony Davis",
+    "cp3": "Chris Paul",
+    "steph": "Stephen Curry",
+    "shaq": "Shaquille O'Neal",
+    "greek freak": "Giannis Antetokounmpo",
+    "joker": "Nikola Jokić",
+    "the beard": "James Harden",
+    "dame": "Damian Lillard",
+    "ant": "Anthony Edwards",
+    "ant man": "Anthony Edwards",
+    "sga": "Shai Gilgeous-Alexander",
+    "wemby": "Victor Wembanyama",
+    "the mailman": "Karl Malone",
+    "the dream": "Hakeem Olajuwon",
+}
+
+TEAM_ALIASES = {
+    "sixers": "76ers",
+    "cavs": "Cavaliers",
+    "mavs": "Mavericks",
+    "wolves": "Timberwolves",
+    "twolves": "Timberwolves",
+    "blazers": "Trail Blazers",
+    "dubs": "Warriors",
+    "nugs": "Nuggets",
+    "grizz": "Grizzlies",
+    "pels": "Pelicans",
+    "knickerbockers": "Knicks",
+    "celts": "Celtics",
+}
+
+#Lowercase, strip accents and punctuation so "Jokić", "jokic" and "JOKIC" all match
+def normalize(name: str) -> str:
+    name = unicodedata.normalize('NFKD', name or "")
+    name = "".join(c for c in name if not unicodedata.combining(c))
+    name = re.sub(r"[^a-z0-9 ]", "", name.lower().replace("-", " ").replace(".", " "))
+    return " ".join(name.split())
+
+def trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+#In-memory lookup over a static nba_api list, built once at startup.
+#priority(entry) breaks ties between equally good matches, bigger first (any comparable value).
+class NameIndex:
+    def __init__(self, entries, keys, aliases=None, priority=None):
+        self.entries = entries
+        self.priority = priority or (lambda entry: 0)
+        self.exact = defaultdict(list)      # normalized name -> entry indexes
+        self.words = defaultdict(set)       # single word of a name -> entry indexes
+        self.last_words = defaultdict(set)  # last word of a name (surname) -> entry indexes
+        self.grams = defaultdict(list)      # trigram -> key indexes
+        self.key_entry = []                 # key index -> entry index
+        self.key_size = []                  # key index -> number of trigrams
+        self.sorted_keys = []               # (normalized name, entry index), for prefix search
+        self.sorted_words = []              # (single word, entry index), for prefix search on last names
+
+        for i, entry in enumerate(entries):
+            for name in keys(entry):
+                norm = normalize(name)
+                if not norm or i in self.exact[norm]:
+                    continue
+                self._add_key(norm, i)
+        for alias, target in (aliases or {}).items():
+            for i in list(self.exact.get(normalize(target), [])):
+                self._add_key(normalize(alias), i)
+        self.sorted_keys.sort()
+        self.sorted_words = sorted({(word, i) for word, ids in self.words.items() for i in ids})
+
+    def _add_key(self, norm, i):
+        self.exact[norm].append(i)
+        for word in norm.split():
+            self.words[word].add(i)
+        self.last_words[norm.split()[-1]].add(i)
+        grams = trigrams(norm)
+        for gram in grams:
+            self.grams[gram].append(len(self.key_entry))
+        self.key_entry.append(i)
+        self.key_size.append(len(grams))
+        self.sorted_keys.append((norm, i))
+
+    #Entry indexes whose name (or alias) starts with an already normalized prefix
+    def prefix(self, norm, limit=None, sorted_keys=None):
+        sorted_keys = self.sorted_keys if sorted_keys is None else sorted_keys
+        found = []
+        start = bisect.bisect_left(sorted_keys, (norm, -1))
+        for key, i in itertools.islice(sorted_keys, start, None):
+            if not key.startswith(norm) or (limit and len(found) >= limit):
+                break
+            if i not in found:
+                found.append(i)
+        return found
+
+    #Autocomplete suggestions for partially typed text, whole-name prefixes first
+    def complete(self, text, limit=25):
+        norm = normalize(text)
+        if not norm:
+            return []
+        found = self.prefix(norm, limit=limit * 4)
+        if len(found) < limit * 4:
+            for i in self.prefix(norm, limit=limit * 4, sorted_keys=self.sorted_words):
+                if i not in found:
+                    found.append(i)
+        return [self.entries[i] for i in self.rank(found)[:limit]]
+
+    #Entry indexes by score (when given), then priority, then list order
+    def rank(self, ids, scores=None):
+        ids = sorted(ids)
+        ids.sort(key=lambda i: self.priority(self.entries[i]), reverse=True)
+        if scores:
+            ids.sort(key=lambda i: -scores[i])
+        return ids
+
+    #Ranked candidate entries: exact names, then prefixes/whole words, then typos
+    def search(self, query, limit=5):
+        norm = normalize(query)
+        if not norm:
+            return []
+        #An exact name or alias is the answer, no need to look any further
+        exact = self.exact.get(norm)
+        if exact:
+            return [self.entries[i] for i in self.rank(exact)[:limit]]
+
+        #A single word matches surnames ahead of first names ("Jordan" -> the Jordans before Jordan Clarkson)
+        scores = {}
+        for i in self.last_words.get(norm, ()):
+            scores[i] = 2.5
+        for i in self.words.get(norm, ()):
+            scores.setdefault(i, 2.0)
+        for i in self.prefix(norm, limit=50):
+            scores.setdefault(i, 2.0)
+
+        if len(scores) < limit:
+            query_grams = trigrams(norm)
+            shared = defaultdict(int)
+            for gram in query_grams:
+                for key in self.grams.get(gram, ()):
+                    shared[key] += 1
+            for key, count in shared.items():
+                similarity = 2 * count / (len(query_grams) + self.key_size[key])
+                i = self.key_entry[key]
+                if similarity >= MIN_SIMILARITY and similarity > scores.get(i, 0):
+                    scores[i] = similarity
+
+        return [self.entries[i] for i in self.rank(scores, scores)[:limit]]
+
+    #Best match or None
+    def resolve(self, query):
+        matches = self.search(query, limit=1)
+        return matches[0] if matches else None
+
+#career_games maps player id -> games played (filled in once the leaders store is loaded),
+#so between equally good matches the longer career wins, then active players
+def build_player_index(career_games=None):
+    career_games = {} if career_games is None else career_games
+    return NameIndex(
+        players.get_players(),
+        keys=lambda p: [p['full_name']],
+        aliases=PLAYER_ALIASES,
+        priority=lambda p: (career_games.get(p['id'], 0), p['is_active']),
+    )
+
+def build_team_index():
+    return NameIndex(
+        teams.get_teams(),
+        keys=lambda t: [t['nickname'], t['full_name'], t['city'], t['abbreviation']],
+        aliases=TEAM_ALIASES,
+    )
@@ -0,0 +1,122 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+
+#Cache settings, override in .env
+CACHE_PATH = os.getenv('NBA_CACHE_PATH', 'nba_cache.sqlite3')
+CURRENT_SEASON_TTL = int(os.getenv('NBA_CACHE_TTL', 900))
+CACHE_MAX_MB = int(os.getenv('NBA_CACHE_MAX_MB', 256))
+#Last-used times are only rewritten when older than this, so reads don't turn into writes
+ACCESS_RESOLUTION = 60
+#The size total is kept up to date by each write and recounted every this many writes,
+#which also picks up what other processes sharing the file have added
+RECOUNT_WRITES = 500
+
+#Season currently being played in xxxx-xx format (seasons start in October)
+def current_season(today=None) -> str:
+    today = today or date.today()
+    start_year = today.year if today.month >= 10 else today.year - 1
+    return f"{start_year}-{str(start_year + 1)[-2:]}"
+
+#Completed seasons can't change anymore, so they never need to be refetched
+def is_completed_season(season) -> bool:
+    return bool(season) and season < current_season()
+
+#Stable key for an endpoint call, parameter order doesn't matter
+def cache_key(endpoint: str, params: dict) -> str:
+    return f"{endpoint}:{json.dumps(params, sort_keys=True, default=str)}"
+
+#WAL lets every bot process read the cache file while one of them writes to it
+def connect(path):
+    db = sqlite3.connect(path, timeout=5, check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    return db
+
+#Raw stats.nba.com responses stored on disk so they survive restarts.
+#The file can be shared by several bot processes; table lets other caches live in the same file.
+class ResponseCache:
+    def __init__(self, path=CACHE_PATH, ttl=CURRENT_SEASON_TTL, max_mb=CACHE_MAX_MB, table='responses'):
+        self.ttl = ttl
+        self.max_bytes = max_mb * 1024 * 1024
+        self.table = table
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self._size = None
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._db = connect(path)
+        self._db.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, body TEXT NOT NULL, size INTEGER NOT NULL, "
+            "permanent INTEGER NOT NULL, fetched_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._db.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed_at)")
+        self._db.commit()
+
+    def get(self, key):
+        entry = self.lookup(key)
+        if entry is None or not entry[1]:
+            return None
+        return entry[0]
+
+    #(body, fresh, fetched_at) or None. Expired entries are still returned (fresh=False)
+    #so they can be served while stats.nba.com is down or slow.
+    def lookup(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT body, permanent, fetched_at, accessed_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            fresh = bool(row[1]) or now - row[2] <= self.ttl
+            if fresh:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+            if now - row[3] > ACCESS_RESOLUTION:
+                self._db.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+                self._db.commit()
+        return json.loads(row[0]), fresh, row[2]
+
+    #season is the season the request asked for; only a completed one is kept for good, None means it can still change
+    def put(self, key, body, season=None):
+        now = time.time()
+        text = json.dumps(body)
+        with self._lock:
+            old = self._db.execute(f"SELECT size FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?, ?, ?)",
+                (key, text, len(text), int(is_completed_season(season)), now, now),
+            )
+            self._evict(len(text) - (old[0] if old else 0))
+            self._db.commit()
+
+    #Drop least recently used responses until we are back under the size cap
+    def _evict(self, added):
+        self._writes += 1
+        if self._size is None or self._writes % RECOUNT_WRITES == 0:
+            self._size = self._db.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+        else:
+            self._size += added
+        if self._size <= self.max_bytes:
+            return
+        stale = []
+        for key, size in self._db.execute(f"SELECT key, size FROM {self.table} ORDER BY accessed_at"):
+            if self._size <= self.max_bytes:
+                break
+            stale.append((key,))
+            self._size -= size
+        self._db.executemany(f"DELETE FROM {self.table} WHERE key = ?", stale)
+
+    def clear(self):
+        with self._lock:
+            self._db.execute(f"DELETE FROM {self.table}")
+            self._db.commit()
+            self._size = 0
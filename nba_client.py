@@ -0,0 +1,258 @@
+import asyncio
+import os
+import time
+import aiohttp
+from nba_cache import cache_key
+from scheduler import UpstreamScheduler
+from singleflight import SingleFlight
+import metrics
+from metrics import registry
+
+#Overridable so benchmarks can point the bot at a local stub server
+STATS_URL = os.getenv('NBA_STATS_URL', "https://stats.nba.com/stats/{endpoint}")
+LIVE_URL = os.getenv('NBA_LIVE_URL', "https://cdn.nba.com/static/json/liveData/{endpoint}")
+
+#Same browser-like headers nba_api sends, stats.nba.com rejects requests without them
+STATS_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:72.0) Gecko/20100101 Firefox/72.0",
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Accept-Encoding": "gzip, deflate",
+    "x-nba-stats-origin": "stats",
+    "x-nba-stats-token": "true",
+    "Referer": "https://stats.nba.com/",
+    "Pragma": "no-cache",
+    "Cache-Control": "no-cache",
+}
+
+LIVE_HEADERS = {
+    "User-Agent": STATS_HEADERS["User-Agent"],
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+#Upstream tuning, override in .env
+NBA_TIMEOUT = float(os.getenv('NBA_TIMEOUT', 10))
+STALE_GRACE = float(os.getenv('NBA_STALE_GRACE', 1.5))
+BREAKER_FAILURES = int(os.getenv('NBA_BREAKER_FAILURES', 5))
+BREAKER_RESET = float(os.getenv('NBA_BREAKER_RESET', 30))
+
+#Raised instead of calling stats.nba.com while the circuit breaker is open
+class CircuitOpen(Exception):
+    pass
+
+#Stops traffic to stats.nba.com after repeated failures, then lets a single probe through
+#after reset_timeout (half-open) to see whether it has recovered
+class CircuitBreaker:
+    def __init__(self, failure_threshold=BREAKER_FAILURES, reset_timeout=BREAKER_RESET):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.times_opened = 0
+
+    def _cooled_down(self):
+        return time.monotonic() - self.opened_at >= self.reset_timeout
+
+    #True when a call right now would be rejected
+    def blocked(self):
+        if self.state == 'open':
+            return not self._cooled_down()
+        return self.state == 'half-open' and self.probing
+
+    #Call before each upstream request, False means don't send it
+    def allow(self):
+        if self.state == 'open' and self._cooled_down():
+            self.state = 'half-open'
+            self.probing = False
+        if self.state == 'closed':
+            return True
+        if self.state == 'half-open' and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def success(self):
+        self.state = 'closed'
+        self.failures = 0
+        self.probing = False
+
+    def failure(self):
+        self.failures += 1
+        self.probing = False
+        if self.state == 'half-open' or self.failures >= self.failure_threshold:
+            if self.state != 'open':
+                self.times_opened += 1
+            self.state = 'open'
+            self.opened_at = time.monotonic()
+
+#Errors that mean stats.nba.com is struggling, as opposed to us sending a bad request
+def is_upstream_failure(error):
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status >= 500 or error.status == 429
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+#Label for the upstream request counter
+def upstream_outcome(error):
+    if isinstance(error, asyncio.TimeoutError):
+        return 'timeout'
+    if isinstance(error, aiohttp.ClientResponseError):
+        return f"http_{error.status}"
+    return 'error'
+
+#Stale cache entries are returned with the time they were fetched, so commands can say so
+def stale_copy(body, fetched_at):
+    return dict(body, stale_since=fetched_at)
+
+#Turn a raw stats.nba.com response into {result set name: DataFrame}, same columns nba_api gives.
+#pandas is imported on first use, it's the slowest import the bot has and connecting doesn't need it
+@metrics.timed('parse')
+def result_frames(raw):
+    import pandas as pd
+    result_sets = raw.get('resultSets') or raw.get('resultSet') or []
+    if isinstance(result_sets, dict):
+        result_sets = [result_sets]
+    return {
+        rs['name']: pd.DataFrame(rs['rowSet'], columns=rs['headers'])
+        for rs in result_sets
+    }
+
+#asyncio client for the endpoints the bot uses, sharing one pooled keep-alive session
+class NBAStatsClient:
+    def __init__(self, cache=None, timeout=NBA_TIMEOUT, max_connections=100, stale_grace=STALE_GRACE):
+        self.cache = cache
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.stale_grace = stale_grace
+        self.flight = SingleFlight()
+        self.breaker = CircuitBreaker()
+        #Rate limit, per-endpoint concurrency, retries and hedging for every upstream call;
+        #the breaker only hears about a call once its retries are used up
+        self.scheduler = UpstreamScheduler(is_upstream_failure, can_retry=lambda: self.breaker.state == 'closed')
+        self.stale_served = 0
+        self._session = None
+
+    #The session has to be created inside the running event loop, so it's made on first use
+    def session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                keepalive_timeout=60,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+    async def get_json(self, url, params=None, headers=None):
+        async with self.session().get(url, params=params, headers=headers) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+    #Raw json from a stats.nba.com endpoint, through the response cache when there is one.
+    #Identical requests already in flight wait on the same upstream call.
+    #Expired entries are refreshed in the background; if the refresh isn't back within
+    #stale_grace (or the breaker is open) the old copy is returned, marked with stale_since.
+    async def stats(self, endpoint, params):
+        params = {k: v for k, v in sorted(params.items()) if v is not None}
+        key = cache_key(endpoint, params)
+        entry = self.cache.lookup(key) if self.cache is not None else None
+        if entry is None:
+            return await self.flight.do(key, lambda: self._fetch_stats(endpoint, params, key))
+
+        body, fresh, fetched_at = entry
+        if fresh:
+            return body
+        if self.breaker.blocked():
+            self.stale_served += 1
+            return stale_copy(body, fetched_at)
+
+        refresh = asyncio.ensure_future(self.flight.do(key, lambda: self._fetch_stats(endpoint, params, key)))
+        refresh.add_done_callback(lambda task: task.cancelled() or task.exception())
+        try:
+            return await asyncio.wait_for(asyncio.shield(refresh), self.stale_grace)
+        except Exception:
+            self.stale_served += 1
+            return stale_copy(body, fetched_at)
+
+    async def _fetch_stats(self, endpoint, params, key):
+        if not self.breaker.allow():
+            registry.inc('nba_upstream_requests_total', endpoint=endpoint, outcome='circuit_open')
+            raise CircuitOpen(f"stats.nba.com is failing, not calling {endpoint}")
+        try:
+            with metrics.phase('upstream'):
+                raw = await self.scheduler.call(
+                    endpoint, lambda: self.get_json(STATS_URL.format(endpoint=endpoint), params, STATS_HEADERS)
+                )
+        except asyncio.CancelledError:
+            self.breaker.probing = False
+            raise
+        except Exception as e:
+            registry.inc('nba_upstream_requests_total', endpoint=endpoint, outcome=upstream_outcome(e))
+            if is_upstream_failure(e):
+                self.breaker.failure()
+            else:
+                self.breaker.success()
+            raise
+        registry.inc('nba_upstream_requests_total', endpoint=endpoint, outcome='ok')
+        self.breaker.success()
+        if self.cache is not None:
+            self.cache.put(key, raw, params.get('Season'))
+        return raw
+
+    async def player_career_stats(self, player_id, per_mode='Totals', league_id=''):
+        return await self.stats('playercareerstats', {
+            'PlayerID': player_id,
+            'PerMode': per_mode,
+            'LeagueID': league_id,
+        })
+
+    async def team_year_by_year_stats(self, team_id, season_type='Regular Season', per_mode='Totals', league_id='00'):
+        return await self.stats('teamyearbyyearstats', {
+            'TeamID': team_id,
+            'LeagueID': league_id,
+            'PerMode': per_mode,
+            'SeasonType': season_type,
+        })
+
+    async def common_team_roster(self, team_id, season=None, league_id=''):
+        return await self.stats('commonteamroster', {
+            'TeamID': team_id,
+            'Season': season,
+            'LeagueID': league_id,
+        })
+
+    async def player_game_log(self, player_id, season, season_type='Regular Season', league_id=''):
+        return await self.stats('playergamelog', {
+            'PlayerID': player_id,
+            'Season': season,
+            'SeasonType': season_type,
+            'DateFrom': '',
+            'DateTo': '',
+            'LeagueID': league_id,
+        })
+
+    async def league_leaders(self, season='', season_type='Regular Season', stat_category='PTS',
+                             per_mode='Totals', scope='S', league_id='00', active_flag=''):
+        return await self.stats('leagueleaders', {
+            'LeagueID': league_id,
+            'PerMode': per_mode,
+            'Scope': scope,
+            'Season': season,
+            'SeasonType': season_type,
+            'StatCategory': stat_category,
+            'ActiveFlag': active_flag,
+        })
+
+    #Live scoreboard is never cached, it changes every few seconds during games
+    async def scoreboard(self):
+        url = LIVE_URL.format(endpoint="scoreboard/todaysScoreboard_00.json")
+        return await self.scheduler.call('scoreboard', lambda: self.get_json(url, headers=LIVE_HEADERS))
@@ -0,0 +1,191 @@
+import asyncio
+import os
+import time
+import discord
+import metrics
+from metrics import registry
+
+#Discord limits
+MESSAGE_LIMIT = 2000
+EMBED_DESCRIPTION_LIMIT = 4096
+EMBED_TOTAL_LIMIT = 6000
+
+#Per-channel send budget, Discord allows 5 messages per 5 seconds per channel
+CHANNEL_RATE = int(os.getenv('OUTBOUND_CHANNEL_RATE', 5))
+CHANNEL_PER = float(os.getenv('OUTBOUND_CHANNEL_PER', 5))
+MAX_RETRIES = 3
+
+def code_block(text):
+    return f"```{text}```"
+
+#Split text into pieces of at most size characters, breaking between lines where possible
+def split_lines(text, size):
+    pieces, current = [], ""
+    for line in text.split("\n"):
+        while len(line) > size:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(line[:size])
+            line = line[size:]
+        if current and len(current) + 1 + len(line) > size:
+            pieces.append(current)
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+    if current or not pieces:
+        pieces.append(current)
+    return pieces
+
+#Fewest messages that hold text as code blocks: plain content when it fits in one message,
+#otherwise up to 6000 characters per message spread over embeds of at most 4096.
+#Returns [{'content': str}] or [{'embeds': [description, ...]}, ...]
+def pack(text):
+    if len(code_block(text)) <= MESSAGE_LIMIT:
+        return [{'content': code_block(text)}]
+    #Line-aligned pieces of a chunk always number 3 or fewer, leaving room for their fences
+    chunks = split_lines(text, EMBED_TOTAL_LIMIT - 4 * len(code_block("")))
+    return [{'embeds': [code_block(piece) for piece in split_lines(chunk, EMBED_DESCRIPTION_LIMIT - len(code_block("")))]}
+            for chunk in chunks]
+
+#Keyword arguments for send/edit calls from a packed payload
+def message_kwargs(payload):
+    if 'content' in payload:
+        return {'content': payload['content'], 'embeds': []}
+    return {'content': None, 'embeds': [discord.Embed(description=text) for text in payload['embeds']]}
+
+#Token bucket for one channel. Starts from Discord's documented limit and is corrected
+#from X-RateLimit headers whenever Discord sends them back (on 429s).
+class ChannelLimiter:
+    def __init__(self, rate=CHANNEL_RATE, per=CHANNEL_PER):
+        self.rate = rate
+        self.per = per
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        #asyncio.Lock wakes waiters in order, so this is the channel's FIFO queue
+        self.lock = asyncio.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate / self.per)
+        self.updated = now
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(self.paused_until - now, 0 if self.tokens >= 1 else (1 - self.tokens) * self.per / self.rate)
+            if wait <= 0:
+                self.tokens -= 1
+                return
+            await asyncio.sleep(wait)
+
+    def observe(self, headers, retry_after=None):
+        now = time.monotonic()
+        limit = headers.get('X-RateLimit-Limit')
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset_after = headers.get('X-RateLimit-Reset-After')
+        if limit:
+            self.rate = int(limit)
+        if remaining is not None:
+            self.tokens = float(remaining)
+            self.updated = now
+        if retry_after or (remaining == '0' and reset_after):
+            self.paused_until = now + float(retry_after or reset_after)
+
+    def idle(self):
+        return not self.lock.locked() and self.tokens >= self.rate - 1
+
+#Every message the bot sends goes through here. Messages posted to a channel (channel.send and
+#message.edit, i.e. /live) wait in one queue per channel, paced so a burst waits its turn instead of
+#running into 429s. Interaction responses and followups aren't counted against the channel by
+#Discord, so they skip the queue and only retry when Discord does rate limit them.
+class Outbound:
+    def __init__(self, rate=CHANNEL_RATE, per=CHANNEL_PER):
+        self.rate = rate
+        self.per = per
+        self.channels = {}
+        self.sent = 0
+        self.rate_limited = 0
+        self.waiting = 0
+
+    def limiter(self, channel_id):
+        limiter = self.channels.get(channel_id)
+        if limiter is None:
+            if len(self.channels) > 1000:
+                self.channels = {key: value for key, value in self.channels.items() if not value.idle()}
+            limiter = self.channels[channel_id] = ChannelLimiter(self.rate, self.per)
+        return limiter
+
+    #Run send() (a zero-argument coroutine function) when the channel has budget for it
+    async def submit(self, channel_id, send):
+        limiter = self.limiter(channel_id)
+        self.waiting += 1
+        try:
+            await limiter.lock.acquire()
+        finally:
+            self.waiting -= 1
+        try:
+            return await self.deliver(send, limiter)
+        finally:
+            limiter.lock.release()
+
+    #Run send(), retrying a 429 once Discord's Retry-After has passed. With a channel limiter
+    #every attempt takes a token from it and the 429's headers correct it.
+    async def deliver(self, send, limiter=None):
+        for attempt in range(MAX_RETRIES + 1):
+            if limiter is not None:
+                await limiter.acquire()
+            try:
+                result = await send()
+                self.sent += 1
+                registry.inc('nba_outbound_messages_total', outcome='ok')
+                return result
+            except discord.HTTPException as e:
+                if e.status != 429 or attempt == MAX_RETRIES:
+                    registry.inc('nba_outbound_messages_total', outcome='error')
+                    raise
+                self.rate_limited += 1
+                registry.inc('nba_outbound_messages_total', outcome='rate_limited')
+                headers = getattr(e.response, 'headers', None) or {}
+                retry_after = headers.get('Retry-After') or 1
+                if limiter is not None:
+                    limiter.observe(headers, retry_after)
+                else:
+                    await asyncio.sleep(float(retry_after))
+
+    #Answer a deferred slash command with text: the first message replaces the "thinking..."
+    #placeholder, anything that didn't fit follows as extra messages
+    async def reply(self, ctx, text, view=None):
+        if not text:
+            return await self.notify(ctx, "No data to display.")
+        payloads = pack(text)
+        metrics.current_command.set(ctx.command.name)
+        with metrics.phase('send'):
+            first = message_kwargs(payloads[0])
+            if view is not None:
+                first['view'] = view
+            await self.deliver(lambda: ctx.interaction.edit_original_response(**first))
+            for payload in payloads[1:]:
+                kwargs = message_kwargs(payload)
+                await self.deliver(lambda: ctx.followup.send(**{k: v for k, v in kwargs.items() if v}))
+
+    #Plain text reply (errors, notices), same placeholder folding as reply()
+    async def notify(self, ctx, message):
+        metrics.current_command.set(ctx.command.name)
+        with metrics.phase('send'):
+            await self.deliver(lambda: ctx.interaction.edit_original_response(content=message, embeds=[]))
+
+    #First response to a command that wasn't deferred (/live, /botstats)
+    async def respond(self, ctx, message, ephemeral=False):
+        metrics.current_command.set(ctx.command.name)
+        with metrics.phase('send'):
+            await self.deliver(lambda: ctx.respond(message, ephemeral=ephemeral))
+
+    def stats(self):
+        return {
+            'channels': len(self.channels),
+            'waiting': self.waiting,
+            'sent': self.sent,
+            'rate_limited': self.rate_limited,
+        }
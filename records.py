@@ -0,0 +1,201 @@
+#Compact per-season records for player careers and team histories.
+#Each career is one NumPy structured array (a few dozen bytes per season) with team names
+#stored as small codes into an interned table; text is only rendered for the season being shown.
+import sys
+import threading
+import numpy as np
+
+#Interned strings (team abbreviations, cities) shared by every record, looked up by code
+_strings = []
+_codes = {}
+_strings_lock = threading.Lock()
+
+def intern_code(text):
+    code = _codes.get(text)
+    if code is None:
+        with _strings_lock:
+            code = _codes.get(text)
+            if code is None:
+                code = _codes[text] = len(_strings)
+                _strings.append(sys.intern(text))
+    return code
+
+#Season start year <-> xxxx-xx, the id strings are built once and shared
+_season_ids = {}
+
+def season_id(year):
+    year = int(year)
+    text = _season_ids.get(year)
+    if text is None:
+        text = _season_ids[year] = sys.intern(f"{year}-{str(year + 1)[-2:]}")
+    return text
+
+def season_year(season):
+    return int(season[:4])
+
+#Records for one player or team, oldest season first. Reads like the old {season: text} dicts:
+#iterating gives season ids and indexing renders that season's line.
+#note (set when answering from stale data) isn't part of any line, whoever builds the reply adds it once.
+class SeasonRecords:
+    __slots__ = ('name', 'rows', 'note')
+    #Overridden by subclasses: structured dtype, then (field, upstream column) pairs;
+    #string columns listed in `strings` are stored as interned codes
+    dtype = None
+    columns = ()
+    strings = ()
+
+    def __init__(self, name, rows, note=""):
+        self.name = name
+        self.rows = rows
+        self.note = note
+
+    #Build from a stats.nba.com result set (headers + rowSet), keeping the last row seen for each season
+    @classmethod
+    def from_result_set(cls, name, result_set, keep=None):
+        index = {header: i for i, header in enumerate(result_set['headers'])}
+        season_column = cls.columns[0][1]
+        latest = {}
+        for row in result_set['rowSet']:
+            if keep is None or keep(row, index):
+                latest[row[index[season_column]]] = row
+        return cls(name, cls._array([latest[season] for season in sorted(latest)], index))
+
+    @classmethod
+    def _array(cls, rows, index):
+        values = []
+        for row in rows:
+            record = []
+            for field, column in cls.columns:
+                value = row[index[column]]
+                if field == 'season':
+                    value = season_year(value)
+                elif field in cls.strings:
+                    value = intern_code(value or "")
+                elif value is None:
+                    value = np.nan if cls.dtype[field].kind == 'f' else 0
+                record.append(value)
+            values.append(tuple(record))
+        return np.array(values, dtype=cls.dtype)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return (season_id(year) for year in self.rows['season'].tolist())
+
+    def keys(self):
+        return list(self)
+
+    def __contains__(self, season):
+        return self._find(season) is not None
+
+    def _find(self, season):
+        years = self.rows['season']
+        i = int(np.searchsorted(years, season_year(season)))
+        return i if i < len(years) and years[i] == season_year(season) else None
+
+    def __getitem__(self, season):
+        i = self._find(season)
+        if i is None:
+            raise KeyError(season)
+        return self.render(self.rows[i])
+
+    def render(self, row):
+        raise NotImplementedError
+
+    #Only the given season, or None when it isn't there
+    def season(self, season):
+        i = self._find(season)
+        if i is None:
+            return None
+        return type(self)(self.name, self.rows[i:i + 1].copy())
+
+    #Seasons from first to last (xxxx-xx), either end open when None
+    def between(self, first=None, last=None):
+        years = self.rows['season']
+        start = 0 if first is None else int(np.searchsorted(years, season_year(first)))
+        end = len(years) if last is None else int(np.searchsorted(years, season_year(last), side='right'))
+        return type(self)(self.name, self.rows[start:end].copy())
+
+    #For the shared result cache: plain lists, interned strings written out
+    def to_json(self):
+        names = list(self.rows.dtype.names)
+        rows = [[_strings[value] if field in self.strings else value for field, value in zip(names, row)]
+                for row in self.rows.tolist()]
+        return {'name': self.name, 'rows': rows, 'note': self.note}
+
+    @classmethod
+    def from_json(cls, data):
+        rows = [tuple(intern_code(value) if field in cls.strings else value for (field, _), value in zip(cls.columns, row))
+                for row in data['rows']]
+        return cls(data['name'], np.array(rows, dtype=cls.dtype), data.get('note', ""))
+
+def average(total, games):
+    return round(total / games, 1) if games else float('nan')
+
+class PlayerSeasons(SeasonRecords):
+    __slots__ = ()
+    #Season totals, averaged per game when rendered
+    dtype = np.dtype([('season', 'i2'), ('team', 'u2'), ('gp', 'u2'), ('pts', 'f4'), ('reb', 'f4'), ('ast', 'f4'),
+                      ('blk', 'f4'), ('stl', 'f4'), ('tov', 'f4'), ('pf', 'f4'), ('fgm', 'f4'), ('fg3m', 'f4')])
+    columns = (('season', 'SEASON_ID'), ('team', 'TEAM_ABBREVIATION'), ('gp', 'GP'), ('pts', 'PTS'), ('reb', 'REB'),
+               ('ast', 'AST'), ('blk', 'BLK'), ('stl', 'STL'), ('tov', 'TOV'), ('pf', 'PF'), ('fgm', 'FGM'), ('fg3m', 'FG3M'))
+    strings = ('team',)
+
+    def render(self, row):
+        season, team, games, pts, reb, ast, blk, stl, tov, pf, fgm, fg3m = row.tolist()
+        return (
+            f"{self.name}: {_strings[team]} {season_id(season)}: GP: {games}, "
+            f"PPG: {average(pts, games)}, RPG: {average(reb, games)}, APG: {average(ast, games)}, "
+            f"BPG: {average(blk, games)}, SPG: {average(stl, games)}, TO: {average(tov, games)}, "
+            f"PF: {average(pf, games)}, FGM: {average(fgm, games)}, 3PM: {average(fg3m, games)}"
+        )
+
+def playoff_result(po_wins, po_losses):
+    if po_wins == 0 and po_losses == 0:
+        return None
+    if po_wins < 4:
+        return "Eliminated in the First Round"
+    if po_wins < 8:
+        return "Eliminated in the Second Round"
+    if po_wins < 12:
+        return "Eliminated in the Conference Finals"
+    if po_wins < 16:
+        return "Lost in the Finals"
+    return "Won the Championship!"
+
+class TeamSeasons(SeasonRecords):
+    __slots__ = ()
+    dtype = np.dtype([('season', 'i2'), ('city', 'u2'), ('gp', 'u2'), ('wins', 'u2'), ('losses', 'u2'), ('win_pct', 'f8'),
+                      ('po_wins', 'u1'), ('po_losses', 'u1'), ('pts', 'f4'), ('reb', 'f4'), ('ast', 'f4')])
+    columns = (('season', 'YEAR'), ('city', 'TEAM_CITY'), ('gp', 'GP'), ('wins', 'WINS'), ('losses', 'LOSSES'),
+               ('win_pct', 'WIN_PCT'), ('po_wins', 'PO_WINS'), ('po_losses', 'PO_LOSSES'), ('pts', 'PTS'),
+               ('reb', 'REB'), ('ast', 'AST'))
+    strings = ('city',)
+
+    def render(self, row):
+        season, city, games, wins, losses, win_pct, po_wins, po_losses, pts, reb, ast = row.tolist()
+        result = playoff_result(po_wins, po_losses)
+        return (
+            f"{_strings[city]} {season_id(season)}: {wins}-{losses} ({win_pct*100:.1f}% win), "
+            f"PPG {average(pts, games)}, APG {average(ast, games)}, RPG {average(reb, games)}, "
+            + (f"Playoffs W-L: {po_wins}-{po_losses}, {result}" if result else "Did not make the Playoffs")
+        )
+
+    #Every season in these records together: overall record, averages, playoff runs and titles
+    def summary(self):
+        rows = self.rows
+        seasons = rows['season']
+        wins, losses, games = int(rows['wins'].sum()), int(rows['losses'].sum()), int(rows['gp'].sum())
+        po_wins, po_losses = rows['po_wins'].astype(int), rows['po_losses'].astype(int)
+        titles = [season_id(year) for year in seasons[po_wins >= 16].tolist()]
+        best = int(np.argmax(rows['win_pct']))
+        return "\n".join([
+            f"{self.name} {season_id(seasons[0])} to {season_id(seasons[-1])} ({len(rows)} seasons)",
+            f"Record: {wins}-{losses} ({wins / max(wins + losses, 1) * 100:.1f}% win)",
+            f"PPG {average(float(rows['pts'].sum()), games)}, APG {average(float(rows['ast'].sum()), games)}, "
+            f"RPG {average(float(rows['reb'].sum()), games)}",
+            f"Playoffs: {int(np.count_nonzero(po_wins + po_losses))} appearances, W-L: {po_wins.sum()}-{po_losses.sum()}",
+            f"Championships: {', '.join(titles) if titles else 'None'}",
+            f"Best season: {season_id(seasons[best])} {rows['wins'][best]}-{rows['losses'][best]}",
+        ])
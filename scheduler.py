@@ -0,0 +1,168 @@
+#Every upstream request goes through here. A token bucket keeps the bot under the rate stats.nba.com
+#tolerates, each endpoint gets a few requests in flight at a time, failed calls are retried with
+#jittered exponential backoff, and a call still running past its endpoint's p95 latency gets a hedged
+#duplicate when there's spare budget for one. The first answer wins.
+import asyncio
+import os
+import random
+import time
+import aiohttp
+from metrics import Histogram, registry
+
+#Requests per second for all bot processes together, each process gets an even share
+UPSTREAM_RATE = float(os.getenv('NBA_UPSTREAM_RATE', 8)) / max(1, int(os.getenv('BOT_PROCESSES', 1)))
+UPSTREAM_BURST = int(os.getenv('NBA_UPSTREAM_BURST', 16))
+ENDPOINT_CONCURRENCY = int(os.getenv('NBA_ENDPOINT_CONCURRENCY', 4))
+#Retries after the first attempt, and the backoff they start from (seconds, doubled each time)
+RETRIES = int(os.getenv('NBA_RETRIES', 2))
+RETRY_BASE = float(os.getenv('NBA_RETRY_BASE', 0.25))
+RETRY_MAX = 4
+HEDGE = os.getenv('NBA_HEDGE', '1') == '1'
+#An endpoint needs this many timed calls before its p95 is trusted, and never hedges sooner than this
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY = 0.05
+
+class TokenBucket:
+    def __init__(self, rate=UPSTREAM_RATE, burst=UPSTREAM_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.waiting = 0
+        self.lock = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    #Waits for a token; asyncio.Lock wakes waiters in order, so requests go out first come first served
+    async def acquire(self):
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+        self.waiting += 1
+        try:
+            async with self.lock:
+                while True:
+                    self._refill()
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    await asyncio.sleep((1 - self.tokens) / self.rate)
+        finally:
+            self.waiting -= 1
+
+    #Only takes a token that nobody is waiting for, used for hedges
+    def try_acquire(self):
+        if self.waiting:
+            return False
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+#Seconds to wait before retrying: full jitter, or what a 429 asked for when it's longer
+def backoff(attempt, error=None, base=RETRY_BASE):
+    delay = random.uniform(0, min(RETRY_MAX, base * 2 ** attempt))
+    if isinstance(error, aiohttp.ClientResponseError) and error.headers:
+        try:
+            delay = max(delay, min(RETRY_MAX, float(error.headers.get('Retry-After', 0))))
+        except ValueError:
+            pass
+    return delay
+
+class UpstreamScheduler:
+    #retryable(error) says whether a failure is worth another attempt (upstream trouble, not a bad request),
+    #can_retry() is checked before each retry so they stop once the circuit breaker has tripped
+    def __init__(self, retryable, can_retry=None, rate=UPSTREAM_RATE, burst=UPSTREAM_BURST,
+                 concurrency=ENDPOINT_CONCURRENCY, retries=RETRIES, hedge=HEDGE):
+        self.retryable = retryable
+        self.can_retry = can_retry or (lambda: True)
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = concurrency
+        self.retries = retries
+        self.hedge = hedge
+        self.limits = {}
+        self.latency = {}
+        self.retried = 0
+        self.hedged = 0
+        self.hedges_won = 0
+
+    def limit(self, endpoint):
+        limit = self.limits.get(endpoint)
+        if limit is None:
+            limit = self.limits[endpoint] = asyncio.Semaphore(self.concurrency)
+        return limit
+
+    def hedge_delay(self, endpoint):
+        latency = self.latency.get(endpoint)
+        if not self.hedge or latency is None or len(latency.recent) < HEDGE_MIN_SAMPLES:
+            return None
+        return max(HEDGE_MIN_DELAY, latency.percentile(0.95))
+
+    #request is a zero-argument coroutine function making one attempt, it may be called more than once
+    async def call(self, endpoint, request):
+        for attempt in range(self.retries + 1):
+            try:
+                return await self._attempt(endpoint, request)
+            except Exception as e:
+                if attempt == self.retries or not self.retryable(e) or not self.can_retry():
+                    raise
+                self.retried += 1
+                registry.inc('nba_upstream_retries_total', endpoint=endpoint)
+                await asyncio.sleep(backoff(attempt, e))
+
+    async def _timed(self, endpoint, request):
+        started = time.monotonic()
+        result = await request()
+        self.latency.setdefault(endpoint, Histogram()).observe(time.monotonic() - started)
+        return result
+
+    async def _attempt(self, endpoint, request):
+        limit = self.limit(endpoint)
+        async with limit:
+            await self.bucket.acquire()
+            first = asyncio.ensure_future(self._timed(endpoint, request))
+            hedge = None
+            try:
+                delay = self.hedge_delay(endpoint)
+                if delay is not None:
+                    await asyncio.wait({first}, timeout=delay)
+                #Still waiting: send a duplicate, but only with a free slot and a spare token
+                if delay is None or first.done() or limit.locked() or not self.bucket.try_acquire():
+                    return await first
+                self.hedged += 1
+                async with limit:
+                    hedge = asyncio.ensure_future(self._timed(endpoint, request))
+                    result, winner = await self._first_success(first, hedge)
+                if winner is hedge:
+                    self.hedges_won += 1
+                registry.inc('nba_upstream_hedges_total', endpoint=endpoint, outcome='won' if winner is hedge else 'lost')
+                return result
+            finally:
+                for task in (first, hedge):
+                    if task is not None and not task.done():
+                        task.cancel()
+
+    #(result, task) from whichever finishes successfully first; the first error if both fail
+    @staticmethod
+    async def _first_success(*tasks):
+        pending = set(tasks)
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), task
+                error = error or task.exception()
+        raise error
+
+    def stats(self):
+        return {
+            'rate': self.bucket.rate,
+            'waiting': self.bucket.waiting,
+            'retried': self.retried,
+            'hedged': self.hedged,
+            'hedges_won': self.hedges_won,
+        }
@@ -0,0 +1,59 @@
+#Starts the bot. With BOT_PROCESSES > 1 it runs that many bot processes, each connected to an
+#even slice of SHARD_COUNT gateway shards, so parsing and formatting spread across cores.
+#The processes share the SQLite response/result cache (WAL mode) and the memory-mapped
+#leaders store, so data fetched or formatted by one shard is reused by the others.
+import os
+import signal
+import subprocess
+import sys
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BOT_PROCESSES = int(os.getenv('BOT_PROCESSES', 1))
+#Defaults to one shard per process; Discord needs at least one shard per 2500 guilds
+SHARD_COUNT = int(os.getenv('SHARD_COUNT', 0)) or BOT_PROCESSES
+RESTART_DELAY = 5
+BOT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'NBADiscordBot.py')
+
+#Shard ids for each process, round robin so the slices stay even
+def shard_slices(processes, shard_count):
+    return [list(range(i, shard_count, processes)) for i in range(processes)]
+
+def start(index, shard_ids):
+    env = dict(os.environ, SHARD_COUNT=str(SHARD_COUNT), SHARD_IDS=",".join(map(str, shard_ids)))
+    #Each process gets its own metrics port
+    if int(os.getenv('METRICS_PORT', 0)):
+        env['METRICS_PORT'] = str(int(os.environ['METRICS_PORT']) + index)
+    print(f"Starting bot process {index} with shards {shard_ids}")
+    return subprocess.Popen([sys.executable, BOT_SCRIPT], env=env)
+
+def main():
+    if BOT_PROCESSES <= 1:
+        os.execv(sys.executable, [sys.executable, BOT_SCRIPT])
+
+    slices = shard_slices(min(BOT_PROCESSES, SHARD_COUNT), SHARD_COUNT)
+    processes = [start(i, shard_ids) for i, shard_ids in enumerate(slices)]
+
+    def stop(signum, frame):
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    #Restart any process that dies, the others keep serving their shards meanwhile
+    while True:
+        time.sleep(1)
+        for i, process in enumerate(processes):
+            if process.poll() is not None:
+                print(f"Bot process {i} exited with {process.returncode}, restarting in {RESTART_DELAY}s")
+                time.sleep(RESTART_DELAY)
+                processes[i] = start(i, slices[i])
+
+if __name__ == "__main__":
+    main()
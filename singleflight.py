@@ -0,0 +1,40 @@
+import asyncio
+import functools
+
+#Concurrent calls with the same key share one in-flight task instead of each doing the work
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn):
+        task = self._calls.get(key)
+        if task is None:
+            self.started += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.coalesced += 1
+        #shield so one caller timing out doesn't cancel the fetch everyone else is waiting on
+        return await asyncio.shield(task)
+
+    #Decorator for coroutine functions, keyed on the function name and case/space-normalized arguments
+    def coalesce(self, fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            key = (fn.__name__,) + tuple(_normalize(a) for a in args) + tuple(sorted((k, _normalize(v)) for k, v in kwargs.items()))
+            return await self.do(key, lambda: fn(*args, **kwargs))
+        return wrapper
+
+    def in_flight(self):
+        return len(self._calls)
+
+    def stats(self):
+        return {'started': self.started, 'coalesced': self.coalesced, 'in_flight': self.in_flight()}
+
+def _normalize(value):
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    return value
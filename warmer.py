@@ -0,0 +1,111 @@
+#Keeps the popular lookups warm. Every command's (name, season) is counted in a small SQLite table
+#shared by all bot processes, and the hottest entries are looked up again in the background at a gentle pace
+#after startup and every CACHE_WARM_INTERVAL, so they're cached before anyone asks.
+import asyncio
+import os
+import threading
+import time
+from collections import Counter
+import metrics
+from metrics import registry
+from nba_cache import connect
+
+#Its own file, so it can live on a volume and outlast a cache that's thrown away on deploy
+QUERY_LOG_PATH = os.getenv('QUERY_LOG_PATH', 'nba_queries.sqlite3')
+CACHE_WARM_TOP = int(os.getenv('CACHE_WARM_TOP', 200))
+#Lookups per second while warming
+CACHE_WARM_RATE = float(os.getenv('CACHE_WARM_RATE', 2))
+CACHE_WARM_INTERVAL = int(os.getenv('CACHE_WARM_INTERVAL', 600))
+#Seconds a warm lookup gets, and how often counts are written to the log
+WARM_TIMEOUT = 15
+FLUSH_INTERVAL = 60
+#Counts halve once a day so yesterday's popular players make way for today's
+DECAY_INTERVAL = 86400
+
+#Counts are kept in memory and written in one batch per flush, so recording a command costs nothing.
+#Several bot processes can flush into the same table.
+class QueryLog:
+    def __init__(self, path=QUERY_LOG_PATH, table='queries'):
+        self.table = table
+        self.pending = Counter()
+        self._lock = threading.Lock()
+        self._db = connect(path)
+        self._db.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "command TEXT NOT NULL, name TEXT NOT NULL, season TEXT NOT NULL, count REAL NOT NULL, last_at REAL NOT NULL, "
+            "PRIMARY KEY (command, name, season)) WITHOUT ROWID"
+        )
+        self._db.execute(f"CREATE TABLE IF NOT EXISTS {table}_meta (key TEXT PRIMARY KEY, value REAL NOT NULL)")
+        self._db.commit()
+
+    def record(self, command, name, season=None):
+        if name:
+            self.pending[(command, ' '.join(str(name).lower().split()), season or '')] += 1
+
+    def flush(self):
+        now = time.time()
+        pending, self.pending = self.pending, Counter()
+        with self._lock:
+            self._db.executemany(
+                f"INSERT INTO {self.table} VALUES (?, ?, ?, ?, ?) ON CONFLICT (command, name, season) "
+                "DO UPDATE SET count = count + excluded.count, last_at = excluded.last_at",
+                [(command, name, season, count, now) for (command, name, season), count in pending.items()],
+            )
+            row = self._db.execute(f"SELECT value FROM {self.table}_meta WHERE key = 'decayed_at'").fetchone()
+            if row is None or now - row[0] >= DECAY_INTERVAL:
+                if row is not None:
+                    self._db.execute(f"UPDATE {self.table} SET count = count / 2")
+                    self._db.execute(f"DELETE FROM {self.table} WHERE count < 0.5")
+                self._db.execute(f"INSERT OR REPLACE INTO {self.table}_meta VALUES ('decayed_at', ?)", (now,))
+            self._db.commit()
+        return len(pending)
+
+    #[(command, name, season)] most requested first
+    def hottest(self, n=CACHE_WARM_TOP):
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT command, name, season FROM {self.table} ORDER BY count DESC, last_at DESC LIMIT ?", (n,)
+            ).fetchall()
+        return [(command, name, season or None) for command, name, season in rows]
+
+#Looks up the hottest entries one at a time, rate per second. lookups maps a command name to an
+#async fn(name, season) -> (result, error), normally the same cached get_* the command uses,
+#so entries that are still cached cost a single cache read.
+class CacheWarmer:
+    def __init__(self, log, lookups, top=CACHE_WARM_TOP, rate=CACHE_WARM_RATE, can_run=None):
+        self.log = log
+        self.lookups = lookups
+        self.top = top
+        self.rate = rate
+        #Checked before each lookup, warming stops for this round when it returns False
+        self.can_run = can_run or (lambda: True)
+        self.warmed = 0
+        self.failed = 0
+        self.last_run = 0.0
+
+    async def warm(self):
+        self.last_run = time.time()
+        metrics.current_command.set('warmer')
+        done = 0
+        for command, name, season in self.log.hottest(self.top):
+            lookup = self.lookups.get(command)
+            if lookup is None:
+                continue
+            if not self.can_run():
+                break
+            try:
+                _, error = await asyncio.wait_for(lookup(name, season), WARM_TIMEOUT)
+            except Exception:
+                error = True
+            if error:
+                self.failed += 1
+                registry.inc('nba_cache_warm_total', outcome='error')
+            else:
+                self.warmed += 1
+                done += 1
+                registry.inc('nba_cache_warm_total', outcome='ok')
+            await asyncio.sleep(1 / self.rate)
+        return done
+
+    def stats(self):
+        return {'warmed': self.warmed, 'failed': self.failed, 'pending': sum(self.log.pending.values())}
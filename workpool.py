@@ -0,0 +1,67 @@
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+DATA_WORKERS = int(os.getenv('DATA_WORKERS', 4))
+DATA_QUEUE = int(os.getenv('DATA_QUEUE', 32))
+
+#Raised instead of queueing when every worker is busy and the queue is full
+class PoolBusy(Exception):
+    pass
+
+#Fixed-size thread pool for parsing/formatting so pandas work never runs on the event loop
+class WorkPool:
+    def __init__(self, workers=DATA_WORKERS, max_queue=DATA_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='nba-data')
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_times = deque(maxlen=1000)
+        self._lock = threading.Lock()
+
+    #Run fn(*args) on a worker. Fails fast with PoolBusy when saturated; cancelling the
+    #caller (e.g. a command deadline) drops the job if it hasn't started yet.
+    async def run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise PoolBusy()
+            self.pending += 1
+
+        queued_at = time.perf_counter()
+        #Carry the caller's context over so metrics know which command the work is for
+        context = contextvars.copy_context()
+
+        def job():
+            self.wait_times.append(time.perf_counter() - queued_at)
+            return context.run(fn, *args)
+
+        future = self.executor.submit(job)
+        future.add_done_callback(self._finished)
+        return await asyncio.wrap_future(future)
+
+    def _finished(self, future):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    def queue_depth(self):
+        return max(0, self.pending - self.workers)
+
+    def stats(self):
+        waits = sorted(self.wait_times)
+        return {
+            'workers': self.workers,
+            'pending': self.pending,
+            'queue_depth': self.queue_depth(),
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'wait_p50_ms': round(waits[len(waits) // 2] * 1000, 2) if waits else 0.0,
+            'wait_max_ms': round(waits[-1] * 1000, 2) if waits else 0.0,
+        }